@@ -2,21 +2,21 @@ import streamlit as st
 import json
 import numpy as np
 import plotly.graph_objects as go
-from Bio.PDB import PDBIO, StructureBuilder
-from io import StringIO
+
+from src.protein_metrics import binding_affinity, sequence_metrics, structure_element_counts
+from src.structure_export import FORMATS, structure_text
 
 # ----- Helper Functions -----
 def calculate_metrics(sequence, confidence):
-    amino_acids = {
-        'hydrophobic': set('AVILMFYW'),
-        'polar': set('STNQRHKDE'),
-        'special': set('CGP')
-    }
-    total_len = len(sequence)
-    hydrophobic = sum(aa in amino_acids['hydrophobic'] for aa in sequence) / total_len * 100
-    polar = sum(aa in amino_acids['polar'] for aa in sequence) / total_len * 100
-    stability = (confidence * 0.7 + hydrophobic * 0.3)
-    return hydrophobic, polar, stability
+    metrics = sequence_metrics([sequence], [confidence])
+    return metrics["hydrophobic"][0], metrics["polar"][0], metrics["stability"][0]
+
+@st.cache_data
+def load_dataset(raw):
+    """Parse an uploaded JSON (or the example) and compute metrics for every protein once per file"""
+    data = json.loads(raw) if raw else create_example_data()
+    metrics = sequence_metrics([p["sequence"] for p in data], [p.get("confidence", 0) for p in data])
+    return data, metrics, json.dumps(data, indent=2)
 
 def create_example_data():
     coords = []
@@ -43,12 +43,11 @@ def create_example_data():
         }
     ]
 
+@st.cache_data
 def secondary_structure_plot(sec_str):
-    counts = {}
-    for char in sec_str:
-        counts[char] = counts.get(char, 0) + 1
-    fig = go.Figure([go.Bar(x=list(counts.keys()),
-                            y=list(counts.values()),
+    elements, counts = structure_element_counts([sec_str])
+    fig = go.Figure([go.Bar(x=elements,
+                            y=counts[0].tolist(),
                             marker_color='indianred')])
     fig.update_layout(title="Secondary Structure Element Frequencies",
                       xaxis_title="Structure Element",
@@ -69,49 +68,18 @@ def extend_sequence(sequence, extension_length=10):
     return sequence + sequence[:extension_length]
 
 def estimate_binding_affinity(sequence):
-    hydrophobic_aas = set('AVILMFYW')
-    hydrophobic_count = sum(aa in hydrophobic_aas for aa in sequence)
-    affinity = 5.0 + 0.1 * hydrophobic_count
-    return round(affinity, 2)
+    return float(binding_affinity([sequence])[0])
 
 def generate_pdb_from_sequence(sequence):
-    builder = StructureBuilder.StructureBuilder()
-    builder.init_structure("X")
-    builder.init_model(0)
-    builder.init_chain("A")
-    for i, aa in enumerate(sequence):
-        builder.init_seg("    ")
-        builder.init_residue(aa, " ", i+1, " ")
-        builder.init_atom("CA", np.array([i*3.8, 0.0, 0.0]), 1.0, 1.0, " ", "CA", i+1, "C")
-    structure = builder.get_structure()
-    io = PDBIO()
-    io.set_structure(structure)
-    pdb_buf = StringIO()
-    io.save(pdb_buf)
-    return pdb_buf.getvalue()
+    # Straight C-alpha chain along x, 3.8 A between residues
+    coordinates = np.zeros((len(sequence), 3))
+    coordinates[:, 0] = np.arange(len(sequence)) * 3.8
+    return structure_text("pdb", sequence, coordinates)
 
 def coords_to_structure(seq, coordinates, fmt="pdb"):
-    if fmt == "pdb":
-        io = PDBIO()
-        builder = StructureBuilder.StructureBuilder()
-        builder.init_structure("X")
-        builder.init_model(0)
-        builder.init_chain("A")
-        for i, coord in enumerate(coordinates):
-            builder.init_residue(seq[i], " ", i+1, " ")
-            builder.init_atom("CA", np.array(coord), 1.0, 1.0, " ", "CA", i+1, "C")
-        structure = builder.get_structure()
-        pdb_buf = StringIO()
-        io.set_structure(structure)
-        io.save(pdb_buf)
-        return pdb_buf.getvalue()
-    elif fmt == "mol2":
-        mol2_str = "@\\<TRIPOS>MOLECULE\n" + seq + "\n" + str(len(coordinates)) + " 0 0 0 0\nSMALL\nNO_CHARGES\n@\\<TRIPOS>ATOM\n"
-        for i, coord in enumerate(coordinates):
-            mol2_str += f"{i+1:4d} CA {coord[0]:8.3f} {coord[1]:8.3f} {coord[2]:8.3f} C 1.00 0.00\n"
-        mol2_str += "@\\<TRIPOS>BOND\n"
-        return mol2_str
-    return None
+    if fmt not in FORMATS:
+        return None
+    return structure_text(fmt, seq, coordinates)
 
 def plot_3d_structure(coordinates, title="Tertiary Structure - 3D Scatter Plot"):
     x = [coord[0] for coord in coordinates]
@@ -164,8 +132,8 @@ def main():
     with st.sidebar:
         st.header("Input Data")
         uploaded_file = st.file_uploader("Upload JSON", type="json")
-        data = json.load(uploaded_file) if uploaded_file else create_example_data()
-        st.download_button("Export Example Dataset", json.dumps(data, indent=2), file_name="protein_dataset.json")
+        data, metrics, export = load_dataset(uploaded_file.getvalue() if uploaded_file else None)
+        st.download_button("Export Example Dataset", export, file_name="protein_dataset.json")
 
     protein_names = [p["model"] for p in data]
     selected_idx = st.sidebar.selectbox("Select Protein Model", range(len(protein_names)), format_func=lambda i: protein_names[i])
@@ -174,8 +142,9 @@ def main():
     # Process only the selected model once a user clicks the Compute button.
     if st.button("Compute"):
         st.subheader("Metrics")
-        hydrophobic, polar, stability = calculate_metrics(protein['sequence'], protein['confidence'])
-        affinity = estimate_binding_affinity(protein['sequence'])
+        hydrophobic = metrics["hydrophobic"][selected_idx]
+        stability = metrics["stability"][selected_idx]
+        affinity = metrics["affinity"][selected_idx]
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("Confidence", f"{protein['confidence']}%")
         col2.metric("Stability", f"{stability:.1f}%")
@@ -219,6 +188,8 @@ def main():
             mol2_str = coords_to_structure(protein['sequence'], coordinates, "mol2")
             st.download_button("Download PDB", pdb_str, file_name=f"{protein['model']}.pdb")
             st.download_button("Download MOL2", mol2_str, file_name=f"{protein['model']}.mol2")
+            cif_str = coords_to_structure(protein['sequence'], coordinates, "cif")
+            st.download_button("Download mmCIF", cif_str, file_name=f"{protein['model']}.cif")
         else:
             st.info("No tertiary structure available.")
 
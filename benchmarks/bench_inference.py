@@ -0,0 +1,342 @@
+"""
+Inference benchmark and load-test harness.
+
+Drives the engines directly and the FastAPI app in-process (httpx ASGI
+transport), reports throughput and p50/p95/p99 latency, writes the results
+to JSON and optionally compares them against a stored baseline.
+
+    python -m benchmarks.bench_inference --output benchmarks/results.json
+    python -m benchmarks.bench_inference --compare benchmarks/baseline.json
+
+The "imports" scenario measures cold import times with `python -X importtime`
+in fresh interpreters and fails the run when a module exceeds its budget.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.synthetic import random_material_structures, random_sequences  # noqa: E402
+
+logger = logging.getLogger("benchmarks")
+
+API_KEY = os.getenv("API_KEY", "development_key")
+ENGINE_MODELS = ["bio_1", "bio_2", "mat_1", "mat_2"]
+
+# Cold-import budgets (ms). Importing the package or the app must not pull in torch;
+# anything that does shows up as a multi-second jump here.
+IMPORT_BUDGETS_MS = {
+    "src": 100,
+    "src.models": 600,
+    "src.main": 1500
+}
+
+
+def summarize(latencies_s: List[float], items: int, wall_s: float) -> Dict[str, float]:
+    """Throughput and latency percentiles (ms) for one scenario"""
+    latencies_ms = np.asarray(latencies_s) * 1000
+    return {
+        "calls": len(latencies_s),
+        "items": items,
+        "throughput_items_per_s": round(items / wall_s, 2) if wall_s > 0 else 0.0,
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3)
+    }
+
+
+def stable_seed(*parts) -> int:
+    """Seed derived from the given values that is identical across runs (unlike hash())"""
+    return int(hashlib.sha256(repr(parts).encode()).hexdigest()[:8], 16)
+
+
+def make_inputs(model_type: str, count: int, length: int, seed: int) -> List[Dict[str, Any]]:
+    if model_type.startswith("bio"):
+        return [{"sequence": s} for s in random_sequences(count, length, seed)]
+    return [{"structure": s, "energy_threshold": 0.5} for s in random_material_structures(count, length, seed)]
+
+
+def engine_modes(registry) -> Dict[str, str]:
+    """
+    Whether each benchmarked key runs its checkpoint ("model") or a placeholder
+    ("mock"). Part of the scenario key, so a model that gains or loses its weights
+    is not compared against numbers measured in the other mode.
+    """
+    return {model_type: "mock" if registry.get(model_type).mock else "model" for model_type in ENGINE_MODELS}
+
+
+def bench_engines(registry, batch_sizes: List[int], lengths: List[int], repeats: int) -> List[Dict[str, Any]]:
+    """Call predict_batch directly across batch sizes and input lengths"""
+    results = []
+    modes = engine_modes(registry)
+    for model_type in ENGINE_MODELS:
+        engine = registry.get(model_type)
+        for length in lengths:
+            for batch_size in batch_sizes:
+                inputs = make_inputs(model_type, batch_size, length, seed=batch_size * 1000 + length)
+                engine.predict_batch(inputs)  # warm-up
+                latencies = []
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    call_start = time.perf_counter()
+                    engine.predict_batch(inputs)
+                    latencies.append(time.perf_counter() - call_start)
+                wall = time.perf_counter() - start
+                results.append({
+                    "scenario": "engine",
+                    "model": model_type,
+                    "engine_mode": modes[model_type],
+                    "batch_size": batch_size,
+                    "length": length,
+                    **summarize(latencies, batch_size * repeats, wall)
+                })
+    return results
+
+
+async def _drive(client, requests: List[Dict[str, Any]], concurrency: int):
+    """Send requests with at most `concurrency` in flight; return per-request latencies and wall time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def send(request):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(request["path"], json=request["json"], headers={"X-API-Key": API_KEY})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[send(request) for request in requests])
+    return latencies, time.perf_counter() - start, failures
+
+
+def api_requests(model_type: str, count: int, length: int, seed: int) -> List[Dict[str, Any]]:
+    domain, version = model_type.split("_")
+    path = "/api/predict/bio" if domain == "bio" else "/api/predict/materials"
+    payloads = make_inputs(model_type, count, length, seed)
+    for payload in payloads:
+        payload["model_version"] = version
+    return [{"path": path, "json": payload} for payload in payloads]
+
+
+def replay_requests(path: str, seed: int) -> List[Dict[str, Any]]:
+    """
+    Turn a JSON Lines request log into API calls. Lines that already carry a
+    sequence or structure are replayed as-is; any other line becomes a
+    synthetic predict call seeded from the line's content, so the replay is
+    deterministic for a given log.
+    """
+    requests = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "sequence" in record:
+                requests.append({"path": "/api/predict/bio", "json": record})
+                continue
+            if "structure" in record:
+                requests.append({"path": "/api/predict/materials", "json": record})
+                continue
+            line_seed = stable_seed(line, seed)
+            rng = np.random.default_rng(line_seed)
+            model_type = ENGINE_MODELS[int(rng.integers(len(ENGINE_MODELS)))]
+            length = int(rng.integers(8, 256))
+            requests.extend(api_requests(model_type, 1, length, line_seed))
+    return requests
+
+
+async def bench_api(app, modes: Dict[str, str], concurrency_levels: List[int], lengths: List[int],
+                    requests_per_level: int, replay_path: Optional[str]) -> List[Dict[str, Any]]:
+    import httpx
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for model_type in ENGINE_MODELS:
+            for length in lengths:
+                for concurrency in concurrency_levels:
+                    # Distinct seeds per run so the prediction cache does not serve repeats
+                    seed = stable_seed(model_type, length, concurrency)
+                    requests = api_requests(model_type, requests_per_level, length, seed)
+                    latencies, wall, failures = await _drive(client, requests, concurrency)
+                    results.append({
+                        "scenario": "api",
+                        "model": model_type,
+                        "engine_mode": modes[model_type],
+                        "concurrency": concurrency,
+                        "length": length,
+                        "failures": failures,
+                        **summarize(latencies, len(requests), wall)
+                    })
+        if replay_path and os.path.exists(replay_path):
+            requests = replay_requests(replay_path, seed=0)
+            for concurrency in concurrency_levels:
+                latencies, wall, failures = await _drive(client, requests, concurrency)
+                results.append({
+                    "scenario": "replay",
+                    "source": os.path.basename(replay_path),
+                    "concurrency": concurrency,
+                    "failures": failures,
+                    **summarize(latencies, len(requests), wall)
+                })
+    return results
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of module in a fresh interpreter, as reported by -X importtime"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env={**os.environ, "PYTHONPATH": PROJECT_ROOT}, capture_output=True, text=True, check=True
+    )
+    for line in reversed(proc.stderr.splitlines()):
+        # Anything else on stderr (warnings, log lines from import side effects) is not part of the report
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    raise RuntimeError(f"{module} missing from -X importtime output")
+
+
+def bench_imports(budgets: Dict[str, float], repeats: int = 3) -> List[Dict[str, Any]]:
+    """Best-of-repeats cold import time per module against its budget"""
+    return [
+        {
+            "module": module,
+            "import_ms": round(min(import_time_ms(module) for _ in range(repeats)), 1),
+            "budget_ms": budget
+        }
+        for module, budget in budgets.items()
+    ]
+
+
+def import_regressions(imports: List[Dict[str, Any]]) -> List[str]:
+    return [
+        f"import {row['module']}: {row['import_ms']} ms over budget {row['budget_ms']} ms"
+        for row in imports if row["import_ms"] > row["budget_ms"]
+    ]
+
+
+def scenario_key(result: Dict[str, Any]) -> str:
+    parts = [result["scenario"]]
+    for field in ("model", "engine_mode", "source", "batch_size", "concurrency", "length"):
+        if field in result:
+            parts.append(f"{field}={result[field]}")
+    return "|".join(parts)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Scenarios whose p99 grew or throughput shrank by more than tolerance (a fraction)"""
+    regressions = []
+    baseline_results = {scenario_key(r): r for r in baseline.get("results", [])}
+    for result in current["results"]:
+        reference = baseline_results.get(scenario_key(result))
+        if reference is None:
+            continue
+        if reference["p99_ms"] > 0 and result["p99_ms"] > reference["p99_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{scenario_key(result)}: p99 {result['p99_ms']} ms vs baseline {reference['p99_ms']} ms"
+            )
+        if result["throughput_items_per_s"] < reference["throughput_items_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario_key(result)}: throughput {result['throughput_items_per_s']}/s "
+                f"vs baseline {reference['throughput_items_per_s']}/s"
+            )
+    return regressions
+
+
+def run(args) -> Dict[str, Any]:
+    # Measured first, in subprocesses, so nothing below has warmed the import caches
+    imports = bench_imports({**IMPORT_BUDGETS_MS, **args.import_budget}) if "imports" in args.scenarios else []
+
+    results = []
+    if "engine" in args.scenarios or "api" in args.scenarios:
+        from src.main import app, registry
+
+        registry.prewarm(ENGINE_MODELS)
+    if "engine" in args.scenarios:
+        results.extend(bench_engines(registry, args.batch_sizes, args.lengths, args.repeats))
+    if "api" in args.scenarios:
+        results.extend(asyncio.run(
+            bench_api(app, engine_modes(registry), args.concurrency, args.lengths, args.requests, args.replay)
+        ))
+    return {
+        "created": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count()
+        },
+        "imports": imports,
+        "results": results
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark Nexa inference engines and API")
+    parser.add_argument("--scenarios", nargs="+", default=["imports", "engine", "api"],
+                        choices=["imports", "engine", "api"])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32, 128])
+    parser.add_argument("--lengths", nargs="+", type=int, default=[16, 128, 512])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--repeats", type=int, default=20, help="predict_batch calls per engine scenario")
+    parser.add_argument("--requests", type=int, default=200, help="HTTP requests per API scenario")
+    parser.add_argument("--replay", default=os.path.join(PROJECT_ROOT, "requests.jsonl"),
+                        help="JSON Lines request log to replay (skipped if missing)")
+    parser.add_argument("--output", default=os.path.join(PROJECT_ROOT, "benchmarks", "results.json"))
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--import-budget", nargs="+", default=[], metavar="MODULE=MS",
+                        help="Override or add cold-import budgets, e.g. src.main=2000")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative regression before failing (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    try:
+        args.import_budget = {
+            module: float(ms) for module, ms in (item.split("=", 1) for item in args.import_budget)
+        }
+    except ValueError:
+        parser.error("--import-budget takes MODULE=MS")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    args = parse_args(argv)
+    report = run(args)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    for row in report["imports"]:
+        print(f"{'import ' + row['module']:60s} {row['import_ms']:>9.1f} ms (budget {row['budget_ms']} ms)")
+    for result in report["results"]:
+        print(f"{scenario_key(result):60s} {result['throughput_items_per_s']:>12.1f}/s "
+              f"p50 {result['p50_ms']:>9.3f} p95 {result['p95_ms']:>9.3f} p99 {result['p99_ms']:>9.3f} ms")
+    regressions = import_regressions(report["imports"])
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions.extend(compare(report, json.load(f), args.tolerance))
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+# Gunicorn settings for the Lambda0 API
+import os
+
+from prometheus_client import multiprocess
+
+bind = "0.0.0.0:8000"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def pre_fork(server, worker):
+    # Runs in the arbiter: give the new worker the lowest slot no live worker holds, so a
+    # replacement takes over the cores of the worker it replaces (worker.age keeps growing).
+    # Pids are only known after the fork, so workers spawned earlier are recorded here
+    slots = server.__dict__.setdefault("nexa_worker_slots", {})
+    for pid, live in server.WORKERS.items():
+        slots[pid] = live.nexa_slot
+    taken = set(slots.values())
+    worker.nexa_slot = next(slot for slot in range(len(taken) + 1) if slot not in taken)
+
+
+def post_fork(server, worker):
+    # Runs in the new worker: lets src.runtime give it its own share of the cores
+    os.environ["NEXA_WORKER_INDEX"] = str(worker.nexa_slot)
+    os.environ["WEB_CONCURRENCY"] = str(server.num_workers)
+
+
+def child_exit(server, worker):
+    server.__dict__.setdefault("nexa_worker_slots", {}).pop(worker.pid, None)
+    # Drop the dead worker's live gauges from the shared Prometheus directory
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
@@ -20,6 +20,14 @@ class Config:
 
         with open(self.config_file, 'r') as f:
             self.settings = json.load(f)
+        self.validate()
+
+    def validate(self):
+        """Reject per-model precision settings the engines cannot run."""
+        from src.precision import check_precision
+
+        for model_key, options in self.settings.get("models", {}).items():
+            check_precision(model_key, options.get("precision", "fp32"))
 
     def get(self, key, default=None):
         """Get a configuration setting by key."""
@@ -28,4 +28,26 @@ def validate_request(schema, request_data):
         return validated
     except ValidationError as e:
         logging.error(f"Request validation failed: {e}")
-        raise ValueError(f"Invalid request data: {e}")
\ No newline at end of file
+        raise ValueError(f"Invalid request data: {e}")
+
+def to_columnar(records):
+    """
+    Converts a list of dicts into a dict of lists, one list per field.
+    Nested dicts are converted recursively so every leaf becomes a column.
+
+    Parameters:
+        records: List of dictionaries sharing the same keys.
+
+    Returns:
+        A dictionary mapping each field to the list of its values.
+    """
+    if not records:
+        return {}
+    columns = {}
+    for key, value in records[0].items():
+        values = [record.get(key) for record in records]
+        if isinstance(value, dict):
+            columns[key] = to_columnar([v if isinstance(v, dict) else {} for v in values])
+        else:
+            columns[key] = values
+    return columns
@@ -1,15 +1,38 @@
 # package file for src
-from .inference import load_torch_model, predict
-from .models import BiologyRequest, MaterialsRequest, DatasetRequest
-from .Config import Config
-from .Utils import setup_logging, validate_request
-__all__ = [
-    "load_torch_model",
-    "predict",
-    "BiologyRequest",
-    "MaterialsRequest",
-    "DatasetRequest",
-    "Config",
-    "setup_logging",
-    "validate_request"
-]
+# Exports resolve lazily (PEP 562) so importing the package does not pull in torch or pydantic
+import importlib
+
+_EXPORTS = {
+    "load_torch_model": ".inference",
+    "predict": ".inference",
+    "BiologyRequest": ".models",
+    "MaterialsRequest": ".models",
+    "BiologyBatchRequest": ".models",
+    "MaterialsBatchRequest": ".models",
+    "BiologyStructureRequest": ".models",
+    "DatasetRequest": ".models",
+    "JobRequest": ".models",
+    "MaterialsScreeningRequest": ".models",
+    "AstroRequest": ".models",
+    "AstroBatchRequest": ".models",
+    "HEPRequest": ".models",
+    "HEPBatchRequest": ".models",
+    "Config": ".Config",
+    "setup_logging": ".Utils",
+    "validate_request": ".Utils",
+    "to_columnar": ".Utils"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,305 @@
+import asyncio
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from src.metrics import AUDIT_RECORDS
+from src.serialization import json_default
+
+logger = logging.getLogger(__name__)
+
+# Column order shared by the SQL sinks
+AUDIT_COLUMNS = ("ts", "model_key", "model", "version", "input_hash", "latency_ms", "source", "result")
+
+
+def input_hash(input_data: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON form of one prediction input"""
+    payload = json.dumps(input_data, sort_keys=True, separators=(",", ":"), default=json_default)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class JsonlSink:
+    """
+    Gzip-compressed JSON Lines files in directory, one file per process at a time.
+    Every batch is appended as its own gzip member, so a file stays readable even
+    if the process dies mid-write. Files rotate at max_bytes and only the newest
+    max_files are kept.
+    """
+    name = "jsonl"
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024, max_files: int = 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self._path: Optional[str] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _rotate(self):
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self._path = os.path.join(self.directory, f"audit-{stamp}-{os.getpid()}.jsonl.gz")
+        files = sorted(glob.glob(os.path.join(self.directory, "audit-*.jsonl.gz")), key=os.path.getmtime)
+        for old in files[:max(0, len(files) - self.max_files + 1)]:
+            os.remove(old)
+
+    def write(self, rows: List[Dict[str, Any]]):
+        if self._path is None or (os.path.exists(self._path) and os.path.getsize(self._path) >= self.max_bytes):
+            self._rotate()
+        lines = "".join(json.dumps(row, separators=(",", ":"), default=json_default) + "\n" for row in rows)
+        with gzip.open(self._path, "ab") as f:
+            f.write(lines.encode())
+
+    def close(self):
+        pass
+
+
+class SqliteSink:
+    """Audit rows in a SQLite table over one long-lived WAL-mode connection"""
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Writes arrive from worker threads, one batch at a time
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS prediction_audit (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "ts TEXT, model_key TEXT, model TEXT, version TEXT, input_hash TEXT, latency_ms REAL, "
+                "source TEXT, result TEXT)"
+            )
+            self._conn.commit()
+
+    def write(self, rows: List[Dict[str, Any]]):
+        values = [_sql_values(row) for row in rows]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO prediction_audit ({', '.join(AUDIT_COLUMNS)}) VALUES ({', '.join('?' * len(AUDIT_COLUMNS))})",
+                values
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PostgresSink:
+    """Audit rows in Postgres through a psycopg2 connection pool; one multi-row INSERT per batch"""
+    name = "postgres"
+
+    def __init__(self, dsn: str, min_connections: int = 1, max_connections: int = 4):
+        import psycopg2.extras
+        import psycopg2.pool
+
+        self._extras = psycopg2.extras
+        self._pool = psycopg2.pool.ThreadedConnectionPool(min_connections, max_connections, dsn)
+        conn = self._pool.getconn()
+        try:
+            with conn, conn.cursor() as cur:
+                cur.execute(
+                    "CREATE TABLE IF NOT EXISTS prediction_audit (id BIGSERIAL PRIMARY KEY, "
+                    "ts TIMESTAMPTZ, model_key TEXT, model TEXT, version TEXT, input_hash TEXT, "
+                    "latency_ms DOUBLE PRECISION, source TEXT, result JSONB)"
+                )
+        finally:
+            self._pool.putconn(conn)
+
+    def write(self, rows: List[Dict[str, Any]]):
+        conn = self._pool.getconn()
+        try:
+            with conn, conn.cursor() as cur:
+                self._extras.execute_values(
+                    cur, f"INSERT INTO prediction_audit ({', '.join(AUDIT_COLUMNS)}) VALUES %s",
+                    [_sql_values(row) for row in rows]
+                )
+        finally:
+            self._pool.putconn(conn)
+
+    def close(self):
+        self._pool.closeall()
+
+
+def _sql_values(row: Dict[str, Any]) -> tuple:
+    values = [row.get(column) for column in AUDIT_COLUMNS]
+    if values[-1] is not None:
+        values[-1] = json.dumps(values[-1], separators=(",", ":"), default=json_default)
+    return tuple(values)
+
+
+def postgres_dsn(settings: Dict[str, Any]) -> Optional[str]:
+    """DSN from settings, else from the POSTGRES_* variables set by docker-compose and k8s"""
+    if settings.get("postgres_dsn"):
+        return settings["postgres_dsn"]
+    host = os.getenv("POSTGRES_HOST")
+    if not host:
+        return None
+    return (
+        f"host={host} port={os.getenv('POSTGRES_PORT', '5432')} dbname={os.getenv('POSTGRES_DB', 'helixsynth')} "
+        f"user={os.getenv('POSTGRES_USER', 'helixsynth')} password={os.getenv('POSTGRES_PASSWORD', '')}"
+    )
+
+
+def make_audit_sink(settings: Dict[str, Any]):
+    """Build the configured sink; falls back to JSONL files when Postgres is unavailable"""
+    kind = settings.get("sink", "jsonl")
+    if kind == "postgres":
+        dsn = postgres_dsn(settings)
+        try:
+            if not dsn:
+                raise ValueError("no postgres_dsn or POSTGRES_HOST configured")
+            return PostgresSink(dsn, max_connections=settings.get("pool_size", 4))
+        except Exception as e:
+            logger.warning(f"Postgres audit sink unavailable, writing JSONL files instead: {str(e)}")
+            kind = "jsonl"
+    if kind == "sqlite":
+        return SqliteSink(settings.get("sqlite_path", "/tmp/nexa-audit/audit.db"))
+    if kind == "jsonl":
+        return JsonlSink(
+            settings.get("directory", "/tmp/nexa-audit"),
+            max_bytes=int(settings.get("max_file_mb", 64) * 1024 * 1024),
+            max_files=settings.get("max_files", 20)
+        )
+    raise ValueError(f"Unknown audit sink: {kind}")
+
+
+class AuditLog:
+    """
+    Append-only prediction audit trail. record() only appends references to a
+    bounded in-memory ring buffer; a background task drains it every
+    flush_interval_s (or sooner once batch_size records are waiting), hashes the
+    inputs and hands the batch to the sink on a worker thread. When the buffer is
+    full the oldest records are dropped and counted rather than slowing requests.
+    A batch the sink rejects goes back to the front of the buffer, and writes
+    back off exponentially (up to max_backoff_s) until the sink recovers.
+    """
+
+    def __init__(self, sink, capacity: int = 100000, batch_size: int = 1000, flush_interval_s: float = 1.0,
+                 include_results: bool = True, max_backoff_s: float = 60.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_s
+        self.include_results = include_results
+        self.max_backoff = max_backoff_s
+        self._buffer: deque = deque(maxlen=capacity)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _drop(self, count: int):
+        self.dropped += count
+        AUDIT_RECORDS.labels("dropped").inc(count)
+
+    def record(self, model_key: str, labels: tuple, inputs: List[Dict[str, Any]], results: List[Dict[str, Any]],
+               latency_s: float, sources: List[str]):
+        """Queue one audit record per input; never blocks on I/O"""
+        now = time.time()
+        overflow = len(self._buffer) + len(inputs) - self._buffer.maxlen
+        if overflow > 0:
+            self._drop(overflow)
+        for input_data, result, source in zip(inputs, results, sources):
+            self._buffer.append((now, model_key, labels, input_data, result, latency_s, source))
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _rows(self, records: list) -> List[Dict[str, Any]]:
+        return [
+            {
+                "ts": datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+                "model_key": model_key,
+                "model": labels[0],
+                "version": labels[1],
+                "input_hash": input_hash(input_data),
+                "latency_ms": round(latency_s * 1000, 3),
+                "source": source,
+                "result": result if self.include_results else None
+            }
+            for ts, model_key, labels, input_data, result, latency_s, source in records
+        ]
+
+    def _write(self, records: list):
+        """Format and write one batch; runs on a worker thread"""
+        self.sink.write(self._rows(records))
+
+    def _requeue(self, records: list):
+        """Put a failed batch back at the front, in order; if new records filled the buffer meanwhile, the oldest go"""
+        overflow = len(self._buffer) + len(records) - self._buffer.maxlen
+        if overflow > 0:
+            self._drop(overflow)
+            records = records[overflow:]
+        self._buffer.extendleft(reversed(records))
+
+    async def flush(self) -> bool:
+        """Write everything buffered so far, batch by batch; False when the sink failed and records remain"""
+        while self._buffer:
+            records = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            try:
+                await asyncio.to_thread(self._write, records)
+            except Exception as e:
+                self.failed += len(records)
+                AUDIT_RECORDS.labels("failed").inc(len(records))
+                self._requeue(records)
+                self._backoff = min(max(self.flush_interval, 2 * self._backoff), self.max_backoff)
+                self._retry_at = time.monotonic() + self._backoff
+                logger.error(
+                    f"Failed to write {len(records)} audit records to {self.sink.name}, "
+                    f"retrying in {self._backoff:.1f}s: {str(e)}"
+                )
+                return False
+            self._backoff = 0.0
+            self.written += len(records)
+            AUDIT_RECORDS.labels("written").inc(len(records))
+        return True
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self._stopping and time.monotonic() >= self._retry_at:
+                await self.flush()
+
+    def start(self):
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the background task, write what is left and close the sink. The task
+        is asked to stop rather than cancelled: a cancelled to_thread write keeps
+        running in its thread, and would race the final flush and the close.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        await asyncio.to_thread(self.sink.close)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sink": self.sink.name,
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
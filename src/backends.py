@@ -0,0 +1,153 @@
+import io
+import logging
+import os
+import warnings
+from typing import Optional
+
+import torch
+
+from src.inference import predict
+
+logger = logging.getLogger(__name__)
+
+def artifact_path(model_path: str, export_dir: Optional[str], suffix: str,
+                  variant: str = "fp32") -> Optional[str]:
+    """
+    Path of an exported artifact for a checkpoint. Like the mmap copies, the
+    source size and mtime are part of the name so a replaced checkpoint is
+    exported again; variant keeps exports of different precisions apart.
+    None when there is no export_dir or no checkpoint.
+    """
+    if not export_dir or not os.path.exists(model_path):
+        return None
+    stat = os.stat(model_path)
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    tag = "" if variant == "fp32" else f".{variant}"
+    return os.path.join(export_dir, f"{name}-{stat.st_size}-{int(stat.st_mtime)}{tag}{suffix}")
+
+
+class EagerBackend:
+    """The torch.nn.Module as loaded"""
+    name = "eager"
+    # Bytes held on top of the engine's own model; eager and compiled modules share its weights
+    memory_bytes = 0
+
+    def __init__(self, model: torch.nn.Module, example: torch.Tensor, **kwargs):
+        self.model = model
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        return predict(self.model, batch)
+
+
+class TorchScriptBackend(EagerBackend):
+    """
+    Traced and frozen TorchScript module; removes Python dispatch per layer.
+    Freezing folds the weights into the graph as constants, a second copy next
+    to the engine's eager model, so its serialized size is counted as memory.
+    """
+    name = "torchscript"
+
+    def __init__(self, model: torch.nn.Module, example: torch.Tensor, path: Optional[str] = None, **kwargs):
+        if path and os.path.exists(path):
+            self.model = torch.jit.load(path)
+            self.memory_bytes = os.path.getsize(path)
+            return
+        with torch.no_grad():
+            traced = torch.jit.trace(model.eval(), example)
+        self.model = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+        buffer = io.BytesIO()
+        torch.jit.save(self.model, buffer)
+        self.memory_bytes = buffer.tell()
+        if path:
+            save_atomic(path, lambda f: f.write(buffer.getvalue()))
+
+
+class CompileBackend(EagerBackend):
+    """torch.compile with dynamic batch sizes; the first call pays the compilation"""
+    name = "compile"
+
+    def __init__(self, model: torch.nn.Module, example: torch.Tensor, **kwargs):
+        self.model = torch.compile(model.eval(), dynamic=True)
+
+
+class OnnxBackend:
+    """ONNX graph executed by ONNX Runtime on CPU"""
+    name = "onnx"
+
+    def __init__(self, model: torch.nn.Module, example: torch.Tensor, path: Optional[str] = None, **kwargs):
+        import onnxruntime as ort
+
+        if path and os.path.exists(path):
+            source = path
+        else:
+            source = export_onnx(model, example)
+            if path:
+                save_atomic(path, lambda f: f.write(source))
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(source, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        # The session keeps its own copy of the weights (initializers), about the size of the graph
+        self.memory_bytes = os.path.getsize(source) if isinstance(source, str) else len(source)
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        output = self.session.run(None, {self.input_name: batch.detach().cpu().float().numpy()})[0]
+        return torch.from_numpy(output)
+
+
+BACKEND_CLASSES = {
+    "eager": EagerBackend,
+    "torchscript": TorchScriptBackend,
+    "compile": CompileBackend,
+    "onnx": OnnxBackend
+}
+BACKENDS = tuple(BACKEND_CLASSES)
+# Backends whose compiled form is written to export_dir and reused by later workers
+ARTIFACT_SUFFIXES = {"torchscript": ".ts.pt", "onnx": ".onnx"}
+
+
+def export_onnx(model: torch.nn.Module, example: torch.Tensor) -> bytes:
+    """Serialized ONNX graph with a dynamic batch dimension"""
+    buffer = io.BytesIO()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        torch.onnx.export(
+            model.eval(), (example,), buffer, input_names=["input"], output_names=["output"],
+            dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}}, dynamo=False
+        )
+    return buffer.getvalue()
+
+
+def save_atomic(path: str, write):
+    """Write an artifact through a private temp file so concurrent workers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def build_backend(name: str, model: torch.nn.Module, example: torch.Tensor, model_path: str = "",
+                  export_dir: Optional[str] = None, variant: str = "fp32"):
+    """
+    Wrap model in the named backend and run one warm-up call on example.
+    Backends that cannot be built (missing onnxruntime, unsupported ops, an
+    unknown name, a non-CPU device for ONNX) fall back to eager.
+    """
+    if name not in BACKEND_CLASSES:
+        logger.error(f"Unknown backend '{name}' for {model_path}; using eager")
+        name = "eager"
+    if name == "onnx" and example.device.type != "cpu":
+        logger.warning(f"ONNX Runtime backend is CPU-only; using eager for {model_path} on {example.device}")
+        name = "eager"
+    path = artifact_path(model_path, export_dir, ARTIFACT_SUFFIXES[name], variant) \
+        if name in ARTIFACT_SUFFIXES else None
+    try:
+        backend = BACKEND_CLASSES[name](model, example, path=path)
+        backend(example)
+        return backend
+    except Exception as e:
+        if name == "eager":
+            raise
+        logger.error(f"Failed to build {name} backend for {model_path}, using eager: {str(e)}")
+        return EagerBackend(model, example)
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.executor import InferenceExecutor, QueueFullError
+from src.metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent predict calls for one engine into batched forward passes.
+    A batch is flushed when it reaches max_batch_size or when the oldest queued
+    request has waited max_wait_ms, whichever comes first. Batches run on the
+    executor pool under the engine's concurrency limit; while every slot is
+    busy new requests queue up to max_queue_size and are rejected after that.
+    The engine is resolved through get_engine for every batch, so an engine
+    evicted from the registry is not kept alive by its batcher.
+    """
+
+    def __init__(self, get_engine: Callable[[], Awaitable[Any]], executor: InferenceExecutor, key: str, max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, max_queue_size: int = 1024, labels: Tuple[str, str] = ("", "")):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.get_engine = get_engine
+        self.executor = executor
+        self.key = key
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.labels = labels
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight = set()
+
+    async def submit(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue one input and wait for its own result"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((input_data, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            raise QueueFullError(self.key, self.executor.retry_after)
+        return await future
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._worker.get_loop() is loop:
+            return
+        old_queue, old_worker = self._queue, self._worker
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = loop.create_task(self._run())
+        if old_queue is not None:
+            self._drain(old_queue, old_worker, loop)
+
+    def _drain(self, queue: asyncio.Queue, worker: asyncio.Task, loop: asyncio.AbstractEventLoop):
+        """
+        Requests left in a replaced worker's queue: handed to the new worker when
+        they belong to this loop, otherwise failed on their own loop (if it still runs)
+        """
+        pending = []
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+        if worker.done() and not worker.cancelled() and worker.exception() is not None:
+            logger.error(f"Batch worker for {self.key} stopped: {str(worker.exception())}")
+        if not pending:
+            return
+        old_loop = worker.get_loop()
+        if old_loop is loop:
+            # Same maxsize as the old queue, so everything fits
+            for item in pending:
+                self._queue.put_nowait(item)
+            logger.info(f"Handed {len(pending)} queued requests for {self.key} to a new batch worker")
+        elif not old_loop.is_closed():
+            error = RuntimeError(f"Batch worker for {self.key} moved to another event loop")
+            old_loop.call_soon_threadsafe(self._fail, pending, error)
+
+    async def _collect(self) -> List[Tuple[Dict[str, Any], asyncio.Future, float]]:
+        """Block for the first item, then gather more until the batch is full or the wait expires"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        limiter = self.executor.limiter(self.key)
+        while True:
+            batch = await self._collect()
+            # Hold further collection until the engine has a free slot, so excess load backs up in the queue
+            await limiter.acquire()
+            task = asyncio.get_running_loop().create_task(self._dispatch_and_release(batch, limiter))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch_and_release(self, batch, limiter: asyncio.Semaphore):
+        started = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            observe_stage(*self.labels, "queue_wait", started - enqueued_at)
+        try:
+            await self._dispatch(batch)
+        finally:
+            limiter.release()
+
+    async def _dispatch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]]):
+        inputs = [input_data for input_data, _, _ in batch]
+        try:
+            engine = await self.get_engine()
+        except Exception as e:
+            # No engine means no input can succeed, so retrying them one by one would only repeat the load
+            self._fail(batch, e)
+            return
+        try:
+            results = await self.executor.run(engine, "predict_batch", inputs)
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+            # Isolate the failing input instead of failing every caller in the batch
+            logger.warning(f"Batch of {len(batch)} failed, retrying individually: {str(e)}")
+            for item in batch:
+                await self._dispatch([item])
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(batch, error: Exception):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
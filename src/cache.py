@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from src.metrics import CACHE_LOOKUPS
+from src.serialization import json_default
+
+logger = logging.getLogger(__name__)
+
+
+def prediction_key(family: str, version: str, checkpoint_hash: str, input_data: Dict[str, Any]) -> str:
+    """
+    Content address of one prediction. The input is canonicalised (sorted keys,
+    floats as floats) so equivalent payloads map to the same key.
+    """
+    normalized = {
+        key: float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+        for key, value in input_data.items()
+    }
+    payload = json.dumps([family, version, checkpoint_hash, normalized], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a per-entry TTL"""
+
+    def __init__(self, max_entries: int = 100000, ttl_s: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl_s
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """
+    Shared tier backed by any Redis-compatible server through an asyncio client
+    (redis.asyncio.Redis or a drop-in with mget/set). After an error the tier is
+    skipped for retry_interval_s so an unreachable server does not add latency
+    to every request.
+    """
+
+    def __init__(self, client, ttl_s: float = 3600, prefix: str = "nexa:pred:", retry_interval_s: float = 30.0):
+        self.client = client
+        self.ttl = ttl_s
+        self.prefix = prefix
+        self.retry_interval = retry_interval_s
+        self.errors = 0
+        self._disabled_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _failed(self, error: Exception):
+        self.errors += 1
+        self._disabled_until = time.monotonic() + self.retry_interval
+        logger.warning(f"Redis cache unavailable, bypassing for {self.retry_interval}s: {str(error)}")
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys or not self.available:
+            return [None] * len(keys)
+        try:
+            values = await self.client.mget([self.prefix + key for key in keys])
+        except Exception as e:
+            self._failed(e)
+            return [None] * len(keys)
+        return [json.loads(value) if value is not None else None for value in values]
+
+    async def set_many(self, items: Dict[str, Any]):
+        if not items or not self.available:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(self.prefix + key, json.dumps(value, default=json_default), ex=int(self.ttl))
+            await pipe.execute()
+        except Exception as e:
+            self._failed(e)
+
+
+def make_redis_cache(host: Optional[str], port: int = 6379, ttl_s: float = 3600) -> Optional[RedisCache]:
+    """Build the Redis tier when a host is configured and the redis package is installed"""
+    if not host:
+        return None
+    try:
+        import redis.asyncio as redis_asyncio
+    except ImportError:
+        logger.warning("REDIS_HOST is set but the redis package is not installed; using the local cache only")
+        return None
+    client = redis_asyncio.Redis(host=host, port=port, socket_timeout=0.05, socket_connect_timeout=0.05)
+    return RedisCache(client, ttl_s=ttl_s)
+
+
+class PredictionCache:
+    """
+    Two-tier prediction cache: an in-process LRU in front of an optional shared
+    Redis tier. Remote hits are copied into the local tier.
+    """
+
+    def __init__(self, local: LRUCache, remote: Optional[RedisCache] = None):
+        self.local = local
+        self.remote = remote
+        self.hits_local = 0
+        self.hits_remote = 0
+        self.misses = 0
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        results = [self.local.get(key) for key in keys]
+        missing = [i for i, value in enumerate(results) if value is None]
+        self.hits_local += len(keys) - len(missing)
+        if missing and self.remote is not None:
+            remote_values = await self.remote.get_many([keys[i] for i in missing])
+            for i, value in zip(missing, remote_values):
+                if value is not None:
+                    results[i] = value
+                    self.local.set(keys[i], value)
+                    self.hits_remote += 1
+        misses = sum(value is None for value in results)
+        self.misses += misses
+        CACHE_LOOKUPS.labels("hit_local").inc(len(keys) - len(missing))
+        CACHE_LOOKUPS.labels("hit_remote").inc(len(missing) - misses)
+        CACHE_LOOKUPS.labels("miss").inc(misses)
+        return results
+
+    async def get(self, key: str) -> Optional[Any]:
+        return (await self.get_many([key]))[0]
+
+    async def set_many(self, items: Dict[str, Any]):
+        for key, value in items.items():
+            self.local.set(key, value)
+        if self.remote is not None:
+            await self.remote.set_many(items)
+
+    async def set(self, key: str, value: Any):
+        await self.set_many({key: value})
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits_local + self.hits_remote + self.misses
+        return {
+            "hits_local": self.hits_local,
+            "hits_remote": self.hits_remote,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits_local + self.hits_remote) / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+            "remote_errors": self.remote.errors if self.remote is not None else 0
+        }
@@ -0,0 +1,153 @@
+import io
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.synthetic import column_chunks
+
+BIO_FIELDS = ["sequence", "structure", "confidence", "length"]
+MATERIALS_FIELDS = [
+    "formation_energy_per_atom",
+    "energy_per_atom",
+    "density",
+    "volume",
+    "n_elements",
+    "li_fraction",
+    "predicted_band_gap",
+    "confidence_score"
+]
+DATASET_FIELDS = {"bio": BIO_FIELDS, "materials": MATERIALS_FIELDS}
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# Rows per generated and encoded chunk: large enough to amortise per-chunk overhead, small enough to keep memory flat
+CHUNK_ROWS = 20000
+
+
+def _format_rows(columns: Dict[str, np.ndarray], fields: List[str], row_template: str) -> str:
+    """
+    Render every row of a column chunk with one %-format call over the
+    interleaved values, instead of formatting row by row in Python.
+    """
+    n = len(columns[fields[0]])
+    values = np.empty((n, len(fields)), dtype=object)
+    for j, field in enumerate(fields):
+        values[:, j] = columns[field].tolist()
+    return (row_template * n) % tuple(values.ravel().tolist())
+
+
+def _json_template(columns: Dict[str, np.ndarray], fields: List[str]) -> str:
+    # Generated strings come from fixed alphabets, so they never need JSON escaping
+    parts = [
+        f'"{field}": "%s"' if columns[field].dtype.kind == "U" else f'"{field}": %s'
+        for field in fields
+    ]
+    return "{" + ", ".join(parts) + "}"
+
+
+def _arrow_csv(columns: Dict[str, np.ndarray], fields: List[str]) -> bytes:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    buffer = io.BytesIO()
+    table = pa.Table.from_pydict({field: columns[field] for field in fields})
+    pa_csv.write_csv(table, buffer, pa_csv.WriteOptions(include_header=False, quoting_style="none"))
+    return buffer.getvalue()
+
+
+def stream_csv(chunks: Iterator[Dict[str, np.ndarray]], fields: List[str]) -> Iterator:
+    """CSV text, one generated chunk at a time; float formatting runs in Arrow's C++ writer when available"""
+    yield ",".join(fields) + "\n"
+    use_arrow = pyarrow_available()
+    row_template = ",".join(["%s"] * len(fields)) + "\n"
+    for columns in chunks:
+        yield _arrow_csv(columns, fields) if use_arrow else _format_rows(columns, fields, row_template)
+
+
+def stream_ndjson(chunks: Iterator[Dict[str, np.ndarray]], fields: List[str]) -> Iterator[str]:
+    """One JSON object per line, one generated chunk at a time"""
+    for columns in chunks:
+        yield _format_rows(columns, fields, _json_template(columns, fields) + "\n")
+
+
+def stream_json_array(chunks: Iterator[Dict[str, np.ndarray]], fields: List[str]) -> Iterator[str]:
+    """A single JSON array, emitted in chunks instead of being built in full"""
+    yield "["
+    first = True
+    for columns in chunks:
+        body = _format_rows(columns, fields, _json_template(columns, fields) + ", ")[:-2]
+        yield body if first else ", " + body
+        first = False
+    yield "]"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after every Parquet row group"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_parquet(chunks: Iterator[Dict[str, np.ndarray]], fields: List[str]) -> Iterator[bytes]:
+    """Parquet file written one row group per chunk; requires pyarrow"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    for columns in chunks:
+        table = pa.Table.from_pydict({field: columns[field] for field in fields})
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow.csv  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_dataset(model_type: str, size: int, fmt: str, seed: Optional[int] = None) -> Iterator:
+    """Encoded dataset chunks; the same seed always produces the same bytes"""
+    chunks = column_chunks(model_type, size, seed=seed, chunk_rows=CHUNK_ROWS)
+    fields = DATASET_FIELDS[model_type]
+    if fmt == "csv":
+        return stream_csv(chunks, fields)
+    if fmt == "ndjson":
+        return stream_ndjson(chunks, fields)
+    if fmt == "json":
+        return stream_json_array(chunks, fields)
+    if fmt == "parquet":
+        return stream_parquet(chunks, fields)
+    raise ValueError(f"Unsupported dataset format: {fmt}")
@@ -1,25 +1,208 @@
 import torch
+import numpy as np
 from abc import ABC, abstractmethod
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 import os
+import re
 import time
-from src.inference import load_torch_model
+from src.backends import build_backend
+from src.inference import load_torch_model, load_state_dict
+from src.metrics import BATCH_SIZE, model_labels, observe_bucket, stage_timer
+from src.models import MATERIALS_PROPERTIES
+from src.networks import RESIDUE_WINDOW, HelixSynthVAE, ParticleCNN, StellarClassifier
+from src.precision import apply_precision
 from datetime import datetime
-import random
+from src.synthetic import random_material_structures, random_sequences
 
 logger = logging.getLogger(__name__)
 
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+AMINO_ACID_LUT = torch.full((128,), -1, dtype=torch.long)
+AMINO_ACID_LUT[torch.tensor([ord(aa) for aa in AMINO_ACIDS])] = torch.arange(len(AMINO_ACIDS))
+STRUCTURE_FEATURES = 100
+
+# Upper sequence-length bounds of the bio length buckets; longer sequences share one overflow bucket
+DEFAULT_LENGTH_BUCKETS = [32, 64, 128, 256, 512, 1024]
+
+SECONDARY_STRUCTURE_CLASSES = "HEC"
+# Chou-Fasman propensities (helix, strand, coil) per residue, in AMINO_ACIDS order
+CHOU_FASMAN_PROPENSITIES = torch.tensor([
+    [1.42, 0.83, 0.66], [0.70, 1.19, 1.19], [1.01, 0.54, 1.46], [1.51, 0.37, 0.74], [1.13, 1.38, 0.60],
+    [0.57, 0.75, 1.56], [1.00, 0.87, 0.95], [1.08, 1.60, 0.47], [1.16, 0.74, 1.01], [1.21, 1.30, 0.59],
+    [1.45, 1.05, 0.60], [0.67, 0.89, 1.56], [0.57, 0.55, 1.52], [1.11, 1.10, 0.98], [0.98, 0.93, 0.95],
+    [0.77, 0.75, 1.43], [0.83, 1.19, 0.96], [1.06, 1.70, 0.50], [1.08, 1.37, 0.96], [0.69, 1.47, 1.14]
+])
+# Residues averaged around each position when scoring, as in Chou-Fasman nucleation
+PROPENSITY_WINDOW = 7
+# Weight of the VAE reconstruction when mixed into the observed residue profile as pseudocounts
+RECONSTRUCTION_WEIGHT = 1.0
+# Default confidence_threshold when a request leaves it unset. HelixSynth confidence is the mean
+# per-residue probability of the predicted H/E/C class, so chance level is 1/3 and real sequences
+# score roughly 0.4-0.7; the mock engines report a fixed 0.89-0.92.
+HELIXSYNTH_CONFIDENCE_THRESHOLD = 0.4
+MOCK_CONFIDENCE_THRESHOLD = 0.8
+# Idealised C-alpha geometry per class (rise along the axis in A, twist in degrees, radius in A);
+# every class gives consecutive C-alpha distances of about 3.8 A
+CA_RISE = torch.tensor([1.5, 3.3, 1.6])
+CA_TWIST = torch.deg2rad(torch.tensor([100.0, 180.0, 120.0]))
+CA_RADIUS = torch.tensor([2.3, 1.0, 2.0])
+
+# Stand-in materials scorer until the NexaMat weights are wired up: per element the atomic mass (u),
+# Pauling electronegativity, volume per atom in the solid (A^3) and cohesive energy (eV/atom)
+MATERIAL_ELEMENTS = {
+    "Li": (6.94, 0.98, 21.6, 1.63),
+    "Na": (22.99, 0.93, 39.5, 1.11),
+    "K": (39.10, 0.82, 76.2, 0.93),
+    "Mg": (24.31, 1.31, 23.2, 1.51),
+    "Al": (26.98, 1.61, 16.6, 3.39),
+    "Si": (28.09, 1.90, 20.0, 4.63),
+    "O": (16.00, 3.44, 14.0, 2.60),
+    "N": (14.01, 3.04, 13.0, 4.92),
+    "S": (32.06, 2.58, 25.8, 2.85)
+}
+MATERIAL_ANIONS = ("O", "N", "S")
+# Two-letter symbols first so "Si" is not read as "S" followed by a stray "i"
+MATERIAL_SYMBOLS = re.compile("|".join(sorted(MATERIAL_ELEMENTS, key=len, reverse=True)))
+ATOMIC_MASS_G = 1.66054  # g/cm^3 per (u / A^3)
+
+
+def composition_properties(structure: str) -> Dict[str, Any]:
+    """
+    Deterministic properties from the element symbols in a structure string
+    (characters that spell no known element are skipped). The anion/cation
+    electronegativity gap gives Pauling's ionic character, which scales band gap
+    and formation energy, most strongly near a balanced anion share; volume and
+    density add up per-atom volumes and masses. confidence_score is the percentage
+    of the string read as elements.
+    """
+    atoms = MATERIAL_SYMBOLS.findall(structure)
+    if not atoms:
+        return {**{name: None for name in MATERIALS_PROPERTIES}, "confidence_score": 0.0}
+    mass, electronegativity, volume, cohesive = map(np.array, zip(*(MATERIAL_ELEMENTS[atom] for atom in atoms)))
+    anion = np.isin(atoms, MATERIAL_ANIONS)
+    anion_share = anion.mean()
+    if anion.any() and not anion.all():
+        gap = electronegativity[anion].mean() - electronegativity[~anion].mean()
+        ionicity = (1 - np.exp(-0.25 * gap ** 2)) * 4 * anion_share * (1 - anion_share)
+    else:
+        ionicity = 0.0
+    formation_energy = -2.0 * ionicity if ionicity else 0.0
+    return {
+        "formation_energy_per_atom": round(float(formation_energy), 6),
+        "energy_per_atom": round(float(formation_energy - cohesive.mean()), 6),
+        "density": round(float(mass.sum() * ATOMIC_MASS_G / volume.sum()), 6),
+        "volume": round(float(volume.sum()), 6),
+        "n_elements": len(set(atoms)),
+        "li_fraction": round(atoms.count("Li") / len(atoms), 6),
+        "predicted_band_gap": round(float(4.0 * ionicity), 6),
+        "confidence_score": round(100.0 * sum(map(len, atoms)) / len(structure), 4)
+    }
+
+
+# NexaAstro input layout: the raw SDSS fields followed by colour indices between bands.
+# The checkpoint stores no feature or label names; class order follows sorted SDSS labels.
+ASTRO_CLASSES = ("GALAXY", "QSO", "STAR")
+ASTRO_FIELDS = ("u", "g", "r", "i", "z", "redshift", "alpha", "delta")
+ASTRO_REQUIRED_FIELDS = ("u", "g", "r", "i", "z", "redshift")
+# (band, band) index pairs into ASTRO_FIELDS; each adds one band-minus-band colour feature
+ASTRO_COLORS = torch.tensor([[0, 1], [1, 2], [2, 3], [3, 4], [0, 2], [1, 3], [2, 4], [0, 3], [1, 4], [0, 4]])
+
+# NexaHEP input: per-particle (pt, eta, phi, energy), the highest-pt particles first,
+# zero-padded or truncated to a fixed window so results never depend on batch composition
+HEP_CLASSES = ("qcd", "w", "top")
+HEP_PARTICLE_FIELDS = ("pt", "eta", "phi", "energy")
+HEP_MAX_PARTICLES = 64
+
+
+def encode_codepoints(strings: List[str]):
+    """
+    Flatten a batch of strings into one tensor of code points.
+    Returns (codepoints, row index of every code point, length of every string).
+    """
+    lengths = torch.tensor([len(s) for s in strings], dtype=torch.long)
+    buffer = bytearray("".join(strings).encode("utf-32-le"))
+    codepoints = torch.frombuffer(buffer, dtype=torch.int32).long() if buffer else torch.zeros(0, dtype=torch.long)
+    rows = torch.repeat_interleave(torch.arange(len(strings)), lengths)
+    return codepoints, rows, lengths
+
+
+def tokenize_sequences(sequences: List[str], pad_to: int = RESIDUE_WINDOW):
+    """
+    Residue indices for a batch, padded to a multiple of pad_to.
+    Returns (indices, mask); padding and unknown residues are -1 and masked out.
+    """
+    codepoints, rows, lengths = encode_codepoints(sequences)
+    max_length = int(lengths.max()) if len(sequences) else 0
+    padded_length = max(pad_to, -(-max_length // pad_to) * pad_to)
+    offsets = torch.cumsum(lengths, 0) - lengths
+    positions = torch.arange(codepoints.numel()) - offsets[rows]
+    indices = torch.full((len(sequences), padded_length), -1, dtype=torch.long)
+    # Code points past the table clamp onto DEL (127), which maps to -1 like any unknown character
+    indices[rows, positions] = AMINO_ACID_LUT[codepoints.clamp(max=AMINO_ACID_LUT.numel() - 1)]
+    return indices, indices >= 0
+
+
+def one_hot_residues(indices: torch.Tensor) -> torch.Tensor:
+    """(batch, length) residue indices to (batch, length, 20) one-hot rows; -1 becomes an all-zero row"""
+    one_hot = torch.nn.functional.one_hot(indices + 1, len(AMINO_ACIDS) + 1)
+    return one_hot[..., 1:].float()
+
+
+def ca_trace(classes: torch.Tensor) -> torch.Tensor:
+    """
+    Approximate C-alpha coordinates from per-residue secondary structure classes:
+    each residue advances along the axis and turns around it by its class's
+    rise and twist, accumulated with cumulative sums over the whole batch.
+    """
+    angle = torch.cumsum(CA_TWIST[classes], dim=1)
+    radius = CA_RADIUS[classes]
+    z = torch.cumsum(CA_RISE[classes], dim=1) - CA_RISE[classes[:, :1]]
+    return torch.stack([radius * torch.cos(angle), radius * torch.sin(angle), z], dim=-1)
+
+
 class BaseInferenceEngine(ABC):
     """Base class for all inference engines"""
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, **options):
         self.model_path = model_path
+        # Engine options from config (e.g. mmap_dir); kept so pool workers can rebuild the same engine
+        self.options = options
+        self.metric_labels = model_labels(model_path)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        start = time.perf_counter()
         self.model = self._load_model()
-        logger.info(f"Initialized {self.__class__.__name__} on {self.device}")
+        loaded = time.perf_counter()
+        self.input_shape = self._input_shape()
+        precision_mode = options.get("precision", "fp32")
+        if self.mock and precision_mode != "fp32":
+            # Converting the placeholder would report a precision mode that no real weights run in
+            self.precision_report = {
+                "mode": precision_mode, "active": False, "reason": "placeholder model, no checkpoint weights to convert"
+            }
+        else:
+            self.model, self.precision_report = apply_precision(
+                precision_mode, self.model, self.calibration_input(), options.get("precision_tolerance")
+            )
+        converted = time.perf_counter()
+        if not self.precision_report["active"]:
+            logger.warning(f"Keeping fp32 for {model_path}: {self.precision_report['reason']}")
+        precision = self.precision_report["mode"] if self.precision_report["active"] else "fp32"
+        self.backend = build_backend(
+            options.get("backend", "eager"), self.model, self.example_input(), model_path,
+            export_dir=options.get("export_dir"), variant=precision
+        )
+        # Seconds spent in each step of building the engine, reported by the startup phase
+        self.load_timings = {
+            "torch_load_s": loaded - start,
+            "precision_s": converted - loaded,
+            "backend_s": time.perf_counter() - converted
+        }
+        logger.info(f"Initialized {self.__class__.__name__} on {self.device} ({self.backend.name} backend)")
 
     def _load_model(self) -> torch.nn.Module:
         """Load model with proper error handling and device mapping"""
+        # True whenever the engine serves the mock model instead of checkpoint weights
+        self.mock = False
         try:
             if not os.path.exists(self.model_path):
                 raise FileNotFoundError(f"Model file not found: {self.model_path}")
@@ -29,12 +212,24 @@ class BaseInferenceEngine(ABC):
         except Exception as e:
             logger.error(f"Failed to load model from {self.model_path}: {str(e)}")
             # Return a mock model for development/testing
+            self.mock = True
             return self._get_mock_model()
 
     def _load_real_model(self):
         # Placeholder: override in subclasses if needed
+        self.mock = True
         return self._get_mock_model()
 
+    def _load_state_dict(self) -> Dict[str, torch.Tensor]:
+        """Load the checkpoint's state_dict, memory-mapped when mmap_dir is configured"""
+        return load_state_dict(self.model_path, self.device, mmap_dir=self.options.get("mmap_dir"))
+
+    def _assign_weights(self, model: torch.nn.Module, state: Dict[str, torch.Tensor]) -> torch.nn.Module:
+        """Load weights into model; mapped tensors are assigned rather than copied so pages stay shared"""
+        model.load_state_dict(state, assign=bool(self.options.get("mmap_dir")))
+        model.eval()
+        return model.to(self.device)
+
     @abstractmethod
     def _get_mock_model(self) -> torch.nn.Module:
         """Return a mock model for testing"""
@@ -45,6 +240,55 @@ class BaseInferenceEngine(ABC):
         """Make predictions using the model"""
         pass
 
+    def predict_batch(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Make predictions for several inputs; subclasses override with a single forward pass"""
+        return [self.predict(input_data) for input_data in inputs]
+
+    def _input_shape(self) -> tuple:
+        """Shape of one model input, read from the fp32 model's first Linear layer"""
+        first = next(m for m in self.model.modules() if isinstance(m, torch.nn.Linear))
+        return (first.in_features,)
+
+    def example_input(self, batch_size: int = 2) -> torch.Tensor:
+        """Synthetic batch shaped for the model input; used for tracing, export and warm-up"""
+        return torch.rand(batch_size, *self.input_shape, device=self.device)
+
+    def calibration_input(self, batch_size: int = 256) -> torch.Tensor:
+        """Fixed-seed synthetic batch used to check reduced-precision modes against fp32"""
+        generator = torch.Generator().manual_seed(0)
+        return torch.rand(batch_size, *self.input_shape, generator=generator).to(self.device)
+
+    def warmup(self, batches: int = 3, batch_size: int = 32) -> float:
+        """
+        Run synthetic batches through the backend so allocator growth, lazy kernel
+        setup and compilation happen before traffic. Returns the seconds taken.
+        """
+        start = time.perf_counter()
+        example = self.example_input(batch_size)
+        for _ in range(batches):
+            self.backend(example)
+        return time.perf_counter() - start
+
+    def _forward(self, batch: torch.Tensor) -> torch.Tensor:
+        """Run one batched forward pass on the engine device through the configured backend"""
+        BATCH_SIZE.labels(*self.metric_labels).observe(batch.shape[0])
+        with stage_timer(*self.metric_labels, "forward"):
+            return self.backend(batch.to(self.device))
+
+    def _classify(self, logits: torch.Tensor, classes: tuple) -> List[Dict[str, Any]]:
+        """Predicted label, confidence (%) and per-class probabilities for every row of logits"""
+        probabilities = logits.float().softmax(dim=1).cpu()
+        confidence, index = probabilities.max(dim=1)
+        rows = probabilities.double().numpy().round(4).tolist()
+        return [
+            {
+                "prediction": classes[i],
+                "confidence": round(c * 100, 2),
+                "probabilities": dict(zip(classes, row))
+            }
+            for i, c, row in zip(index.tolist(), confidence.tolist(), rows)
+        ]
+
     def _validate_input(self, input_data: Dict[str, Any]) -> bool:
         """Validate input data"""
         return True
@@ -52,8 +296,13 @@ class BaseInferenceEngine(ABC):
 class BiologyInferenceEngine(BaseInferenceEngine):
     """
     NexaBio_1: Predicts secondary protein structure (H/E/C)
-    NexaBio_2: Predicts tertiary protein structure (3D coordinates, mock)
+    NexaBio_2: Predicts tertiary protein structure (3D coordinates)
+    Checkpoints holding a HelixSynth VAE are run for real; anything else falls back to the mock model.
     """
+    def _load_real_model(self):
+        state = self._load_state_dict()
+        return self._assign_weights(HelixSynthVAE.from_state_dict(state), state)
+
     def _get_mock_model(self) -> torch.nn.Module:
         # Use different mock models for secondary/tertiary
         if "1" in os.path.basename(self.model_path):
@@ -71,6 +320,15 @@ class BiologyInferenceEngine(BaseInferenceEngine):
                 torch.nn.Linear(128, 60)
             )
 
+    @property
+    def default_confidence_threshold(self) -> float:
+        return MOCK_CONFIDENCE_THRESHOLD if self.mock else HELIXSYNTH_CONFIDENCE_THRESHOLD
+
+    def confidence_threshold(self, input_data: Dict[str, Any]) -> float:
+        """The request's threshold, or this model's default when it is missing or None"""
+        threshold = input_data.get("confidence_threshold")
+        return self.default_confidence_threshold if threshold is None else threshold
+
     def get_secondary_structure(self, sequence: str) -> str:
         # Mock: repeat H/E/C for the sequence length
         pattern = "HEC"
@@ -80,48 +338,155 @@ class BiologyInferenceEngine(BaseInferenceEngine):
         # Mock: generate a list of [x, y, z] for each residue
         return [[round(i * 1.1, 2), round(i * 1.2, 2), round(i * 1.3, 2)] for i in range(len(sequence))]
 
+    def _encode_sequences(self, sequences: List[str]) -> torch.Tensor:
+        """Amino acid composition features, one row per sequence, computed for the whole batch at once"""
+        codepoints, rows, lengths = encode_codepoints(sequences)
+        columns = AMINO_ACID_LUT[codepoints.clamp(max=AMINO_ACID_LUT.numel() - 1)]
+        valid = (codepoints < AMINO_ACID_LUT.numel()) & (columns >= 0)
+        flat = rows[valid] * len(AMINO_ACIDS) + columns[valid]
+        counts = torch.bincount(flat, minlength=len(sequences) * len(AMINO_ACIDS))
+        features = counts.view(len(sequences), len(AMINO_ACIDS)).float()
+        return features / lengths.clamp(min=1).unsqueeze(1)
+
+    def _build_result(self, sequence: str, confidence_threshold: float, timestamp: str) -> Dict[str, Any]:
+        model_name = os.path.basename(self.model_path)
+        if "1" in model_name:
+            # NexaBio_1: Secondary structure
+            structure = self.get_secondary_structure(sequence)
+            confidence = 0.92
+            if confidence < confidence_threshold:
+                structure = "U" * len(sequence)
+            return {
+                "sequence": sequence,
+                "secondary_structure": structure,
+                "confidence": round(confidence * 100, 2),
+                "timestamp": timestamp
+            }
+        else:
+            # NexaBio_2: Tertiary structure
+            coords = self.get_tertiary_coordinates(sequence)
+            confidence = 0.89
+            if confidence < confidence_threshold:
+                coords = []
+            return {
+                "sequence": sequence,
+                "tertiary_coordinates": coords,
+                "confidence": round(confidence * 100, 2),
+                "timestamp": timestamp
+            }
+
     def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            if not self._validate_input(input_data):
-                raise ValueError("Invalid input data")
-            sequence = input_data.get("sequence", "")
-            confidence_threshold = input_data.get("confidence_threshold", 0.8)
-            model_name = os.path.basename(self.model_path)
-            timestamp = datetime.now().isoformat()
-            if "1" in model_name:
-                # NexaBio_1: Secondary structure
-                structure = self.get_secondary_structure(sequence)
-                confidence = 0.92
-                if confidence < confidence_threshold:
-                    structure = "U" * len(sequence)
-                return {
-                    "sequence": sequence,
-                    "secondary_structure": structure,
-                    "confidence": round(confidence * 100, 2),
-                    "timestamp": timestamp
-                }
-            else:
-                # NexaBio_2: Tertiary structure
-                coords = self.get_tertiary_coordinates(sequence)
-                confidence = 0.89
-                if confidence < confidence_threshold:
-                    coords = []
-                return {
-                    "sequence": sequence,
-                    "tertiary_coordinates": coords,
-                    "confidence": round(confidence * 100, 2),
-                    "timestamp": timestamp
-                }
+            return self.predict_batch([input_data])[0]
         except Exception as e:
             logger.error(f"Prediction failed: {str(e)}")
             raise
 
-    def generate_dataset(self, num_candidates: int, sequence_length: int = 12) -> list:
+    def calibration_input(self, batch_size: int = 256) -> torch.Tensor:
+        if self.mock:
+            return super().calibration_input(batch_size)
+        indices, _ = tokenize_sequences(random_sequences(batch_size, RESIDUE_WINDOW, seed=0))
+        return one_hot_residues(indices).reshape(batch_size, -1).to(self.device)
+
+    def _decode_structure(self, reconstruction: torch.Tensor, one_hot: torch.Tensor, mask: torch.Tensor):
+        """
+        Per-residue H/E/C classes and probabilities. The reconstruction is used as
+        pseudocounts on the observed residues; the resulting profile is scored
+        against Chou-Fasman propensities averaged over a sliding window.
+        """
+        profile = reconstruction.clamp(min=0)
+        profile = profile / profile.sum(-1, keepdim=True).clamp(min=1e-6)
+        profile = (one_hot + RECONSTRUCTION_WEIGHT * profile) / (1 + RECONSTRUCTION_WEIGHT)
+        scores = (profile @ CHOU_FASMAN_PROPENSITIES.log()) * mask.unsqueeze(-1)
+        # Window sums with zero padding, so a residue's score does not depend on how far the batch is padded
+        window_scores = torch.nn.functional.avg_pool1d(
+            scores.transpose(1, 2), PROPENSITY_WINDOW, stride=1, padding=PROPENSITY_WINDOW // 2
+        ).transpose(1, 2) * PROPENSITY_WINDOW
+        probabilities = window_scores.softmax(-1)
+        return probabilities.argmax(-1), probabilities.max(-1).values
+
+    def _predict_real(self, sequences: List[str], inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Sequences are grouped into length buckets and each bucket runs as one
+        forward pass, padded only to its own longest member instead of the batch's.
+        """
+        boundaries = torch.tensor(self.options.get("length_buckets") or DEFAULT_LENGTH_BUCKETS)
+        buckets = torch.bucketize(torch.tensor([len(sequence) for sequence in sequences]), boundaries)
+        timestamp = datetime.now().isoformat()
+        results = [None] * len(sequences)
+        for bucket in buckets.unique().tolist():
+            members = (buckets == bucket).nonzero().flatten().tolist()
+            label = f"le_{int(boundaries[bucket])}" if bucket < len(boundaries) else f"gt_{int(boundaries[-1])}"
+            rows = self._predict_bucket(
+                [sequences[i] for i in members], [inputs[i] for i in members], label, timestamp
+            )
+            for i, row in zip(members, rows):
+                results[i] = row
+        return results
+
+    def _predict_bucket(self, sequences: List[str], inputs: List[Dict[str, Any]], bucket: str,
+                        timestamp: str) -> List[Dict[str, Any]]:
+        """One bucket padded into 20-residue windows and run in a single forward pass"""
+        start = time.perf_counter()
+        with stage_timer(*self.metric_labels, "preprocess"):
+            indices, mask = tokenize_sequences(sequences)
+            one_hot = one_hot_residues(indices)
+            windows = one_hot.reshape(-1, RESIDUE_WINDOW * len(AMINO_ACIDS))
+        reconstruction = self._forward(windows).cpu().reshape(one_hot.shape)
+        with stage_timer(*self.metric_labels, "decode"):
+            classes, residue_confidence = self._decode_structure(reconstruction, one_hot, mask)
+            lengths = mask.sum(1)
+            confidence = (residue_confidence * mask).sum(1) / lengths.clamp(min=1)
+            tertiary = "1" not in os.path.basename(self.model_path)
+            if tertiary:
+                # float32 trace; rounding for JSON happens at serialization
+                coordinates = ca_trace(classes).numpy()
+            else:
+                letters = np.frombuffer(SECONDARY_STRUCTURE_CLASSES.encode(), dtype=np.uint8)
+                structures = letters[classes.numpy()].tobytes()
+            results = []
+            for i, (sequence, input_data) in enumerate(zip(sequences, inputs)):
+                score = float(confidence[i])
+                passed = score >= self.confidence_threshold(input_data)
+                row = {"sequence": sequence}
+                if tertiary:
+                    # A copy, not a view: cached and audited rows would otherwise pin the whole padded bucket
+                    row["tertiary_coordinates"] = coordinates[i, :len(sequence) if passed else 0].copy()
+                else:
+                    width = classes.shape[1]
+                    structure = structures[i * width:i * width + len(sequence)].decode()
+                    row["secondary_structure"] = structure if passed else "U" * len(sequence)
+                row["confidence"] = round(score * 100, 2)
+                row["timestamp"] = timestamp
+                results.append(row)
+        observe_bucket(*self.metric_labels, bucket, len(sequences), int(lengths.sum()), mask.numel(),
+                       time.perf_counter() - start)
+        return results
+
+    def predict_batch(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not all(self._validate_input(input_data) for input_data in inputs):
+            raise ValueError("Invalid input data")
+        sequences = [input_data.get("sequence", "") for input_data in inputs]
+        if not self.mock:
+            return self._predict_real(sequences, inputs)
+        with stage_timer(*self.metric_labels, "preprocess"):
+            features = self._encode_sequences(sequences)
+        # One forward pass for the whole batch; mock outputs are not decoded yet
+        self._forward(features)
+        timestamp = datetime.now().isoformat()
+        return [
+            self._build_result(sequence, self.confidence_threshold(input_data), timestamp)
+            for sequence, input_data in zip(sequences, inputs)
+        ]
+
+    def generate_dataset(self, num_candidates: int, sequence_length: int = 12, seed: int = None,
+                         batch_size: int = 1024) -> list:
+        sequences = random_sequences(num_candidates, sequence_length, seed)
         dataset = []
-        for _ in range(num_candidates):
-            seq = ''.join(random.choices("ACDEFGHIKLMNPQRSTVWY", k=sequence_length))
-            pred = self.predict({"sequence": seq, "confidence_threshold": 0.8})
-            dataset.append(pred)
+        for start in range(0, num_candidates, batch_size):
+            dataset.extend(self.predict_batch([
+                {"sequence": seq} for seq in sequences[start:start + batch_size]
+            ]))
         return dataset
 
     def _validate_input(self, input_data: Dict[str, Any]) -> bool:
@@ -133,6 +498,8 @@ class MaterialsInferenceEngine(BaseInferenceEngine):
     """
     NexaMat_1: Battery ion prediction (mock)
     NexaMat_2: GNN+VAE battery ion prediction (mock)
+    Neither checkpoint is run yet: properties come from composition_properties,
+    a documented deterministic scorer, so screening still ranks real differences.
     """
     def _get_mock_model(self) -> torch.nn.Module:
         if "1" in os.path.basename(self.model_path):
@@ -151,48 +518,165 @@ class MaterialsInferenceEngine(BaseInferenceEngine):
             )
 
     def get_material_prediction(self, structure: str) -> dict:
-        # Mock: return a dict with all required prediction labels
+        return composition_properties(structure)
+
+    def _encode_structures(self, structures: List[str]) -> torch.Tensor:
+        """Hashed character histogram features, one row per structure, computed for the whole batch at once"""
+        codepoints, rows, lengths = encode_codepoints(structures)
+        flat = rows * STRUCTURE_FEATURES + codepoints % STRUCTURE_FEATURES
+        counts = torch.bincount(flat, minlength=len(structures) * STRUCTURE_FEATURES)
+        features = counts.view(len(structures), STRUCTURE_FEATURES).float()
+        return features / lengths.clamp(min=1).unsqueeze(1)
+
+    def _build_result(self, structure: str, energy_threshold: float, timestamp: str) -> Dict[str, Any]:
+        prediction = self.get_material_prediction(structure)
+        confidence = prediction["confidence_score"] / 100.0
+        if confidence < energy_threshold:
+            prediction = {k: None for k in prediction}
         return {
-            "formation_energy_per_atom": -0.4063791,
-            "energy_per_atom": -0.027647773,
-            "density": -0.6608056,
-            "volume": 0.12958337,
-            "n_elements": 5.313307,
-            "li_fraction": 0.10428204,
-            "predicted_band_gap": 1.515275,
-            "confidence_score": 99.9999951393316
+            "input_structure": structure,
+            "predicted_properties": prediction,
+            "timestamp": timestamp
         }
 
     def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            if not self._validate_input(input_data):
-                raise ValueError("Invalid input data")
-            structure = input_data.get("structure", "")
-            energy_threshold = input_data.get("energy_threshold", 0.5)
-            model_name = os.path.basename(self.model_path)
-            timestamp = datetime.now().isoformat()
-            prediction = self.get_material_prediction(structure)
-            confidence = prediction["confidence_score"] / 100.0
-            if confidence < energy_threshold:
-                prediction = {k: None for k in prediction}
-            return {
-                "input_structure": structure,
-                "predicted_properties": prediction,
-                "timestamp": timestamp
-            }
+            return self.predict_batch([input_data])[0]
         except Exception as e:
             logger.error(f"Prediction failed: {str(e)}")
             raise
 
-    def generate_dataset(self, num_candidates: int, structure_length: int = 10) -> list:
+    def predict_batch(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not all(self._validate_input(input_data) for input_data in inputs):
+            raise ValueError("Invalid input data")
+        structures = [input_data.get("structure", "") for input_data in inputs]
+        with stage_timer(*self.metric_labels, "preprocess"):
+            features = self._encode_structures(structures)
+        # One forward pass for the whole batch; mock outputs are not decoded, properties come from the scorer
+        self._forward(features)
+        timestamp = datetime.now().isoformat()
+        return [
+            self._build_result(structure, input_data.get("energy_threshold", 0.5), timestamp)
+            for structure, input_data in zip(structures, inputs)
+        ]
+
+    def generate_dataset(self, num_candidates: int, structure_length: int = 10, seed: int = None,
+                         batch_size: int = 1024) -> list:
+        structures = random_material_structures(num_candidates, structure_length, seed)
         dataset = []
-        for _ in range(num_candidates):
-            struct = ''.join(random.choices("LiNaKMgAlSiO", k=structure_length))
-            pred = self.predict({"structure": struct, "energy_threshold": 0.5})
-            dataset.append(pred)
+        for start in range(0, num_candidates, batch_size):
+            dataset.extend(self.predict_batch([
+                {"structure": struct, "energy_threshold": 0.5} for struct in structures[start:start + batch_size]
+            ]))
         return dataset
 
     def _validate_input(self, input_data: Dict[str, Any]) -> bool:
         """Validate materials input data"""
         required_fields = ["structure"]
         return all(field in input_data for field in required_fields)
+
+
+class AstroInferenceEngine(BaseInferenceEngine):
+    """
+    NexaAstro: classifies SDSS photometric objects as GALAXY, QSO or STAR
+    from ugriz magnitudes, redshift and sky position.
+    """
+    def _load_real_model(self):
+        state = self._load_state_dict()
+        return self._assign_weights(StellarClassifier.from_state_dict(state), state)
+
+    def _get_mock_model(self) -> torch.nn.Module:
+        return StellarClassifier(input_dim=len(ASTRO_FIELDS) + len(ASTRO_COLORS)).eval().to(self.device)
+
+    def _encode_objects(self, inputs: List[Dict[str, Any]]) -> torch.Tensor:
+        """Raw fields plus every colour index, built for the whole batch with column arithmetic"""
+        raw = torch.tensor(
+            [[float(input_data.get(field, 0.0)) for field in ASTRO_FIELDS] for input_data in inputs],
+            dtype=torch.float32
+        ).reshape(len(inputs), len(ASTRO_FIELDS))
+        colors = raw[:, ASTRO_COLORS[:, 0]] - raw[:, ASTRO_COLORS[:, 1]]
+        return torch.cat([raw, colors], dim=1)
+
+    def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.predict_batch([input_data])[0]
+        except Exception as e:
+            logger.error(f"Prediction failed: {str(e)}")
+            raise
+
+    def predict_batch(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not all(self._validate_input(input_data) for input_data in inputs):
+            raise ValueError("Invalid input data")
+        with stage_timer(*self.metric_labels, "preprocess"):
+            features = self._encode_objects(inputs)
+        logits = self._forward(features)
+        timestamp = datetime.now().isoformat()
+        with stage_timer(*self.metric_labels, "decode"):
+            return [{**result, "timestamp": timestamp} for result in self._classify(logits, ASTRO_CLASSES)]
+
+    def _validate_input(self, input_data: Dict[str, Any]) -> bool:
+        """Validate astronomy input data"""
+        return all(field in input_data for field in ASTRO_REQUIRED_FIELDS)
+
+
+class HEPInferenceEngine(BaseInferenceEngine):
+    """
+    NexaHEP: classifies collision events from their particle lists with a 1D CNN
+    over the highest-pt particles.
+    """
+    def _load_real_model(self):
+        state = self._load_state_dict()
+        return self._assign_weights(ParticleCNN.from_state_dict(state), state)
+
+    def _get_mock_model(self) -> torch.nn.Module:
+        return ParticleCNN(in_channels=len(HEP_PARTICLE_FIELDS)).eval().to(self.device)
+
+    def _input_shape(self) -> tuple:
+        return (self.model.conv1.in_channels, self.options.get("max_particles") or HEP_MAX_PARTICLES)
+
+    def _encode_events(self, events: List[List[List[float]]]) -> torch.Tensor:
+        """
+        (batch, fields, max_particles) tensor: all particles are flattened into one
+        tensor, sorted by pt within each event and scattered into the padded window.
+        """
+        channels, window = self.input_shape
+        counts = torch.tensor([len(event) for event in events], dtype=torch.long)
+        particles = torch.tensor(
+            [particle for event in events for particle in event], dtype=torch.float32
+        ).reshape(-1, channels)
+        rows = torch.repeat_interleave(torch.arange(len(events)), counts)
+        # Two stable sorts: by descending pt, then by event, leaves each event's particles in pt order
+        order = torch.argsort(-particles[:, 0], stable=True)
+        order = order[torch.argsort(rows[order], stable=True)]
+        particles, rows = particles[order], rows[order]
+        positions = torch.arange(len(rows)) - (torch.cumsum(counts, 0) - counts)[rows]
+        keep = positions < window
+        batch = torch.zeros(len(events), window, channels)
+        batch[rows[keep], positions[keep]] = particles[keep]
+        return batch.transpose(1, 2)
+
+    def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.predict_batch([input_data])[0]
+        except Exception as e:
+            logger.error(f"Prediction failed: {str(e)}")
+            raise
+
+    def predict_batch(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not all(self._validate_input(input_data) for input_data in inputs):
+            raise ValueError("Invalid input data")
+        with stage_timer(*self.metric_labels, "preprocess"):
+            features = self._encode_events([input_data["particles"] for input_data in inputs])
+        logits = self._forward(features)
+        timestamp = datetime.now().isoformat()
+        with stage_timer(*self.metric_labels, "decode"):
+            results = self._classify(logits, HEP_CLASSES)
+        return [
+            {**result, "n_particles": len(input_data["particles"]), "timestamp": timestamp}
+            for result, input_data in zip(results, inputs)
+        ]
+
+    def _validate_input(self, input_data: Dict[str, Any]) -> bool:
+        """Validate HEP input data: a list of (pt, eta, phi, energy) particles"""
+        particles = input_data.get("particles")
+        return bool(particles) and all(len(particle) == len(HEP_PARTICLE_FIELDS) for particle in particles)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict
+
+from src.runtime import apply_threads
+
+logger = logging.getLogger(__name__)
+
+# Engines rebuilt inside process-pool workers, keyed by (engine class, model path)
+_process_engines: Dict[Any, Any] = {}
+
+
+class QueueFullError(RuntimeError):
+    """Raised when an engine already has as much queued work as it is allowed to hold"""
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"Inference queue for {key} is full, retry later")
+        self.key = key
+        self.retry_after = retry_after
+
+
+def _call_in_process(engine_cls, model_path: str, options: Dict[str, Any], method: str, args: tuple):
+    """Entry point for process-pool workers: build the engine once per process, then call it"""
+    engine = _process_engines.get((engine_cls, model_path))
+    if engine is None:
+        engine = engine_cls(model_path, **options)
+        _process_engines[(engine_cls, model_path)] = engine
+    return getattr(engine, method)(*args)
+
+
+class InferenceExecutor:
+    """
+    Runs blocking engine calls off the event loop on a thread or process pool.
+    Each engine key gets its own concurrency limit and a bounded number of
+    waiting calls; once that bound is hit, submit() raises QueueFullError.
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: int = 4, max_concurrency: int = 2,
+                 max_queue_size: int = 256, retry_after_s: float = 1.0, reject_status: int = 503,
+                 process_threads: int = 0):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.retry_after = retry_after_s
+        self.reject_status = reject_status
+        if mode == "process":
+            # fork() after torch has started its thread pools can deadlock
+            # Spawned children start with torch's all-cores default, so give each its share
+            initializer, initargs = (apply_threads, (process_threads, 1)) if process_threads else (None, ())
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer, initargs=initargs
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._limiters: Dict[Any, asyncio.Semaphore] = {}
+        self._pending: Dict[str, int] = defaultdict(int)
+
+    def limiter(self, key: str) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent calls into one engine on the running event loop"""
+        loop = asyncio.get_running_loop()
+        limiter_key = (id(loop), key)
+        if limiter_key not in self._limiters:
+            self._limiters[limiter_key] = asyncio.Semaphore(self.max_concurrency)
+        return self._limiters[limiter_key]
+
+    def pending(self, key: str) -> int:
+        return self._pending[key]
+
+    async def run(self, engine, method: str, *args):
+        """Run engine.method(*args) on the pool without any admission control"""
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            return await loop.run_in_executor(
+                self._pool, _call_in_process, type(engine), engine.model_path, engine.options, method, args
+            )
+        return await loop.run_in_executor(self._pool, getattr(engine, method), *args)
+
+    async def submit(self, key: str, engine, method: str, *args):
+        """Run engine.method(*args) under the engine's concurrency limit and queue bound"""
+        if self._pending[key] >= self.max_queue_size:
+            raise QueueFullError(key, self.retry_after)
+        self._pending[key] += 1
+        try:
+            async with self.limiter(key):
+                return await self.run(engine, method, *args)
+        finally:
+            self._pending[key] -= 1
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,105 @@
+"""
+Export every checkpoint in models/ to the non-eager backends and check each
+export against eager PyTorch on the same synthetic batch.
+
+    python -m src.export
+    python -m src.export --backends onnx --batch-size 256 --tolerance 1e-4
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import torch
+
+from src.backends import ARTIFACT_SUFFIXES, BACKEND_CLASSES, artifact_path
+from src.Config import Config
+from src.registry import ModelRegistry, engine_class
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_forward(backend, batch: torch.Tensor, repeats: int) -> float:
+    """Median milliseconds per forward pass"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend(batch)
+        timings.append(time.perf_counter() - start)
+    return round(sorted(timings)[len(timings) // 2] * 1000, 4)
+
+
+def check_model(key: str, engine, backends: List[str], export_dir: str, batch_size: int,
+                repeats: int, tolerance: float) -> List[Dict[str, Any]]:
+    """Build each backend for one engine and compare its output with eager"""
+    batch = engine.example_input(batch_size)
+    reference = engine.backend(batch)
+    rows = [{"model": key, "backend": "eager", "max_abs_error": 0.0, "ok": True,
+             "forward_ms": time_forward(engine.backend, batch, repeats)}]
+    for name in backends:
+        path = artifact_path(engine.model_path, export_dir, ARTIFACT_SUFFIXES[name]) \
+            if name in ARTIFACT_SUFFIXES else None
+        row = {"model": key, "backend": name, "artifact": path}
+        try:
+            backend = BACKEND_CLASSES[name](engine.model, engine.example_input(), path=path)
+            output = backend(batch)
+            row["max_abs_error"] = float((output.float() - reference.float()).abs().max())
+            row["ok"] = row["max_abs_error"] <= tolerance
+            row["forward_ms"] = time_forward(backend, batch, repeats)
+        except Exception as e:
+            logger.error(f"{name} export failed for {key}: {str(e)}")
+            row.update({"ok": False, "error": str(e)})
+        rows.append(row)
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    config = Config(os.getenv("NEXA_CONFIG", os.path.join(PROJECT_ROOT, "config.json")))
+    registry_settings = config.get("registry", {})
+    parser = argparse.ArgumentParser(description="Export checkpoints to inference backends and check parity")
+    parser.add_argument("--models-dir", default=os.getenv(
+        "MODEL_DIR", os.path.join(PROJECT_ROOT, registry_settings.get("models_dir", "models"))
+    ))
+    parser.add_argument("--export-dir", default=os.getenv(
+        "MODEL_EXPORT_DIR", registry_settings.get("export_dir") or os.path.join(PROJECT_ROOT, "exports")
+    ))
+    parser.add_argument("--backends", nargs="+", default=["torchscript", "onnx"],
+                        choices=[name for name in BACKEND_CLASSES if name != "eager"])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=50, help="Forward passes timed per backend")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Maximum absolute difference from eager")
+    parser.add_argument("--report", help="Write the parity report as JSON to this path")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    registry = ModelRegistry(args.models_dir)
+    rows = []
+    for key in registry.keys():
+        entry = registry.entry(key)
+        if not registry.is_servable(key):
+            print(f"{key:8s} skipped: no inference engine for {entry['family']}")
+            continue
+        engine = engine_class(entry["family"])(entry["path"])
+        if engine.mock:
+            print(f"{key:8s} skipped: no loadable checkpoint at {os.path.basename(entry['path'])}")
+            continue
+        rows.extend(check_model(key, engine, args.backends, args.export_dir, args.batch_size,
+                                args.repeats, args.tolerance))
+
+    for row in rows:
+        status = "ok" if row["ok"] else "FAIL"
+        detail = row.get("error") or f"max |diff| {row['max_abs_error']:.2e}  {row['forward_ms']:.3f} ms/forward"
+        print(f"{row['model']:8s} {row['backend']:12s} {status:5s} {detail}")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({"tolerance": args.tolerance, "batch_size": args.batch_size, "results": rows}, f, indent=2)
+    return 0 if all(row["ok"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
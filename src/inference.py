@@ -4,7 +4,64 @@ import os
 
 logger = logging.getLogger(__name__)
 
-def load_torch_model(model_class, model_path, device="cpu"):
+def unwrap_state_dict(state):
+    """
+    Returns the tensor mapping of a checkpoint. Weights may be stored directly,
+    under "state_dict", or as the only nested dict (e.g. {"helixsynth_model": ...}).
+    """
+    if isinstance(state, dict) and "state_dict" in state:
+        return state["state_dict"]
+    if isinstance(state, dict) and not any(torch.is_tensor(value) for value in state.values()):
+        nested = [value for value in state.values() if isinstance(value, dict)]
+        if len(nested) == 1:
+            return nested[0]
+    return state
+
+def mmap_checkpoint_path(model_path, mmap_dir):
+    """
+    Path of the memory-mappable copy of a checkpoint. The source size and mtime
+    are part of the name so a replaced checkpoint is converted again.
+    """
+    stat = os.stat(model_path)
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(mmap_dir, f"{name}-{stat.st_size}-{int(stat.st_mtime)}.mmap.pt")
+
+def ensure_mmap_checkpoint(model_path, mmap_dir):
+    """
+    Converts a checkpoint once into a plain, contiguous state_dict that
+    torch.load(mmap=True) can map. Safe to call from several workers at once:
+    each writes a private temp file and the rename into place is atomic.
+    """
+    target = mmap_checkpoint_path(model_path, mmap_dir)
+    if os.path.exists(target):
+        return target
+    os.makedirs(mmap_dir, exist_ok=True)
+    state = torch.load(model_path, map_location="cpu", weights_only=True)
+    state = unwrap_state_dict(state)
+    state = {key: value.contiguous() for key, value in state.items()}
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    torch.save(state, tmp_path)
+    os.replace(tmp_path, target)
+    logger.info(f"Converted {model_path} to memory-mappable {target}")
+    return target
+
+def load_state_dict(model_path, device="cpu", mmap_dir=None):
+    """
+    Loads the state_dict stored in a checkpoint. With mmap_dir set, the weights
+    are mapped read-only from a converted copy, so every worker process on the
+    host shares the same page-cache pages instead of holding a private copy.
+    """
+    if not os.path.exists(model_path):
+        logger.error(f"Model file not found: {model_path}")
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+
+    if mmap_dir:
+        mapped_path = ensure_mmap_checkpoint(model_path, mmap_dir)
+        return torch.load(mapped_path, map_location=device, mmap=True, weights_only=True)
+
+    return unwrap_state_dict(torch.load(model_path, map_location=device))
+
+def load_torch_model(model_class, model_path, device="cpu", mmap_dir=None):
     """
     Loads a PyTorch model from a .pt or .pth file, avoiding safetensors errors.
     Returns an instance of model_class with loaded weights.
@@ -14,12 +71,10 @@ def load_torch_model(model_class, model_path, device="cpu"):
         raise FileNotFoundError(f"Model file not found: {model_path}")
 
     try:
-        # Try loading as a regular torch model
-        state = torch.load(model_path, map_location=device)
-        if isinstance(state, dict) and "state_dict" in state:
-            state = state["state_dict"]
+        state = load_state_dict(model_path, device, mmap_dir)
         model = model_class()
-        model.load_state_dict(state)
+        # assign=True keeps the mapped tensors instead of copying them into fresh parameters
+        model.load_state_dict(state, assign=bool(mmap_dir))
         model.eval()
         return model
     except Exception as e:
@@ -0,0 +1,370 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from src.serialization import encode_json
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+# Per model type: candidate field, threshold field, default threshold (None defers to the engine),
+# default generated length
+CANDIDATES = {
+    "bio": ("sequence", "confidence_threshold", None, 12),
+    "materials": ("structure", "energy_threshold", 0.5, 10)
+}
+MODEL_PREFIXES = {"bio": "bio", "materials": "mat"}
+
+
+def generated_candidates(spec: Dict[str, Any], start: int, chunk_size: int) -> Iterator[List[str]]:
+    """
+    Generated candidate strings from row start onwards, one chunk at a time. Every
+    chunk draws from its own (seed, chunk index) stream, so a resumed job jumps
+    straight to its checkpoint and still sees exactly the same candidates.
+    """
+    import numpy as np
+
+    from src.synthetic import AMINO_ACIDS, MATERIAL_ALPHABET, random_strings
+
+    alphabet = {"bio": AMINO_ACIDS, "materials": MATERIAL_ALPHABET}[spec["model_type"]]
+    for index in range(start // chunk_size, -(-spec["num_candidates"] // chunk_size)):
+        rng = np.random.default_rng([spec["seed"], index])
+        n = min(chunk_size, spec["num_candidates"] - index * chunk_size)
+        yield random_strings(rng, n, spec["length"], alphabet).tolist()
+
+
+def uploaded_candidates(path: str, model_type: str, start: int, chunk_size: int) -> Iterator[List[Any]]:
+    """Candidates from an uploaded file (a bare string or a JSON object per line), skipping the first start"""
+    chunk = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(line for line in f if line.strip()):
+            if number < start:
+                continue
+            chunk.append(parse_candidate(line, model_type))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_candidate(line: str, model_type: str):
+    """
+    A candidate string, or an input dict when the line is a JSON object. Objects may
+    only carry the candidate and threshold fields, checked against the same request
+    model (and ranges) as a single prediction.
+    """
+    from src.models import BiologyRequest, MaterialsRequest
+
+    field, threshold_field = CANDIDATES[model_type][:2]
+    line = line.strip()
+    if not line.startswith("{"):
+        return line
+    value = json.loads(line)
+    if not isinstance(value, dict) or field not in value:
+        raise ValueError(f"Each JSON line needs a string '{field}'")
+    unexpected = sorted(set(value) - {field, threshold_field})
+    if unexpected:
+        raise ValueError(f"Unexpected fields {unexpected}; a JSON line may only carry '{field}' and '{threshold_field}'")
+    request = {"bio": BiologyRequest, "materials": MaterialsRequest}[model_type].model_validate(value)
+    return {key: getattr(request, key) for key in value}
+
+
+class JobStore:
+    """
+    Jobs and their results in one SQLite database (WAL mode), so every gunicorn
+    worker on the host shares the queue. Results are committed together with the
+    progress counter after every chunk, which makes that counter the checkpoint.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, model_type TEXT, model_version TEXT, "
+                "source TEXT, spec TEXT, status TEXT, total INTEGER, done INTEGER DEFAULT 0, error TEXT, "
+                "owner TEXT, created_at REAL, updated_at REAL, finished_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_results (job_id TEXT, idx INTEGER, result TEXT, "
+                "PRIMARY KEY (job_id, idx)) WITHOUT ROWID"
+            )
+
+    def create(self, model_type: str, model_version: str, source: str, spec: Dict[str, Any], total: int,
+               job_id: Optional[str] = None) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, model_type, model_version, source, spec, status, total, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, model_type, model_version, source, json.dumps(spec), QUEUED, total, now, now)
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["spec"] = json.loads(job["spec"])
+        return job
+
+    def claim(self, owner: str, stale_after_s: float) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job, or a running one whose worker stopped reporting progress"""
+        now = time.time()
+        claimable = "(status = ? OR (status = ? AND updated_at < ?))"
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT id FROM jobs WHERE {claimable} ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now - stale_after_s)
+            ).fetchone()
+            if row is None:
+                return None
+            # Re-checked in the UPDATE so two workers racing for the same row cannot both win
+            claimed = self._conn.execute(
+                f"UPDATE jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ? AND {claimable}",
+                (RUNNING, owner, now, row["id"], QUEUED, RUNNING, now - stale_after_s)
+            ).rowcount
+        return self.get(row["id"]) if claimed else None
+
+    def checkpoint(self, job_id: str, owner: str, start: int, results: List[str]) -> bool:
+        """Store one chunk of encoded results and advance the progress counter; False once the job is no longer ours"""
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE jobs SET done = ?, updated_at = ? WHERE id = ? AND owner = ? AND status = ? AND done = ?",
+                (start + len(results), time.time(), job_id, owner, RUNNING, start)
+            ).rowcount
+            if not updated:
+                return False
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_results (job_id, idx, result) VALUES (?, ?, ?)",
+                [(job_id, start + i, result) for i, result in enumerate(results)]
+            )
+        return True
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None, owner: Optional[str] = None) -> bool:
+        now = time.time()
+        query = "UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? WHERE id = ? AND status NOT IN (?, ?, ?)"
+        params = [status, error, now, now, job_id, *FINISHED]
+        if owner is not None:
+            query += " AND owner = ?"
+            params.append(owner)
+        with self._lock, self._conn:
+            return self._conn.execute(query, params).rowcount > 0
+
+    def expired(self, finished_before: float) -> List[str]:
+        """Ids of finished jobs that finished before the given time"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?", (*FINISHED, finished_before)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, job_id: str) -> bool:
+        """Remove a finished job and its results; False when it is unknown or still active"""
+        with self._lock, self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM jobs WHERE id = ? AND status IN (?, ?, ?)", (job_id, *FINISHED)
+            ).rowcount
+            if deleted:
+                self._conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+        return deleted > 0
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM job_results WHERE job_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                (job_id, offset, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    """
+    Background workers that claim jobs from the store and score them chunk by
+    chunk through predict_chunk. Progress is checkpointed after every chunk, so a
+    job whose worker died is picked up again (by any worker) from its last
+    committed chunk once stale_after_s passes without progress. Uploaded inputs
+    are deleted once a job finishes, and finished jobs with their results are
+    purged retention_s after they finish (checked every sweep_interval_s).
+    """
+
+    def __init__(self, store: JobStore, predict_chunk: Callable[[str, List[Dict[str, Any]]], Awaitable[list]],
+                 directory: str, chunk_size: int = 1024, max_running: int = 1, poll_interval_s: float = 1.0,
+                 stale_after_s: float = 300.0, retention_s: float = 7 * 24 * 3600, sweep_interval_s: float = 3600.0):
+        self.store = store
+        self.predict_chunk = predict_chunk
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.max_running = max_running
+        self.poll_interval = poll_interval_s
+        self.stale_after = stale_after_s
+        self.retention = retention_s
+        self.sweep_interval = sweep_interval_s
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        os.makedirs(directory, exist_ok=True)
+
+    def upload_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.inputs")
+
+    def remove_inputs(self, job_id: str):
+        try:
+            os.remove(self.upload_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def purge(self, job_id: str) -> bool:
+        """Delete a finished job's results, row and uploaded inputs; False when it is unknown or still active"""
+        if not self.store.delete(job_id):
+            return False
+        self.remove_inputs(job_id)
+        return True
+
+    def sweep(self) -> int:
+        """Purge jobs that finished more than retention_s ago, plus inputs left behind by finished jobs"""
+        purged = sum(self.purge(job_id) for job_id in self.store.expired(time.time() - self.retention))
+        # Cancelled jobs keep their upload until now, since a worker may still have been reading it.
+        # Files without a job are only removed once stale, as uploads are written before the job row exists
+        for name in os.listdir(self.directory):
+            if not name.endswith(".inputs"):
+                continue
+            job_id = name[:-len(".inputs")]
+            job = self.store.get(job_id)
+            if job is None:
+                try:
+                    orphaned = os.path.getmtime(self.upload_path(job_id)) < time.time() - self.stale_after
+                except FileNotFoundError:
+                    continue
+            else:
+                orphaned = job["status"] in FINISHED
+            if orphaned:
+                self.remove_inputs(job_id)
+        if purged:
+            logger.info(f"Purged {purged} jobs older than {self.retention}s")
+        return purged
+
+    def notify(self):
+        """Wake an idle worker after a submission instead of waiting for the next poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _inputs(self, job: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+        spec = job["spec"]
+        field, threshold_field, default_threshold, _ = CANDIDATES[job["model_type"]]
+        threshold = spec.get("threshold", default_threshold)
+        chunk_size = spec["chunk_size"]
+        if job["source"] == "upload":
+            chunks = uploaded_candidates(self.upload_path(job["id"]), job["model_type"], job["done"], chunk_size)
+        else:
+            chunks = generated_candidates({**spec, "model_type": job["model_type"]}, job["done"], chunk_size)
+        for candidates in chunks:
+            yield [
+                {threshold_field: threshold, **candidate} if isinstance(candidate, dict)
+                else {field: candidate, threshold_field: threshold}
+                for candidate in candidates
+            ]
+
+    async def _run_job(self, job: Dict[str, Any]):
+        model_key = f"{MODEL_PREFIXES[job['model_type']]}_{job['model_version']}"
+        if job["done"]:
+            logger.info(f"Resuming job {job['id']} at {job['done']}/{job['total']}")
+        start = job["done"]
+        chunks = self._inputs(job)
+        while True:
+            inputs = await asyncio.to_thread(next, chunks, None)
+            if inputs is None:
+                break
+            results = await self.predict_chunk(model_key, inputs)
+            encoded = await asyncio.to_thread(lambda: [encode_json(result).decode() for result in results])
+            if not await asyncio.to_thread(self.store.checkpoint, job["id"], self.owner, start, encoded):
+                logger.info(f"Job {job['id']} stopped at {start}/{job['total']} (cancelled or reassigned)")
+                return
+            start += len(encoded)
+        if await asyncio.to_thread(self.store.finish, job["id"], COMPLETED, None, self.owner):
+            await asyncio.to_thread(self.remove_inputs, job["id"])
+        logger.info(f"Job {job['id']} completed ({start} results)")
+
+    async def _worker(self):
+        while True:
+            job = await asyncio.to_thread(self.store.claim, self.owner, self.stale_after)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job['id']} failed: {str(e)}")
+                if await asyncio.to_thread(self.store.finish, job["id"], FAILED, str(e), self.owner):
+                    await asyncio.to_thread(self.remove_inputs, job["id"])
+
+    async def _sweeper(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error(f"Job retention sweep failed: {str(e)}")
+            await asyncio.sleep(self.sweep_interval)
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.max_running)]
+        self._tasks.append(loop.create_task(self._sweeper()))
+
+    async def stop(self):
+        """Stop claiming work; running jobs stay checkpointed and resume after stale_after_s"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+def job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job row"""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "model_type": job["model_type"],
+        "model_version": job["model_version"],
+        "source": job["source"],
+        "total": job["total"],
+        "done": job["done"],
+        "progress": round(job["done"] / job["total"], 4) if job["total"] else 1.0,
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "finished_at": job["finished_at"]
+    }
@@ -1,53 +1,165 @@
-import logging
 import time
-import random
-import string
-import io
-import csv
+
+# Start of the imports phase reported at startup
+IMPORT_START = time.perf_counter()
+
+import asyncio
+import json
+import logging
+import os
+import uuid
 from datetime import datetime
 from collections import deque
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Depends, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse, Response
 
+from src.audit import AuditLog, make_audit_sink
 from src.auth import verify_api_key
-from src.engines import BiologyInferenceEngine, MaterialsInferenceEngine
-from src.models import BiologyRequest, MaterialsRequest
+from src.batching import MicroBatcher
+from src.cache import LRUCache, PredictionCache, make_redis_cache, prediction_key
+from src.Config import Config
+from src.executor import InferenceExecutor, QueueFullError
+from src.jobs import CANCELLED, CANDIDATES, FINISHED, MODEL_PREFIXES, JobRunner, JobStore, job_status, parse_candidate
+from src.metrics import ERRORS, HTTP_LATENCY, HTTP_REQUESTS, PREDICTIONS, render as render_metrics, stage_timer
+from src.registry import ModelRegistry
+from src.runtime import configure_runtime, pin_cpus, runtime_info, worker_plan
+from src.serialization import JSON, encode, negotiate, supported_formats
+from src.singleflight import SingleFlight
+from src.models import (
+    BiologyRequest, MaterialsRequest, BiologyBatchRequest, MaterialsBatchRequest, DatasetRequest, MAX_DATASET_ROWS,
+    MAX_BATCH_ITEMS, AstroRequest, AstroBatchRequest, HEPRequest, HEPBatchRequest, BiologyStructureRequest, JobRequest,
+    MaterialsScreeningRequest
+)
+from src.Utils import to_columnar
 
 app = FastAPI(title="Lambda0 API", version="1.0.0")
 logger = logging.getLogger("lambda0")
 logging.basicConfig(level=logging.INFO)
 
-MODEL_PATHS = {
-    "bio": {
-        "1": "C:/Users/kunya/PycharmProjects/HelixSynth/models/NexaBio_1.pt",
-        "2": "C:/Users/kunya/PycharmProjects/HelixSynth/models/NexaBio_2.pt"
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.getenv("NEXA_CONFIG", os.path.join(PROJECT_ROOT, "config.json"))
+config = Config(CONFIG_PATH)
+
+# Thread and CPU plan for this worker. CPUs are pinned here, before the executor and startup
+# threads exist so they all inherit the mask; torch threads are sized when the startup phase imports it
+runtime_settings = config.get("runtime", {})
+runtime_plan = worker_plan(runtime_settings)
+pin_cpus(runtime_plan)
+
+registry_settings = config.get("registry", {})
+batching_settings = config.get("batching", {})
+registry = ModelRegistry(
+    os.getenv("MODEL_DIR", os.path.join(PROJECT_ROOT, registry_settings.get("models_dir", "models"))),
+    memory_budget_mb=registry_settings.get("memory_budget_mb"),
+    pinned=registry_settings.get("pinned", []),
+    engine_options={
+        "mmap_dir": os.getenv("MODEL_MMAP_DIR", registry_settings.get("mmap_dir")),
+        "length_buckets": batching_settings.get("length_buckets"),
+        "export_dir": os.getenv("MODEL_EXPORT_DIR", registry_settings.get("export_dir"))
     },
-    "materials": {
-        "1": "C:/Users/kunya/PycharmProjects/HelixSynth/models/NexaMat_1.pt",
-        "2": "C:/Users/kunya/PycharmProjects/HelixSynth/models/NexaMat_2.pt"
-    }
-}
+    model_options=config.get("models", {})
+)
+
+executor_settings = dict(config.get("executor", {}))
+executor_settings.setdefault(
+    "process_threads",
+    max(1, runtime_plan["intra_op_threads"] // executor_settings.get("max_workers", 4))
+    if runtime_plan["intra_op_threads"] else 0
+)
+executor = InferenceExecutor(**executor_settings)
+
+cache_settings = config.get("cache", {})
+cache_ttl = float(os.getenv("MODEL_CACHE_TTL", cache_settings.get("ttl_s", 3600)))
+prediction_cache = PredictionCache(
+    LRUCache(max_entries=cache_settings.get("max_entries", 100000), ttl_s=cache_ttl),
+    make_redis_cache(
+        os.getenv("REDIS_HOST", cache_settings.get("redis_host")),
+        int(os.getenv("REDIS_PORT", cache_settings.get("redis_port", 6379))),
+        ttl_s=cache_ttl
+    ) if cache_settings.get("redis", True) else None
+) if cache_settings.get("enabled", True) else None
+
+audit_settings = config.get("audit", {})
+audit_log = AuditLog(
+    make_audit_sink(audit_settings),
+    capacity=audit_settings.get("capacity", 100000),
+    batch_size=audit_settings.get("batch_size", 1000),
+    flush_interval_s=audit_settings.get("flush_interval_s", 1.0),
+    include_results=audit_settings.get("include_results", True),
+    max_backoff_s=audit_settings.get("max_backoff_s", 60.0)
+) if audit_settings.get("enabled", False) else None
+
+# Identical single predictions in flight at the same time share one lookup and forward pass
+singleflight = SingleFlight() if config.get("singleflight", {}).get("enabled", True) else None
+
+batchers = {}
+
+async def score_chunk(model_type: str, inputs: list) -> list:
+    """Score one chunk of a job or screen on the executor, waiting out a full queue instead of failing"""
+    engine = await get_engine(model_type)
+    while True:
+        try:
+            return await executor.submit(model_type, engine, "predict_batch", inputs)
+        except QueueFullError as e:
+            await asyncio.sleep(e.retry_after)
 
-engines = {}
-for model_type in ["bio_1", "bio_2", "mat_1", "mat_2"]:
+job_settings = config.get("jobs", {})
+UPLOAD_WRITE_BYTES = 4 * 1024 * 1024
+job_store = JobStore(job_settings.get("path", "/tmp/nexa-jobs/jobs.db")) if job_settings.get("enabled", True) else None
+job_runner = JobRunner(
+    job_store,
+    score_chunk,
+    job_settings.get("directory", "/tmp/nexa-jobs"),
+    chunk_size=job_settings.get("chunk_size", 1024),
+    max_running=job_settings.get("max_running", 1),
+    poll_interval_s=job_settings.get("poll_interval_s", 1.0),
+    stale_after_s=job_settings.get("stale_after_s", 300),
+    retention_s=job_settings.get("retention_s", 7 * 24 * 3600),
+    sweep_interval_s=job_settings.get("sweep_interval_s", 3600)
+) if job_store is not None else None
+
+async def get_engine(model_type: str):
+    """Return a loaded engine, loading it off the event loop on first use"""
+    engine = registry.peek(model_type)
+    if engine is not None:
+        return engine
+    if not registry.is_servable(model_type):
+        raise HTTPException(status_code=500, detail="Model not loaded")
     try:
-        domain, version = model_type.split("_")
-        if domain == "bio":
-            engines[model_type] = BiologyInferenceEngine(MODEL_PATHS["bio"][version])
-        else:
-            engines[model_type] = MaterialsInferenceEngine(MODEL_PATHS["materials"][version])
+        return await asyncio.to_thread(registry.get, model_type)
     except Exception as e:
         logger.error(f"Failed to load {model_type} model: {str(e)}")
-        engines[model_type] = None
+        raise HTTPException(status_code=500, detail="Model not loaded")
+
+def get_batcher(model_type: str) -> MicroBatcher:
+    if not registry.is_servable(model_type):
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    if model_type not in batchers:
+        entry = registry.entry(model_type)
+        batchers[model_type] = MicroBatcher(
+            lambda: get_engine(model_type),
+            executor,
+            model_type,
+            max_batch_size=batching_settings.get("max_batch_size", 32),
+            max_wait_ms=batching_settings.get("max_wait_ms", 5),
+            max_queue_size=batching_settings.get("max_queue_size", 1024),
+            labels=(entry["family"], entry["version"])
+        )
+    return batchers[model_type]
 
 latency_metrics = {
     "bio": deque(maxlen=100),
-    "materials": deque(maxlen=100)
+    "materials": deque(maxlen=100),
+    "astro": deque(maxlen=100),
+    "hep": deque(maxlen=100)
 }
 request_counts = {
     "bio": 0,
-    "materials": 0
+    "materials": 0,
+    "astro": 0,
+    "hep": 0
 }
 
 @app.middleware("http")
@@ -56,25 +168,192 @@ async def add_process_time_header(request: Request, call_next):
     response = await call_next(request)
     process_time = (time.perf_counter() - start_time) * 1000
     response.headers["X-Process-Time-ms"] = str(round(process_time, 2))
+    # Label by route template, not raw URL, to keep series cardinality bounded
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    HTTP_REQUESTS.labels(request.method, route_path, str(response.status_code)).inc()
+    HTTP_LATENCY.labels(request.method, route_path).observe(process_time / 1000)
     path = request.url.path
-    if path.startswith("/api/predict/bio"):
-        latency_metrics["bio"].append(process_time)
-        request_counts["bio"] += 1
-    elif path.startswith("/api/predict/materials"):
-        latency_metrics["materials"].append(process_time)
-        request_counts["materials"] += 1
+    for endpoint in latency_metrics:
+        if path.startswith(f"/api/predict/{endpoint}"):
+            latency_metrics[endpoint].append(process_time)
+            request_counts[endpoint] += 1
+            break
     return response
 
+startup_settings = config.get("startup", {})
+startup_state = {"ready": False, "phases": {}, "models": {}, "failed": []}
+warmup_tasks = set()
+
+async def warm_up():
+    """Load the startup models in parallel and warm them up; /ready turns 200 once all of them succeed"""
+    start = time.perf_counter()
+    # Size torch's thread pools before any model runs
+    await asyncio.to_thread(configure_runtime, runtime_settings)
+    startup_state["phases"]["torch_import_s"] = round(time.perf_counter() - start, 3)
+    start = time.perf_counter()
+    models = await asyncio.to_thread(
+        registry.prewarm,
+        startup_settings.get("models"),
+        warmup_batches=startup_settings.get("warmup_batches", 3),
+        warmup_batch_size=startup_settings.get("warmup_batch_size", 32),
+        max_workers=startup_settings.get("parallel_loads", 4)
+    )
+    startup_state["phases"]["models_s"] = round(time.perf_counter() - start, 3)
+    startup_state["models"] = models
+    # A startup model that failed to load keeps the worker out of rotation instead of serving without it
+    startup_state["failed"] = sorted(key for key, timings in models.items() if "error" in timings)
+    startup_state["ready"] = not startup_state["failed"]
+    for key, timings in models.items():
+        if "error" in timings:
+            continue
+        logger.info(
+            f"Startup {key}: torch.load {timings['torch_load_s']:.3f}s, precision {timings['precision_s']:.3f}s, "
+            f"backend {timings['backend_s']:.3f}s, warm-up {timings['warmup_s']:.3f}s"
+        )
+    logger.info(
+        f"Ready after imports {startup_state['phases']['imports_s']:.2f}s, "
+        f"torch import {startup_state['phases']['torch_import_s']:.2f}s, "
+        f"model load and warm-up {startup_state['phases']['models_s']:.2f}s ({len(models)} models)"
+    )
+
+@app.on_event("startup")
+async def prewarm_models():
+    startup_state["phases"]["imports_s"] = round(time.perf_counter() - IMPORT_START, 3)
+    # Warm up in the background so /health answers while models load
+    task = asyncio.create_task(warm_up())
+    warmup_tasks.add(task)
+    task.add_done_callback(warmup_tasks.discard)
+    if audit_log is not None:
+        audit_log.start()
+    if job_runner is not None:
+        job_runner.start()
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    if job_runner is not None:
+        await job_runner.stop()
+    executor.shutdown()
+    if audit_log is not None:
+        await audit_log.stop()
+
+def overloaded(error: QueueFullError) -> HTTPException:
+    """Map a full inference queue to a 429/503 carrying Retry-After"""
+    return HTTPException(
+        status_code=executor.reject_status,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, round(error.retry_after)))}
+    )
+
+def audit(model_type: str, labels: tuple, inputs: list, results: list, start: float, sources: list):
+    """Queue audit records for served predictions; hashing and writing happen in the background"""
+    if audit_log is not None:
+        audit_log.record(model_type, labels, inputs, results, time.perf_counter() - start, sources)
+
+async def cache_keys(model_type: str, inputs: list) -> list:
+    entry = registry.entry(model_type)
+    fingerprint = registry.known_checkpoint_hash(model_type)
+    if fingerprint is None:
+        fingerprint = await asyncio.to_thread(registry.checkpoint_hash, model_type)
+    return [prediction_key(entry["family"], entry["version"], fingerprint, input_data) for input_data in inputs]
+
+async def lookup_or_predict(batcher: MicroBatcher, key: Optional[str], input_data: dict):
+    """(result, source) from the cache when present, otherwise from the engine's micro-batcher"""
+    if prediction_cache is not None:
+        cached = await prediction_cache.get(key)
+        if cached is not None:
+            return cached, "cache"
+    result = await batcher.submit(input_data)
+    if prediction_cache is not None:
+        await prediction_cache.set(key, result)
+    return result, "engine"
+
+async def predict_one(model_type: str, input_data: dict) -> dict:
+    """
+    Serve one prediction from the cache, or through the engine's micro-batcher.
+    Identical requests already in flight share that lookup and forward pass.
+    """
+    start = time.perf_counter()
+    batcher = get_batcher(model_type)
+    labels = batcher.labels
+    key = None
+    if prediction_cache is not None or singleflight is not None:
+        key = (await cache_keys(model_type, [input_data]))[0]
+    if singleflight is None:
+        result, source = await lookup_or_predict(batcher, key, input_data)
+    else:
+        (result, source), shared = await singleflight.do(
+            key, lambda: lookup_or_predict(batcher, key, input_data), labels
+        )
+        if shared:
+            source = "coalesced"
+    PREDICTIONS.labels(*labels, source).inc()
+    audit(model_type, labels, [input_data], [result], start, [source])
+    return result
+
+async def run_batch(model_type: str, inputs: list) -> list:
+    """Score a large batch directly on the executor, split into chunks that run side by side"""
+    start = time.perf_counter()
+    engine = await get_engine(model_type)
+    results = [None] * len(inputs)
+    keys = []
+    if prediction_cache is not None:
+        keys = await cache_keys(model_type, inputs)
+        results = await prediction_cache.get_many(keys)
+    missing = [i for i, result in enumerate(results) if result is None]
+    chunk_size = batching_settings.get("chunk_size", 1024)
+    chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+    tasks = [
+        asyncio.ensure_future(executor.submit(model_type, engine, "predict_batch", [inputs[i] for i in chunk]))
+        for chunk in chunks
+    ]
+    try:
+        chunk_results = await asyncio.gather(*tasks)
+    except BaseException:
+        # The batch has already failed, so the other chunks give their queue slots back instead of running
+        for task in tasks:
+            task.cancel()
+        raise
+    for chunk, chunk_result in zip(chunks, chunk_results):
+        for i, result in zip(chunk, chunk_result):
+            results[i] = result
+    entry = registry.entry(model_type)
+    PREDICTIONS.labels(entry["family"], entry["version"], "engine").inc(len(missing))
+    PREDICTIONS.labels(entry["family"], entry["version"], "cache").inc(len(inputs) - len(missing))
+    if prediction_cache is not None and missing:
+        await prediction_cache.set_many({keys[i]: results[i] for i in missing})
+    if audit_log is not None:
+        sources = ["cache"] * len(inputs)
+        for i in missing:
+            sources[i] = "engine"
+        audit(model_type, (entry["family"], entry["version"]), inputs, results, start, sources)
+    return results
+
+def response_format(request: Request) -> str:
+    """Response media type from the Accept header: JSON by default, or msgpack / Arrow IPC"""
+    fmt = negotiate(request.headers.get("accept"))
+    if fmt is None:
+        raise HTTPException(status_code=406, detail=f"Supported response types: {', '.join(supported_formats())}")
+    return fmt
+
+def encoded_response(model_type: str, content, fmt: str = JSON) -> Response:
+    entry = registry.entry(model_type)
+    with stage_timer(entry["family"], entry["version"], "serialize"):
+        return Response(content=encode(content, fmt), media_type=fmt)
+
+def record_error(model_type: str, error: Exception):
+    entry = registry.entry(model_type)
+    ERRORS.labels(entry["family"], entry["version"], type(error).__name__).inc()
+
+def batch_response(model_name: str, results: list, columnar: bool) -> dict:
+    if columnar:
+        return {"model": model_name, "count": len(results), "columns": to_columnar(results)}
+    return {"model": model_name, "count": len(results), "results": results}
+
 def get_avg_latency(endpoint: str):
     values = latency_metrics[endpoint]
     return round(sum(values) / len(values), 2) if values else 0.0
 
-def random_sequence(length=16):
-    return ''.join(random.choices('ACDEFGHIKLMNPQRSTVWY', k=length))
-
-def random_structure(length=8):
-    return ''.join(random.choices(string.ascii_uppercase, k=length))
-
 @app.get("/")
 async def root():
     return RedirectResponse(url="/dashboard")
@@ -84,19 +363,38 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "models": {
-            "bio": list(MODEL_PATHS["bio"].keys()),
-            "materials": list(MODEL_PATHS["materials"].keys())
-        }
+        "models": registry.available(),
+        "loaded_models": registry.loaded(),
+        "execution": registry.execution(),
+        "runtime": {**(runtime_info() or runtime_plan), "executor_mode": executor.mode},
+        "audit": audit_log.stats() if audit_log is not None else None,
+        "model_memory_mb": round(registry.memory_usage() / 1024 / 1024, 2)
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness, separate from liveness: 503 until every startup model is loaded and warmed up"""
+    return JSONResponse(status_code=200 if startup_state["ready"] else 503, content=startup_state)
+
 @app.get("/metrics")
-async def get_metrics(_=Depends(verify_api_key)):
+async def get_metrics():
+    """Prometheus text exposition, aggregated across gunicorn workers"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/metrics/summary")
+async def get_metrics_summary(_=Depends(verify_api_key)):
     return {
         "bio_avg_latency_ms": get_avg_latency("bio"),
         "materials_avg_latency_ms": get_avg_latency("materials"),
         "bio_requests": request_counts["bio"],
-        "materials_requests": request_counts["materials"]
+        "materials_requests": request_counts["materials"],
+        "astro_avg_latency_ms": get_avg_latency("astro"),
+        "hep_avg_latency_ms": get_avg_latency("hep"),
+        "astro_requests": request_counts["astro"],
+        "hep_requests": request_counts["hep"],
+        "prediction_cache": prediction_cache.stats() if prediction_cache is not None else None,
+        "singleflight": singleflight.stats() if singleflight is not None else None
     }
 
 @app.get("/dashboard", response_class=HTMLResponse)
@@ -224,7 +522,7 @@ async def dashboard():
                 }
 
                 async function updateMetrics() {
-                    const res = await fetch('/metrics', { headers: { 'X-API-Key': 'development_key' } });
+                    const res = await fetch('/metrics/summary', { headers: { 'X-API-Key': 'development_key' } });
                     const data = await res.json();
                     document.getElementById('bio1-latency').innerText = data.bio_avg_latency_ms;
                     document.getElementById('bio2-latency').innerText = data.bio_avg_latency_ms;
@@ -256,7 +554,7 @@ async def dashboard():
                     const res = await fetch('/api/predict/bio', {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json', 'X-API-Key': 'development_key' },
-                        body: JSON.stringify({ sequence: seq, model_version: '1', confidence_threshold: 0.8 })
+                        body: JSON.stringify({ sequence: seq, model_version: '1' })
                     });
                     const data = await res.json();
                     document.getElementById('bio1Result').innerHTML = '<pre>' + syntaxHighlight(data) + '</pre>';
@@ -267,7 +565,7 @@ async def dashboard():
                     const res = await fetch('/api/predict/bio', {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json', 'X-API-Key': 'development_key' },
-                        body: JSON.stringify({ sequence: seq, model_version: '2', confidence_threshold: 0.8 })
+                        body: JSON.stringify({ sequence: seq, model_version: '2' })
                     });
                     const data = await res.json();
                     document.getElementById('bio2Result').innerHTML = '<pre>' + syntaxHighlight(data) + '</pre>';
@@ -330,36 +628,36 @@ async def dashboard():
     """
 
 @app.post("/api/predict/bio")
-async def predict_bio(request: BiologyRequest, _=Depends(verify_api_key)):
+async def predict_bio(request: BiologyRequest, fmt: str = Depends(response_format),
+                      _=Depends(verify_api_key)):
+    model_type = f"bio_{request.model_version}"
     try:
-        engine = engines.get(f"bio_{request.model_version}")
-        if engine is None:
-            raise HTTPException(status_code=500, detail="Model not loaded")
-        raw_result = engine.predict({
+        raw_result = await predict_one(model_type, {
             "sequence": request.sequence,
             "confidence_threshold": request.confidence_threshold
         })
-        if "tertiary_coordinates" in raw_result:
-            raw_result["tertiary_coordinates"] = [
-                [float(f"{x[0]:.2f}"), float(f"{x[1]:.2f}"), float(f"{x[2]:.2f}")]
-                for x in raw_result["tertiary_coordinates"]
-            ]
         result = {
             "model": f"NexaBio_{request.model_version}",
             **raw_result
         }
-        return JSONResponse(content=result)
+        return encoded_response(model_type, result, fmt)
+    except QueueFullError as e:
+        record_error(model_type, e)
+        raise overloaded(e)
+    except HTTPException as e:
+        record_error(model_type, e)
+        raise
     except Exception as e:
+        record_error(model_type, e)
         logger.error(f"Biology prediction failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/predict/materials")
-async def predict_materials(request: MaterialsRequest, _=Depends(verify_api_key)):
+async def predict_materials(request: MaterialsRequest, fmt: str = Depends(response_format),
+                            _=Depends(verify_api_key)):
+    model_type = f"mat_{request.model_version}"
     try:
-        engine = engines.get(f"mat_{request.model_version}")
-        if engine is None:
-            raise HTTPException(status_code=500, detail="Model not loaded")
-        raw_result = engine.predict({
+        raw_result = await predict_one(model_type, {
             "structure": request.structure,
             "energy_threshold": request.energy_threshold
         })
@@ -367,80 +665,415 @@ async def predict_materials(request: MaterialsRequest, _=Depends(verify_api_key)
             "model": f"NexaMat_{request.model_version}",
             **raw_result
         }
-        return JSONResponse(content=result)
+        return encoded_response(model_type, result, fmt)
+    except QueueFullError as e:
+        record_error(model_type, e)
+        raise overloaded(e)
+    except HTTPException as e:
+        record_error(model_type, e)
+        raise
     except Exception as e:
+        record_error(model_type, e)
         logger.error(f"Materials prediction failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/dataset/bio")
-async def generate_bio_dataset(size: int = 100, _=Depends(verify_api_key)):
-    dataset = []
-    for _ in range(size):
-        entry = {
-            "sequence": random_sequence(16),
-            "structure": random_structure(8),
-            "confidence": round(random.uniform(0.7, 1.0), 3),
-            "length": random.randint(10, 100)
+@app.post("/api/predict/bio/batch")
+async def predict_bio_batch(request: BiologyBatchRequest, fmt: str = Depends(response_format),
+                            _=Depends(verify_api_key)):
+    model_type = f"bio_{request.model_version}"
+    try:
+        results = await run_batch(model_type, [
+            {"sequence": sequence, "confidence_threshold": request.confidence_threshold}
+            for sequence in request.sequences
+        ])
+        response = batch_response(f"NexaBio_{request.model_version}", results, request.columnar)
+        return encoded_response(model_type, response, fmt)
+    except QueueFullError as e:
+        record_error(model_type, e)
+        raise overloaded(e)
+    except HTTPException as e:
+        record_error(model_type, e)
+        raise
+    except Exception as e:
+        record_error(model_type, e)
+        logger.error(f"Biology batch prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/predict/bio/structure")
+async def predict_bio_structure(request: BiologyStructureRequest, _=Depends(verify_api_key)):
+    """Predicted C-alpha traces streamed as one PDB, mol2 or mmCIF file"""
+    from src.structure_export import MEDIA_TYPES as STRUCTURE_MEDIA_TYPES, check_structures, stream_structures
+
+    model_type = f"bio_{request.model_version}"
+    sequences = [request.sequence] if request.sequence is not None else request.sequences
+    inputs = [{"sequence": sequence, "confidence_threshold": request.confidence_threshold} for sequence in sequences]
+    try:
+        if len(inputs) == 1:
+            results = [await predict_one(model_type, inputs[0])]
+        else:
+            results = await run_batch(model_type, inputs)
+    except QueueFullError as e:
+        record_error(model_type, e)
+        raise overloaded(e)
+    except HTTPException as e:
+        record_error(model_type, e)
+        raise
+    except Exception as e:
+        record_error(model_type, e)
+        logger.error(f"Biology structure prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    # Predictions below the confidence threshold carry no coordinates and are left out of the file
+    structures = [
+        (result["sequence"], result["tertiary_coordinates"], result["confidence"])
+        for result in results if len(result.get("tertiary_coordinates", []))
+    ]
+    if not structures:
+        raise HTTPException(status_code=422, detail="No structure passed the confidence threshold")
+    try:
+        check_structures(request.format, structures)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return StreamingResponse(
+        stream_structures(request.format, structures),
+        media_type=STRUCTURE_MEDIA_TYPES[request.format],
+        headers={
+            "Content-Disposition": f"attachment; filename=NexaBio_{request.model_version}.{request.format}",
+            "X-Structures-Skipped": str(len(results) - len(structures))
         }
-        dataset.append(entry)
-    return JSONResponse(content=dataset)
+    )
 
-@app.post("/api/dataset/materials")
-async def generate_materials_dataset(size: int = 100, _=Depends(verify_api_key)):
-    dataset = []
-    for _ in range(size):
-        entry = {
-            "formation_energy_per_atom": round(random.uniform(-5, 5), 3),
-            "energy_per_atom": round(random.uniform(-10, 10), 3),
-            "density": round(random.uniform(0.5, 20.0), 3),
-            "volume": round(random.uniform(10, 1000), 2),
-            "n_elements": random.randint(1, 10),
-            "li_fraction": round(random.uniform(0, 1), 3),
-            "predicted_band_gap": round(random.uniform(0, 5), 3),
-            "confidence_score": round(random.uniform(0.7, 1.0), 3)
+@app.post("/api/predict/materials/batch")
+async def predict_materials_batch(request: MaterialsBatchRequest, fmt: str = Depends(response_format),
+                                  _=Depends(verify_api_key)):
+    model_type = f"mat_{request.model_version}"
+    try:
+        results = await run_batch(model_type, [
+            {"structure": structure, "energy_threshold": request.energy_threshold}
+            for structure in request.structures
+        ])
+        response = batch_response(f"NexaMat_{request.model_version}", results, request.columnar)
+        return encoded_response(model_type, response, fmt)
+    except QueueFullError as e:
+        record_error(model_type, e)
+        raise overloaded(e)
+    except HTTPException as e:
+        record_error(model_type, e)
+        raise
+    except Exception as e:
+        record_error(model_type, e)
+        logger.error(f"Materials batch prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/predict/astro")
+async def predict_astro(request: AstroRequest, fmt: str = Depends(response_format),
+                        _=Depends(verify_api_key)):
+    model_type = f"astro_{request.model_version}"
+    try:
+        raw_result = await predict_one(model_type, request.model_dump(exclude={"model_version"}))
+        result = {
+            "model": f"NexaAstro_{request.model_version}",
+            **raw_result
         }
-        dataset.append(entry)
-    return JSONResponse(content=dataset)
+        return encoded_response(model_type, result, fmt)
+    except QueueFullError as e:
+        record_error(model_type, e)
+        raise overloaded(e)
+    except HTTPException as e:
+        record_error(model_type, e)
+        raise
+    except Exception as e:
+        record_error(model_type, e)
+        logger.error(f"Astro prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/dataset/bio/csv")
-async def generate_bio_dataset_csv(size: int = 100, _=Depends(verify_api_key)):
-    dataset = []
-    for _ in range(size):
-        entry = {
-            "sequence": random_sequence(16),
-            "structure": random_structure(8),
-            "confidence": round(random.uniform(0.7, 1.0), 3),
-            "length": random.randint(10, 100)
+@app.post("/api/predict/hep")
+async def predict_hep(request: HEPRequest, fmt: str = Depends(response_format),
+                      _=Depends(verify_api_key)):
+    model_type = f"hep_{request.model_version}"
+    try:
+        raw_result = await predict_one(model_type, {"particles": request.particles})
+        result = {
+            "model": f"NexaHEP_{request.model_version}",
+            **raw_result
         }
-        dataset.append(entry)
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=dataset[0].keys())
-    writer.writeheader()
-    writer.writerows(dataset)
-    output.seek(0)
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=bio_dataset.csv"})
+        return encoded_response(model_type, result, fmt)
+    except QueueFullError as e:
+        record_error(model_type, e)
+        raise overloaded(e)
+    except HTTPException as e:
+        record_error(model_type, e)
+        raise
+    except Exception as e:
+        record_error(model_type, e)
+        logger.error(f"HEP prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/predict/astro/batch")
+async def predict_astro_batch(request: AstroBatchRequest, fmt: str = Depends(response_format),
+                              _=Depends(verify_api_key)):
+    model_type = f"astro_{request.model_version}"
+    try:
+        results = await run_batch(model_type, [obj.model_dump() for obj in request.objects])
+        response = batch_response(f"NexaAstro_{request.model_version}", results, request.columnar)
+        return encoded_response(model_type, response, fmt)
+    except QueueFullError as e:
+        record_error(model_type, e)
+        raise overloaded(e)
+    except HTTPException as e:
+        record_error(model_type, e)
+        raise
+    except Exception as e:
+        record_error(model_type, e)
+        logger.error(f"Astro batch prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/predict/hep/batch")
+async def predict_hep_batch(request: HEPBatchRequest, fmt: str = Depends(response_format),
+                            _=Depends(verify_api_key)):
+    model_type = f"hep_{request.model_version}"
+    try:
+        results = await run_batch(model_type, [{"particles": particles} for particles in request.events])
+        response = batch_response(f"NexaHEP_{request.model_version}", results, request.columnar)
+        return encoded_response(model_type, response, fmt)
+    except QueueFullError as e:
+        record_error(model_type, e)
+        raise overloaded(e)
+    except HTTPException as e:
+        record_error(model_type, e)
+        raise
+    except Exception as e:
+        record_error(model_type, e)
+        logger.error(f"HEP batch prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def dataset_response(model_type: str, size: int, fmt: str, filename: str = None, seed: int = None) -> StreamingResponse:
+    # Imported here so numpy loads with the first dataset request rather than at startup
+    from src.datasets import MEDIA_TYPES, pyarrow_available, stream_dataset
+
+    if size < 1 or size > MAX_DATASET_ROWS:
+        raise HTTPException(status_code=422, detail=f"size must be between 1 and {MAX_DATASET_ROWS}")
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=422, detail=f"Unsupported format: {fmt}")
+    if fmt == "parquet" and not pyarrow_available():
+        raise HTTPException(status_code=501, detail="Parquet output requires pyarrow")
+    headers = {"Content-Disposition": f"attachment; filename={filename}"} if filename else None
+    return StreamingResponse(stream_dataset(model_type, size, fmt, seed), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+@app.post("/api/dataset/bio")
+async def generate_bio_dataset(size: int = 100, seed: Optional[int] = None, _=Depends(verify_api_key)):
+    return dataset_response("bio", size, "json", seed=seed)
+
+@app.post("/api/dataset/materials")
+async def generate_materials_dataset(size: int = 100, seed: Optional[int] = None, _=Depends(verify_api_key)):
+    return dataset_response("materials", size, "json", seed=seed)
+
+@app.post("/api/dataset/bio/csv")
+async def generate_bio_dataset_csv(size: int = 100, seed: Optional[int] = None, _=Depends(verify_api_key)):
+    return dataset_response("bio", size, "csv", "bio_dataset.csv", seed)
 
 @app.post("/api/dataset/materials/csv")
-async def generate_materials_dataset_csv(size: int = 100, _=Depends(verify_api_key)):
-    dataset = []
-    for _ in range(size):
-        entry = {
-            "formation_energy_per_atom": round(random.uniform(-5, 5), 3),
-            "energy_per_atom": round(random.uniform(-10, 10), 3),
-            "density": round(random.uniform(0.5, 20.0), 3),
-            "volume": round(random.uniform(10, 1000), 2),
-            "n_elements": random.randint(1, 10),
-            "li_fraction": round(random.uniform(0, 1), 3),
-            "predicted_band_gap": round(random.uniform(0, 5), 3),
-            "confidence_score": round(random.uniform(0.7, 1.0), 3)
-        }
-        dataset.append(entry)
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=dataset[0].keys())
-    writer.writeheader()
-    writer.writerows(dataset)
-    output.seek(0)
-    return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=materials_dataset.csv"})
+async def generate_materials_dataset_csv(size: int = 100, seed: Optional[int] = None, _=Depends(verify_api_key)):
+    return dataset_response("materials", size, "csv", "materials_dataset.csv", seed)
+
+@app.post("/api/dataset/stream")
+async def stream_dataset_file(request: DatasetRequest, _=Depends(verify_api_key)):
+    """Stream any dataset size as CSV, NDJSON, JSON or Parquet with constant memory"""
+    extension = {"ndjson": "jsonl"}.get(request.format, request.format)
+    return dataset_response(
+        request.model_type, request.size, request.format, f"{request.model_type}_dataset.{extension}", request.seed
+    )
+
+def job_queue() -> JobRunner:
+    if job_runner is None:
+        raise HTTPException(status_code=503, detail="Job queue is disabled")
+    return job_runner
+
+def job_model(model_type: str, model_version: str) -> str:
+    model_key = f"{MODEL_PREFIXES[model_type]}_{model_version}"
+    if not registry.is_servable(model_key):
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    return model_key
+
+async def find_job(job_id: str) -> dict:
+    job = await asyncio.to_thread(job_queue().store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def check_job_threshold(model_type: str, threshold: Optional[float]):
+    if model_type == "bio" and threshold is not None and threshold > 1.0:
+        raise HTTPException(status_code=422, detail="A bio confidence threshold must be between 0 and 1")
+
+def write_job_inputs(path: str, candidates: list, field: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps({field: candidate}) + "\n" for candidate in candidates)
+
+def count_job_inputs(path: str, model_type: str) -> int:
+    """Validate an uploaded candidate file line by line and return its size"""
+    total = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    parse_candidate(line, model_type)
+                except ValueError as e:
+                    raise ValueError(f"line {number}: {e}")
+                total += 1
+    return total
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request: JobRequest, _=Depends(verify_api_key)):
+    """Queue a screening job over generated or listed candidates; poll /api/jobs/{job_id} for progress"""
+    runner = job_queue()
+    job_model(request.model_type, request.model_version)
+    field = CANDIDATES[request.model_type][0]
+    spec = {"chunk_size": runner.chunk_size}
+    if request.threshold is not None:
+        spec["threshold"] = request.threshold
+    if request.candidates is not None:
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(write_job_inputs, runner.upload_path(job_id), request.candidates, field)
+        source, total = "upload", len(request.candidates)
+    else:
+        job_id = None
+        spec.update({
+            "num_candidates": request.num_candidates,
+            "length": request.length or CANDIDATES[request.model_type][3],
+            "seed": request.seed if request.seed is not None else uuid.uuid4().int % 2 ** 32
+        })
+        source, total = "generate", request.num_candidates
+    job_id = await asyncio.to_thread(
+        runner.store.create, request.model_type, request.model_version, source, spec, total, job_id
+    )
+    runner.notify()
+    return job_status(await find_job(job_id))
+
+@app.post("/api/jobs/upload", status_code=202)
+async def upload_job(request: Request, model_type: str = Query(..., pattern="^(bio|materials)$"),
+                     model_version: str = Query(default="2", pattern="^[12]$"),
+                     threshold: Optional[float] = Query(default=None, ge=0.0), _=Depends(verify_api_key)):
+    """
+    Queue a job over an uploaded file sent as the raw request body: one sequence or
+    structure per line, or NDJSON objects carrying the same field plus optional thresholds.
+    """
+    runner = job_queue()
+    job_model(model_type, model_version)
+    check_job_threshold(model_type, threshold)
+    job_id = uuid.uuid4().hex
+    path = runner.upload_path(job_id)
+    max_bytes = job_settings.get("max_upload_mb", 1024) * 1024 * 1024
+    received = 0
+    pending = bytearray()
+    try:
+        with open(path, "wb") as f:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes // 1024 // 1024} MB")
+                pending += chunk
+                # Disk writes go to a thread a few MB at a time, off the event loop
+                if len(pending) >= UPLOAD_WRITE_BYTES:
+                    await asyncio.to_thread(f.write, bytes(pending))
+                    pending.clear()
+            await asyncio.to_thread(f.write, bytes(pending))
+        total = await asyncio.to_thread(count_job_inputs, path, model_type)
+        if total == 0:
+            raise HTTPException(status_code=422, detail="Upload contains no candidates")
+    except (ValueError, UnicodeDecodeError) as e:
+        runner.remove_inputs(job_id)
+        raise HTTPException(status_code=422, detail=f"Invalid upload: {str(e)}")
+    except BaseException:
+        # Also covers the client disconnecting mid-stream, so no partial file is left behind
+        runner.remove_inputs(job_id)
+        raise
+    spec = {"chunk_size": runner.chunk_size}
+    if threshold is not None:
+        spec["threshold"] = threshold
+    await asyncio.to_thread(runner.store.create, model_type, model_version, "upload", spec, total, job_id)
+    runner.notify()
+    return job_status(await find_job(job_id))
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, _=Depends(verify_api_key)):
+    return job_status(await find_job(job_id))
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str, _=Depends(verify_api_key)):
+    """Cancel a queued or running job; results committed so far stay available"""
+    await find_job(job_id)
+    await asyncio.to_thread(job_queue().store.finish, job_id, CANCELLED)
+    return job_status(await find_job(job_id))
+
+@app.get("/api/jobs/{job_id}/results")
+async def get_job_results(job_id: str, offset: int = Query(default=0, ge=0),
+                          limit: int = Query(default=1000, ge=1, le=MAX_BATCH_ITEMS),
+                          format: str = Query(default="json", pattern="^(json|ndjson)$"), _=Depends(verify_api_key)):
+    """
+    Results committed so far, in input order. JSON returns one page with next_offset
+    (null once a finished job has no more rows); NDJSON streams everything from offset.
+    """
+    job = await find_job(job_id)
+    store = job_queue().store
+    if format == "ndjson":
+        def lines():
+            position = offset
+            while True:
+                page = store.results(job_id, position, limit)
+                if not page:
+                    return
+                yield "\n".join(page) + "\n"
+                position += len(page)
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    # One extra row tells a full last page apart from one with more after it
+    page = await asyncio.to_thread(store.results, job_id, offset, limit + 1)
+    more = len(page) > limit or (job["status"] not in FINISHED and offset + len(page) < job["total"])
+    page = page[:limit]
+    header = json.dumps({
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "count": len(page),
+        "next_offset": offset + len(page) if more else None
+    })
+    # Rows are stored already encoded, so the page is spliced together rather than parsed and re-encoded
+    return Response(content=f'{header[:-1]}, "results": [{",".join(page)}]}}', media_type=JSON)
+
+@app.delete("/api/jobs/{job_id}/results")
+async def purge_job(job_id: str, _=Depends(verify_api_key)):
+    """Delete a finished job with its results and uploaded inputs, ahead of the retention sweep"""
+    job = await find_job(job_id)
+    if job["status"] not in FINISHED:
+        raise HTTPException(status_code=409, detail="Cancel the job before purging it")
+    if not await asyncio.to_thread(job_queue().purge, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job_id, "purged": True}
+
+@app.post("/api/screen/materials")
+async def screen_materials_candidates(request: MaterialsScreeningRequest, _=Depends(verify_api_key)):
+    """
+    Generate and score candidates chunk by chunk, keeping only the top_k by the objective.
+    Streams NDJSON: partial leaderboards every report_every chunks, then the final one.
+    """
+    # Imported here so numpy loads with the first screen rather than at startup
+    from src.screening import Screen, screen_materials
+
+    model_key = job_model("materials", request.model_version)
+    screen = Screen(
+        request.objective,
+        request.goal,
+        request.top_k,
+        {field: bounds.model_dump() for field, bounds in request.filters.items()}
+    )
+    spec = {
+        "num_candidates": request.num_candidates,
+        "length": request.length,
+        "seed": request.seed if request.seed is not None else uuid.uuid4().int % 2 ** 32,
+        "energy_threshold": request.energy_threshold
+    }
+    events = screen_materials(
+        score_chunk, model_key, spec, screen, batching_settings.get("chunk_size", 1024), request.report_every
+    )
+    return StreamingResponse(events, media_type="application/x-ndjson")
 
 if __name__ == "__main__":
     import uvicorn
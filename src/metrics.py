@@ -0,0 +1,97 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR must be set before this module is imported;
+# every worker then writes its samples there and render() aggregates them.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ["method", "path", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "End-to-end HTTP request latency", ["method", "path"],
+    buckets=LATENCY_BUCKETS
+)
+PREDICTIONS = Counter(
+    "nexa_predictions_total", "Predictions served, by where the result came from",
+    ["model", "version", "source"]
+)
+STAGE_LATENCY = Histogram(
+    "nexa_stage_latency_seconds", "Time spent per inference stage",
+    ["model", "version", "stage"], buckets=LATENCY_BUCKETS
+)
+BATCH_SIZE = Histogram(
+    "nexa_batch_size", "Inputs per engine forward pass", ["model", "version"], buckets=BATCH_BUCKETS
+)
+ERRORS = Counter(
+    "nexa_errors_total", "Failed prediction requests by error type", ["model", "version", "error"]
+)
+BUCKET_SEQUENCES = Counter(
+    "nexa_bucket_sequences_total", "Sequences run per length bucket", ["model", "version", "bucket"]
+)
+BUCKET_RESIDUES = Counter(
+    "nexa_bucket_residues_total", "Residue positions per length bucket: real residues vs positions computed after padding",
+    ["model", "version", "bucket", "kind"]
+)
+BUCKET_LATENCY = Histogram(
+    "nexa_bucket_latency_seconds", "Time to run one length bucket end to end", ["model", "version", "bucket"],
+    buckets=LATENCY_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    "nexa_cache_lookups_total", "Prediction cache lookups by result", ["result"]
+)
+SINGLEFLIGHT = Counter(
+    "nexa_singleflight_requests_total",
+    "Predictions that ran the engine (leader) vs awaited an identical in-flight one (coalesced)",
+    ["model", "version", "outcome"]
+)
+AUDIT_RECORDS = Counter(
+    "nexa_audit_records_total", "Prediction audit records by outcome (written, dropped, failed)", ["outcome"]
+)
+
+
+def model_labels(model_path: str):
+    """(model, version) labels from a checkpoint name such as NexaBio_2.pt"""
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    model, _, version = name.rpartition("_")
+    return (model, version) if model else (name, "")
+
+
+def observe_stage(model: str, version: str, stage: str, seconds: float):
+    STAGE_LATENCY.labels(model, version, stage).observe(seconds)
+
+
+def observe_bucket(model: str, version: str, bucket: str, sequences: int, residues: int, padded: int,
+                   seconds: float):
+    """Compute statistics of one length bucket, for tuning the bucket boundaries"""
+    BUCKET_SEQUENCES.labels(model, version, bucket).inc(sequences)
+    BUCKET_RESIDUES.labels(model, version, bucket, "real").inc(residues)
+    BUCKET_RESIDUES.labels(model, version, bucket, "computed").inc(padded)
+    BUCKET_LATENCY.labels(model, version, bucket).observe(seconds)
+
+
+@contextmanager
+def stage_timer(model: str, version: str, stage: str):
+    """Time the enclosed block as one inference stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(model, version, stage, time.perf_counter() - start)
+
+
+def render():
+    """Text exposition of all metrics, aggregated across worker processes when multiprocess is on"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
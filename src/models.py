@@ -1,16 +1,152 @@
-from pydantic import BaseModel, Field
+from typing import Annotated, Dict, List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+MAX_BATCH_ITEMS = 10000
+MAX_DATASET_ROWS = 100_000_000
+MAX_EVENT_PARTICLES = 4096
+
+# Properties returned under predicted_properties by the materials engine
+MATERIALS_PROPERTIES = (
+    "formation_energy_per_atom",
+    "energy_per_atom",
+    "density",
+    "volume",
+    "n_elements",
+    "li_fraction",
+    "predicted_band_gap",
+    "confidence_score"
+)
 
 class BiologyRequest(BaseModel):
     sequence: str = Field(..., description="Protein sequence")
     model_version: str = Field(default="2", pattern="^[12]$")
-    confidence_threshold: float = Field(default=0.8, ge=0.0, le=1.0)
+    confidence_threshold: Optional[float] = Field(
+        default=None, ge=0.0, le=1.0, description="Minimum confidence for a structure; defaults per model"
+    )
 
 class MaterialsRequest(BaseModel):
     structure: str = Field(..., description="Material structure")
     model_version: str = Field(default="2", pattern="^[12]$")
     energy_threshold: float = Field(default=0.5, ge=0.0)
 
+class BiologyBatchRequest(BaseModel):
+    sequences: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS, description="Protein sequences")
+    model_version: str = Field(default="2", pattern="^[12]$")
+    confidence_threshold: Optional[float] = Field(
+        default=None, ge=0.0, le=1.0, description="Minimum confidence for a structure; defaults per model"
+    )
+    columnar: bool = Field(default=False, description="Return one array per field instead of a list of records")
+
+class BiologyStructureRequest(BaseModel):
+    sequence: Optional[str] = Field(default=None, description="Protein sequence")
+    sequences: Optional[List[str]] = Field(
+        default=None, min_length=1, max_length=MAX_BATCH_ITEMS, description="Several sequences written to one file"
+    )
+    model_version: str = Field(default="2", pattern="^2$")
+    confidence_threshold: Optional[float] = Field(
+        default=None, ge=0.0, le=1.0, description="Minimum confidence for a structure; defaults per model"
+    )
+    format: str = Field(default="pdb", pattern="^(pdb|mol2|cif)$")
+
+    @model_validator(mode="after")
+    def one_input(self):
+        if (self.sequence is None) == (self.sequences is None):
+            raise ValueError("Provide either sequence or sequences")
+        return self
+
+class MaterialsBatchRequest(BaseModel):
+    structures: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS, description="Material structures")
+    model_version: str = Field(default="2", pattern="^[12]$")
+    energy_threshold: float = Field(default=0.5, ge=0.0)
+    columnar: bool = Field(default=False, description="Return one array per field instead of a list of records")
+
+class AstroObject(BaseModel):
+    u: float = Field(..., description="u-band magnitude")
+    g: float = Field(..., description="g-band magnitude")
+    r: float = Field(..., description="r-band magnitude")
+    i: float = Field(..., description="i-band magnitude")
+    z: float = Field(..., description="z-band magnitude")
+    redshift: float = Field(..., description="Spectroscopic redshift")
+    alpha: float = Field(default=0.0, description="Right ascension (deg)")
+    delta: float = Field(default=0.0, description="Declination (deg)")
+
+class AstroRequest(AstroObject):
+    model_version: str = Field(default="1", pattern="^1$")
+
+class AstroBatchRequest(BaseModel):
+    objects: List[AstroObject] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS, description="Catalog rows")
+    model_version: str = Field(default="1", pattern="^1$")
+    columnar: bool = Field(default=False, description="Return one array per field instead of a list of records")
+
+Particle = Annotated[List[float], Field(min_length=4, max_length=4)]
+
+class HEPRequest(BaseModel):
+    particles: List[Particle] = Field(
+        ..., min_length=1, max_length=MAX_EVENT_PARTICLES, description="Particles as [pt, eta, phi, energy]"
+    )
+    model_version: str = Field(default="1", pattern="^1$")
+
+class HEPBatchRequest(BaseModel):
+    events: List[List[Particle]] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_ITEMS, description="Events, each a list of [pt, eta, phi, energy]"
+    )
+    model_version: str = Field(default="1", pattern="^1$")
+    columnar: bool = Field(default=False, description="Return one array per field instead of a list of records")
+
 class DatasetRequest(BaseModel):
     model_type: str = Field(..., pattern="^(bio|materials)$")
     model_version: str = Field(default="2", pattern="^[12]$")
-    size: int = Field(default=100, ge=10, le=1000)
\ No newline at end of file
+    size: int = Field(default=100, ge=1, le=MAX_DATASET_ROWS)
+    format: str = Field(default="csv", pattern="^(csv|ndjson|json|parquet)$")
+    seed: Optional[int] = Field(default=None, description="Seed for a reproducible dataset")
+
+class JobRequest(BaseModel):
+    model_type: str = Field(..., pattern="^(bio|materials)$")
+    model_version: str = Field(default="2", pattern="^[12]$")
+    num_candidates: Optional[int] = Field(
+        default=None, ge=1, le=MAX_DATASET_ROWS, description="Generate this many random candidates"
+    )
+    candidates: Optional[List[str]] = Field(
+        default=None, min_length=1, max_length=MAX_BATCH_ITEMS, description="Sequences or structures to score"
+    )
+    length: Optional[int] = Field(default=None, ge=1, le=1024, description="Generated candidate length")
+    seed: Optional[int] = Field(default=None, description="Seed for reproducible generated candidates")
+    threshold: Optional[float] = Field(
+        default=None, ge=0.0, description="Confidence threshold (0-1) for bio, energy threshold for materials"
+    )
+
+    @model_validator(mode="after")
+    def one_source(self):
+        if (self.num_candidates is None) == (self.candidates is None):
+            raise ValueError("Provide either num_candidates or candidates")
+        return self
+
+    @model_validator(mode="after")
+    def bounded_threshold(self):
+        if self.model_type == "bio" and self.threshold is not None and self.threshold > 1.0:
+            raise ValueError("A bio confidence threshold must be between 0 and 1")
+        return self
+
+class ScreeningRange(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+class MaterialsScreeningRequest(BaseModel):
+    model_version: str = Field(default="2", pattern="^[12]$")
+    num_candidates: int = Field(default=10000, ge=1, le=MAX_DATASET_ROWS)
+    length: int = Field(default=10, ge=1, le=1024, description="Generated structure length")
+    seed: Optional[int] = Field(default=None, description="Seed for reproducible candidates")
+    energy_threshold: float = Field(default=0.5, ge=0.0)
+    objective: str = Field(default="predicted_band_gap", description="Predicted property to rank by")
+    goal: str = Field(default="max", pattern="^(max|min)$")
+    top_k: int = Field(default=10, ge=1, le=MAX_BATCH_ITEMS)
+    filters: Dict[str, ScreeningRange] = Field(default_factory=dict, description="Property ranges a candidate must fall in")
+    report_every: int = Field(default=10, ge=1, description="Chunks between partial leaderboards")
+
+    @model_validator(mode="after")
+    def known_properties(self):
+        unknown = sorted({self.objective, *self.filters} - set(MATERIALS_PROPERTIES))
+        if unknown:
+            raise ValueError(f"Unknown properties {unknown}; choose from {list(MATERIALS_PROPERTIES)}")
+        return self
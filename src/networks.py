@@ -0,0 +1,109 @@
+import torch
+import torch.nn as nn
+from typing import Dict
+
+RESIDUE_WINDOW = 20
+ALPHABET_SIZE = 20
+
+
+class HelixSynthVAE(nn.Module):
+    """
+    HelixSynth variational autoencoder stored in NexaBio checkpoints. Inputs are
+    one-hot windows of 20 residues (20 x 20 = 400 features); the decoder returns
+    a per-residue reconstruction of the same shape.
+    """
+    def __init__(self, input_dim: int = RESIDUE_WINDOW * ALPHABET_SIZE, hidden_dim: int = 256,
+                 latent_dim: int = 32, dropout: float = 0.1):
+        super().__init__()
+        self.encoder = nn.Sequential(
+            nn.Linear(input_dim, hidden_dim),
+            nn.BatchNorm1d(hidden_dim),
+            nn.ReLU(),
+            nn.Dropout(dropout),
+            nn.Linear(hidden_dim, hidden_dim),
+            nn.BatchNorm1d(hidden_dim),
+            nn.ReLU()
+        )
+        self.fc_mu = nn.Linear(hidden_dim, latent_dim)
+        self.fc_var = nn.Linear(hidden_dim, latent_dim)
+        self.decoder = nn.Sequential(
+            nn.Linear(latent_dim, hidden_dim),
+            nn.BatchNorm1d(hidden_dim),
+            nn.ReLU(),
+            nn.Dropout(dropout),
+            nn.Linear(hidden_dim, hidden_dim),
+            nn.BatchNorm1d(hidden_dim),
+            nn.ReLU(),
+            nn.Linear(hidden_dim, input_dim)
+        )
+        self.time_embed = nn.Sequential(
+            nn.Linear(1, latent_dim),
+            nn.ReLU(),
+            nn.Linear(latent_dim, latent_dim)
+        )
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, torch.Tensor]) -> "HelixSynthVAE":
+        """Build a module whose layer sizes match the checkpoint"""
+        if "fc_mu.weight" not in state or "encoder.0.weight" not in state:
+            raise ValueError("Checkpoint is not a HelixSynth VAE state_dict")
+        hidden_dim, input_dim = state["encoder.0.weight"].shape
+        latent_dim = state["fc_mu.weight"].shape[0]
+        return cls(input_dim=input_dim, hidden_dim=hidden_dim, latent_dim=latent_dim)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        # Deterministic at inference: decode the posterior mean
+        return self.decoder(self.fc_mu(self.encoder(x)))
+
+
+class StellarClassifier(nn.Module):
+    """NexaAstro MLP: photometric features to GALAXY/QSO/STAR logits"""
+    def __init__(self, input_dim: int = 18, hidden_dims: tuple = (128, 64), num_classes: int = 3,
+                 dropout: float = 0.2):
+        super().__init__()
+        self.fc1 = nn.Linear(input_dim, hidden_dims[0])
+        self.bn1 = nn.BatchNorm1d(hidden_dims[0])
+        self.fc2 = nn.Linear(hidden_dims[0], hidden_dims[1])
+        self.bn2 = nn.BatchNorm1d(hidden_dims[1])
+        self.fc3 = nn.Linear(hidden_dims[1], num_classes)
+        self.dropout = nn.Dropout(dropout)
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, torch.Tensor]) -> "StellarClassifier":
+        if "fc1.weight" not in state or "fc3.weight" not in state:
+            raise ValueError("Checkpoint is not a NexaAstro MLP state_dict")
+        return cls(
+            input_dim=state["fc1.weight"].shape[1],
+            hidden_dims=(state["fc1.weight"].shape[0], state["fc2.weight"].shape[0]),
+            num_classes=state["fc3.weight"].shape[0]
+        )
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        x = self.dropout(torch.relu(self.bn1(self.fc1(x))))
+        x = self.dropout(torch.relu(self.bn2(self.fc2(x))))
+        return self.fc3(x)
+
+
+class ParticleCNN(nn.Module):
+    """
+    NexaHEP 1D CNN over an event's particles (channels x particles), globally
+    average-pooled into per-event class logits.
+    """
+    def __init__(self, in_channels: int = 4, channels: int = 32, kernel_size: int = 3, num_classes: int = 3):
+        super().__init__()
+        self.conv1 = nn.Conv1d(in_channels, channels, kernel_size, padding=kernel_size // 2)
+        self.conv2 = nn.Conv1d(channels, channels, kernel_size, padding=kernel_size // 2)
+        self.fc = nn.Linear(channels, num_classes)
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, torch.Tensor]) -> "ParticleCNN":
+        if "conv1.weight" not in state or "fc.weight" not in state:
+            raise ValueError("Checkpoint is not a NexaHEP CNN state_dict")
+        channels, in_channels, kernel_size = state["conv1.weight"].shape
+        return cls(in_channels=in_channels, channels=channels, kernel_size=kernel_size,
+                   num_classes=state["fc.weight"].shape[0])
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        x = torch.relu(self.conv1(x))
+        x = torch.relu(self.conv2(x))
+        return self.fc(x.mean(dim=2))
@@ -0,0 +1,179 @@
+"""
+Reduced-precision execution modes for engine models, each checked against
+fp32 on a held-out synthetic batch before it is allowed to serve.
+
+    python -m src.precision
+    python -m src.precision --modes int8 --tolerance 0.02
+"""
+import argparse
+import copy
+import json
+import logging
+import os
+import sys
+import time
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("fp32", "int8", "bf16")
+# Largest |candidate - fp32| allowed, relative to the largest |fp32| output on the calibration batch
+DEFAULT_TOLERANCES = {"int8": 0.05, "bf16": 0.02}
+# Modes each model family can actually run in, by model key prefix, and why the others are refused
+PRECISION_SUPPORT = {
+    "mat": (("fp32",), "the materials engine runs a placeholder network, not the checkpoint"),
+    "hep": (("fp32", "bf16"), "ParticleCNN is mostly Conv1d and dynamic int8 quantization only converts Linear layers")
+}
+
+
+class Bf16Module(torch.nn.Module):
+    """Runs a bfloat16 copy of a module; inputs are cast down and outputs back to float32"""
+
+    def __init__(self, module: torch.nn.Module):
+        super().__init__()
+        self.module = module.to(torch.bfloat16)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.module(x.to(torch.bfloat16)).float()
+
+
+def quantize_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """Dynamic int8 quantization: Linear weights stored as int8, activations quantized per batch"""
+    with warnings.catch_warnings():
+        # torch.ao.quantization is deprecated in favour of torchao, which is not a dependency here
+        warnings.simplefilter("ignore")
+        return torch.ao.quantization.quantize_dynamic(copy.deepcopy(model), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def to_bf16(model: torch.nn.Module) -> torch.nn.Module:
+    return Bf16Module(copy.deepcopy(model)).eval()
+
+
+CONVERTERS = {"int8": quantize_int8, "bf16": to_bf16}
+
+
+def model_bytes(model: torch.nn.Module) -> int:
+    """Bytes of every tensor in the state_dict, including packed quantized weights"""
+    def size(value) -> int:
+        if torch.is_tensor(value):
+            return value.numel() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(size(item) for item in value)
+        return 0
+    return sum(size(value) for value in model.state_dict().values())
+
+
+def median_ms(model: torch.nn.Module, batch: torch.Tensor, repeats: int = 20) -> float:
+    timings = []
+    with torch.no_grad():
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(batch)
+            timings.append(time.perf_counter() - start)
+    return round(sorted(timings)[len(timings) // 2] * 1000, 4)
+
+
+def calibrate(reference: torch.nn.Module, candidate: torch.nn.Module, batch: torch.Tensor) -> Dict[str, Any]:
+    """Output error and cost of candidate relative to the fp32 reference on one batch"""
+    with torch.no_grad():
+        expected = reference(batch).float()
+        actual = candidate(batch).float()
+    error = (actual - expected).abs()
+    scale = expected.abs().max().clamp(min=1e-12)
+    return {
+        "max_abs_error": float(error.max()),
+        "mean_abs_error": float(error.mean()),
+        "relative_error": float(error.max() / scale),
+        "fp32_ms": median_ms(reference, batch),
+        "ms": median_ms(candidate, batch),
+        "fp32_bytes": model_bytes(reference),
+        "bytes": model_bytes(candidate)
+    }
+
+
+def check_precision(model_key: str, mode: str):
+    """Raise ValueError for a precision setting the model could not honour"""
+    if mode not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{mode}' for {model_key}; expected one of {', '.join(PRECISIONS)}")
+    supported, reason = PRECISION_SUPPORT.get(model_key.split("_")[0], (PRECISIONS, ""))
+    if mode not in supported:
+        raise ValueError(f"Precision '{mode}' is not supported for {model_key}: {reason}")
+
+
+def apply_precision(mode: str, model: torch.nn.Module, batch: torch.Tensor,
+                    tolerance: Optional[float] = None) -> Tuple[torch.nn.Module, Dict[str, Any]]:
+    """
+    Convert model to the requested precision and calibrate it against fp32.
+    The converted model is returned only if its relative error is within
+    tolerance; otherwise the fp32 model is kept and the report says why.
+    """
+    if mode == "fp32":
+        return model, {"mode": "fp32", "active": True}
+    if mode not in CONVERTERS:
+        raise ValueError(f"Unknown precision mode: {mode}")
+    tolerance = DEFAULT_TOLERANCES[mode] if tolerance is None else tolerance
+    report = {"mode": mode, "tolerance": tolerance, "active": False}
+    if mode == "int8" and batch.device.type != "cpu":
+        report["reason"] = "dynamic int8 quantization runs on CPU only"
+        return model, report
+    try:
+        candidate = CONVERTERS[mode](model)
+        report.update(calibrate(model, candidate, batch))
+    except Exception as e:
+        report["reason"] = str(e)
+        return model, report
+    if report["relative_error"] > tolerance:
+        report["reason"] = f"relative error {report['relative_error']:.4g} exceeds tolerance {tolerance}"
+        return model, report
+    report["active"] = True
+    return candidate, report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.registry import ModelRegistry, engine_class
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Calibrate reduced-precision modes against fp32")
+    parser.add_argument("--models-dir", default=os.getenv("MODEL_DIR", os.path.join(project_root, "models")))
+    parser.add_argument("--modes", nargs="+", default=["int8", "bf16"], choices=list(CONVERTERS))
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--tolerance", type=float, help="Relative error limit (default depends on the mode)")
+    parser.add_argument("--include-mock", action="store_true", help="Also calibrate engines without a checkpoint")
+    parser.add_argument("--report", help="Write the calibration report as JSON to this path")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    registry = ModelRegistry(args.models_dir)
+    rows = []
+    for key in registry.keys():
+        if not registry.is_servable(key):
+            continue
+        entry = registry.entry(key)
+        engine = engine_class(entry["family"])(entry["path"])
+        if engine.mock and not args.include_mock:
+            print(f"{key:8s} skipped: no loadable checkpoint at {os.path.basename(entry['path'])}")
+            continue
+        batch = engine.calibration_input(args.batch_size)
+        for mode in args.modes:
+            _, report = apply_precision(mode, engine.model, batch, args.tolerance)
+            rows.append({"model": key, "mock": engine.mock, **report})
+
+    for row in rows:
+        if "relative_error" not in row:
+            print(f"{row['model']:8s} {row['mode']:5s} FAIL  {row.get('reason')}")
+            continue
+        status = "ok" if row["active"] else "FAIL"
+        print(f"{row['model']:8s} {row['mode']:5s} {status:5s} rel err {row['relative_error']:.2e}  "
+              f"{row['fp32_ms']:.3f} -> {row['ms']:.3f} ms  "
+              f"{row['fp32_bytes'] / 1024:.0f} -> {row['bytes'] / 1024:.0f} KB")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({"batch_size": args.batch_size, "results": rows}, f, indent=2)
+    return 0 if all(row["active"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+HYDROPHOBIC_RESIDUES = "AVILMFYW"
+POLAR_RESIDUES = "STNQRHKDE"
+SPECIAL_RESIDUES = "CGP"
+
+# Binding affinity estimate: base plus a per-hydrophobic-residue increment (kcal/mol)
+AFFINITY_BASE = 5.0
+AFFINITY_PER_HYDROPHOBIC = 0.1
+# Stability mixes model confidence and hydrophobic fraction (both in %)
+STABILITY_CONFIDENCE_WEIGHT = 0.7
+STABILITY_HYDROPHOBIC_WEIGHT = 0.3
+
+RESIDUE_CLASSES = ("other", "hydrophobic", "polar", "special")
+
+
+def _class_table() -> np.ndarray:
+    """256-entry byte lookup: the RESIDUE_CLASSES index of every one-letter code, 0 for anything else"""
+    table = np.zeros(256, dtype=np.int64)
+    for index, residues in enumerate((HYDROPHOBIC_RESIDUES, POLAR_RESIDUES, SPECIAL_RESIDUES), start=1):
+        table[np.frombuffer(residues.encode(), dtype=np.uint8)] = index
+    return table
+
+
+RESIDUE_CLASS_LUT = _class_table()
+
+
+def _concatenate(strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    All strings as one uint8 buffer. Returns (bytes, row of every byte, length of
+    every string); non-ASCII characters become '?' so each character is one byte.
+    """
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+    buffer = np.frombuffer("".join(strings).encode("ascii", "replace"), dtype=np.uint8)
+    rows = np.repeat(np.arange(len(strings)), lengths)
+    return buffer, rows, lengths
+
+
+def _class_counts(sequences: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(n, 4) residue-class counts from a single bincount over the whole batch, and the lengths"""
+    buffer, rows, lengths = _concatenate(sequences)
+    n_classes = len(RESIDUE_CLASSES)
+    counts = np.bincount(rows * n_classes + RESIDUE_CLASS_LUT[buffer], minlength=len(sequences) * n_classes)
+    return counts.reshape(len(sequences), n_classes), lengths
+
+
+def _percent(counts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    return np.divide(counts * 100.0, lengths, out=np.zeros(len(counts)), where=lengths > 0)
+
+
+def sequence_metrics(sequences: Sequence[str], confidences: Optional[Sequence[float]] = None) -> Dict[str, np.ndarray]:
+    """
+    Composition metrics for every sequence in one pass: length, hydrophobic /
+    polar / special fractions (%), binding affinity and, given confidences (%),
+    stability. Each value is an array with one entry per sequence.
+    """
+    counts, lengths = _class_counts(sequences)
+    hydrophobic = counts[:, 1]
+    metrics = {
+        "length": lengths,
+        "hydrophobic_count": hydrophobic,
+        "hydrophobic": _percent(hydrophobic, lengths),
+        "polar": _percent(counts[:, 2], lengths),
+        "special": _percent(counts[:, 3], lengths),
+        "affinity": (AFFINITY_BASE + AFFINITY_PER_HYDROPHOBIC * hydrophobic).round(2)
+    }
+    if confidences is not None:
+        metrics["stability"] = (
+            STABILITY_CONFIDENCE_WEIGHT * np.asarray(confidences, dtype=np.float64)
+            + STABILITY_HYDROPHOBIC_WEIGHT * metrics["hydrophobic"]
+        )
+    return metrics
+
+
+def binding_affinity(sequences: Sequence[str]) -> np.ndarray:
+    """Estimated binding affinity (kcal/mol) per sequence"""
+    counts, _ = _class_counts(sequences)
+    return (AFFINITY_BASE + AFFINITY_PER_HYDROPHOBIC * counts[:, 1]).round(2)
+
+
+def structure_element_counts(structures: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    """
+    Occurrences of each secondary structure element (H, E, C, U, ...) per string.
+    Returns the elements present, in first-seen order, and an (n, elements) count matrix.
+    """
+    buffer, rows, _ = _concatenate(structures)
+    counts = np.bincount(rows * 256 + buffer, minlength=len(structures) * 256).reshape(len(structures), 256)
+    _, first = np.unique(buffer, return_index=True)
+    codes = buffer[np.sort(first)]
+    return [chr(code) for code in codes], counts[:, codes]
@@ -0,0 +1,228 @@
+import hashlib
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Short key prefix used by the API for each model family in versions.json
+FAMILY_PREFIXES = {
+    "NexaBio": "bio",
+    "NexaMat": "mat",
+    "NexaAstro": "astro",
+    "NexaHEP": "hep",
+    "NexaCFD": "cfd"
+}
+
+# Engine classes by dotted path; src.engines (and torch with it) is imported on the first load
+ENGINE_CLASSES = {
+    "NexaBio": "src.engines.BiologyInferenceEngine",
+    "NexaMat": "src.engines.MaterialsInferenceEngine",
+    "NexaAstro": "src.engines.AstroInferenceEngine",
+    "NexaHEP": "src.engines.HEPInferenceEngine"
+}
+
+
+def engine_class(family: str):
+    """The inference engine class serving a model family"""
+    module, _, name = ENGINE_CLASSES[family].rpartition(".")
+    return getattr(importlib.import_module(module), name)
+
+
+def engine_memory_bytes(engine) -> int:
+    """
+    Bytes held by an engine's weights, counting packed int8 weights at their real
+    size, plus any copy its execution backend keeps (TorchScript, ONNX Runtime)
+    """
+    from src.precision import model_bytes
+
+    model = getattr(engine, "model", None)
+    if model is None:
+        return 0
+    return model_bytes(model) + getattr(getattr(engine, "backend", None), "memory_bytes", 0)
+
+
+class ModelRegistry:
+    """
+    Loads inference engines on first use from the checkpoints listed in versions.json.
+    Once the loaded engines exceed memory_budget_mb, the least recently used
+    unpinned engines are evicted. Pinned engines are never evicted and can be
+    loaded ahead of traffic with prewarm(). engine_options are passed to every
+    engine constructor; model_options holds per-key overrides such as the backend.
+    """
+
+    def __init__(self, models_dir: str, versions_file: str = "versions.json",
+                 memory_budget_mb: Optional[float] = None, pinned: Iterable[str] = (),
+                 engine_options: Optional[Dict[str, Any]] = None,
+                 model_options: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.models_dir = models_dir
+        self.engine_options = engine_options or {}
+        self.model_options = model_options or {}
+        with open(os.path.join(models_dir, versions_file), 'r') as f:
+            self.versions: Dict[str, Dict[str, str]] = json.load(f)
+        self.memory_budget = memory_budget_mb * 1024 * 1024 if memory_budget_mb else None
+        self.pinned = set(pinned)
+        self._entries: Dict[str, Dict[str, str]] = {}
+        for family, files in self.versions.items():
+            prefix = FAMILY_PREFIXES.get(family, family.lower())
+            for version, filename in files.items():
+                self._entries[f"{prefix}_{version}"] = {
+                    "family": family,
+                    "version": version,
+                    "path": os.path.join(models_dir, filename)
+                }
+        unknown = self.pinned - set(self._entries)
+        if unknown:
+            raise KeyError(f"Pinned models not listed in {versions_file}: {sorted(unknown)}")
+        self._engines: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._hashes: Dict[str, tuple] = {}
+
+    def available(self) -> Dict[str, List[str]]:
+        """Model families and versions listed in versions.json"""
+        return {family: list(files.keys()) for family, files in self.versions.items()}
+
+    def keys(self) -> List[str]:
+        """Every model key, e.g. bio_2"""
+        return list(self._entries)
+
+    def is_servable(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry["family"] in ENGINE_CLASSES
+
+    def model_path(self, key: str) -> str:
+        return self.entry(key)["path"]
+
+    def checkpoint_hash(self, key: str) -> str:
+        """SHA-256 of the checkpoint file, recomputed only when its size or mtime changes"""
+        path = self.model_path(key)
+        if not os.path.exists(path):
+            return "missing"
+        stat = os.stat(path)
+        cached = self._hashes.get(key)
+        if cached is not None and cached[0] == (stat.st_size, stat.st_mtime):
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        self._hashes[key] = ((stat.st_size, stat.st_mtime), digest.hexdigest())
+        return self._hashes[key][1]
+
+    def known_checkpoint_hash(self, key: str) -> Optional[str]:
+        """The last computed checkpoint hash, without touching the file"""
+        cached = self._hashes.get(key)
+        return cached[1] if cached is not None else None
+
+    def peek(self, key: str):
+        """Return the engine if it is already loaded, without loading it"""
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+            return engine
+
+    def options_for(self, key: str) -> Dict[str, Any]:
+        """Engine options for key: the shared options with the model's own settings on top"""
+        return {**self.engine_options, **self.model_options.get(key, {})}
+
+    def get(self, key: str):
+        """Return the engine for key, loading it (and evicting cold engines) if needed"""
+        engine = self.peek(key)
+        if engine is not None:
+            return engine
+        entry = self.entry(key)
+        if entry["family"] not in ENGINE_CLASSES:
+            raise LookupError(f"No inference engine available for {entry['family']}")
+        engine_cls = engine_class(entry["family"])
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            engine = self.peek(key)
+            if engine is not None:
+                return engine
+            engine = engine_cls(entry["path"], **self.options_for(key))
+            self.checkpoint_hash(key)
+            size = engine_memory_bytes(engine)
+            with self._lock:
+                self._engines[key] = engine
+                self._sizes[key] = size
+                self._evict(keep=key)
+            logger.info(f"Loaded {key} from {entry['path']} ({size / 1024 / 1024:.1f} MB)")
+            return engine
+
+    def prewarm(self, keys: Optional[Iterable[str]] = None, warmup_batches: int = 0, warmup_batch_size: int = 32,
+                max_workers: int = 4) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the given engines (the pinned set by default) ahead of traffic, several
+        at once, and run warm-up batches through each. Returns per-engine timings.
+        """
+        keys = list(self.pinned if keys is None else keys)
+
+        def warm(key: str) -> Dict[str, Any]:
+            try:
+                start = time.perf_counter()
+                engine = self.get(key)
+                loaded = time.perf_counter() - start
+                warmup = engine.warmup(warmup_batches, warmup_batch_size) if warmup_batches else 0.0
+            except Exception as e:
+                logger.error(f"Failed to prewarm {key}: {str(e)}")
+                return {"error": str(e)}
+            return {
+                **{name: round(seconds, 3) for name, seconds in engine.load_timings.items()},
+                "load_s": round(loaded, 3),
+                "warmup_s": round(warmup, 3)
+            }
+
+        if not keys:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys))), thread_name_prefix="prewarm") as pool:
+            return dict(zip(keys, pool.map(warm, keys)))
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return list(self._engines.keys())
+
+    def execution(self) -> Dict[str, Dict[str, Any]]:
+        """Backend and active precision of every loaded engine"""
+        with self._lock:
+            engines = list(self._engines.items())
+        return {
+            key: {
+                "backend": engine.backend.name,
+                "precision": engine.precision_report["mode"] if engine.precision_report["active"] else "fp32",
+                "mock": engine.mock
+            }
+            for key, engine in engines
+        }
+
+    def memory_usage(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def entry(self, key: str) -> Dict[str, str]:
+        """The versions.json entry (family, version, path) behind a model key"""
+        if key not in self._entries:
+            raise KeyError(f"Unknown model: {key}")
+        return self._entries[key]
+
+    def _evict(self, keep: str):
+        """Drop least recently used unpinned engines until under budget; caller holds the lock"""
+        if self.memory_budget is None:
+            return
+        for key in list(self._engines.keys()):
+            if sum(self._sizes.values()) <= self.memory_budget:
+                break
+            if key == keep or key in self.pinned:
+                continue
+            del self._engines[key]
+            self._sizes.pop(key, None)
+            logger.info(f"Evicted {key} from the model registry")
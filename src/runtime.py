@@ -0,0 +1,117 @@
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Set by the gunicorn post_fork hook so each worker can claim its own slice of cores
+WORKER_INDEX_ENV = "NEXA_WORKER_INDEX"
+WORKER_COUNT_ENV = "WEB_CONCURRENCY"
+
+_effective: Dict[str, Any] = {}
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on (respects container cpusets)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_runtime(settings: Dict[str, Any], cpus: List[int], workers: int, index: int) -> Dict[str, Any]:
+    """
+    Thread counts and CPU set for one worker. In auto mode the available CPUs
+    are split evenly between workers and the worker gets its own contiguous
+    slice of them (pinned only when affinity is true); explicit
+    intra_op_threads / interop_threads / an affinity CPU list override it.
+    """
+    workers = max(1, workers)
+    index = index % workers
+    share = max(1, len(cpus) // workers)
+    if settings.get("mode", "auto") == "auto":
+        intra_op = share
+        interop = 1
+        start = (index * share) % len(cpus)
+        affinity = cpus[start:start + share] if settings.get("affinity") is True else None
+    else:
+        # None leaves torch's own default in place
+        intra_op = None
+        interop = None
+        affinity = None
+    if settings.get("intra_op_threads"):
+        intra_op = int(settings["intra_op_threads"])
+    if settings.get("interop_threads"):
+        interop = int(settings["interop_threads"])
+    if isinstance(settings.get("affinity"), list):
+        affinity = [int(cpu) for cpu in settings["affinity"]]
+    return {"intra_op_threads": intra_op, "interop_threads": interop, "affinity": affinity}
+
+
+def worker_plan(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """The plan for this worker process (index and count from the environment), without importing torch"""
+    cpus = available_cpus()
+    workers = int(settings.get("workers") or os.getenv(WORKER_COUNT_ENV, "1"))
+    index = int(os.getenv(WORKER_INDEX_ENV, "0"))
+    return {
+        "mode": settings.get("mode", "auto"),
+        "workers": workers,
+        "worker_index": index,
+        "cpus_available": len(cpus),
+        **plan_runtime(settings, cpus, workers, index)
+    }
+
+
+def apply_threads(intra_op: Optional[int], interop: Optional[int] = None):
+    """Set torch's thread pools; also used as the process-pool initializer"""
+    import torch
+
+    if intra_op is not None:
+        torch.set_num_threads(intra_op)
+    if interop is not None:
+        try:
+            torch.set_num_interop_threads(interop)
+        except RuntimeError as e:
+            # Only allowed before the first inter-op parallel work in the process
+            logger.warning(f"Could not set interop threads to {interop}: {str(e)}")
+
+
+def pin_cpus(plan: Dict[str, Any]):
+    """
+    Pin this process to the plan's CPUs. sched_setaffinity(0) only moves the
+    calling thread, and threads inherit the mask they were started with, so this
+    must run on the main thread before any other thread exists.
+    """
+    if plan["affinity"] and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(os.getpid(), plan["affinity"])
+        except OSError as e:
+            logger.warning(f"Could not pin worker {plan['worker_index']} to CPUs {plan['affinity']}: {str(e)}")
+
+
+def configure_runtime(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply the torch thread settings of the runtime section to this process and
+    return the effective settings; CPU pinning is done earlier by pin_cpus()
+    """
+    import torch
+
+    plan = worker_plan(settings)
+    index = plan["worker_index"]
+    apply_threads(plan["intra_op_threads"], plan["interop_threads"])
+    _effective.clear()
+    _effective.update({
+        **plan,
+        "intra_op_threads": torch.get_num_threads(),
+        "interop_threads": torch.get_num_interop_threads(),
+        "affinity": available_cpus()
+    })
+    logger.info(
+        f"Worker {index}/{plan['workers']}: {_effective['intra_op_threads']} intra-op, "
+        f"{_effective['interop_threads']} interop threads on CPUs {_effective['affinity']}"
+    )
+    return dict(_effective)
+
+
+def runtime_info() -> Dict[str, Any]:
+    """Effective settings from the last configure_runtime(); empty until it has run"""
+    return dict(_effective)
@@ -0,0 +1,135 @@
+import heapq
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.jobs import generated_candidates
+from src.serialization import json_default
+
+
+class TopK:
+    """
+    The k best items seen so far, in a min-heap keyed on (score, -index) so the
+    worst kept item sits at the root and ties go to the earlier candidate.
+    Memory stays O(k) however many items are offered.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, Any]] = []
+
+    def threshold(self) -> float:
+        """Score an item must beat to enter a full leaderboard"""
+        return self._heap[0][0] if len(self._heap) == self.k else -np.inf
+
+    def offer(self, score: float, index: int, item: Any):
+        entry = (score, -index, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def ranked(self) -> List[Tuple[float, int, Any]]:
+        """(score, index, item), best first"""
+        ordered = sorted(self._heap, key=lambda entry: entry[:2], reverse=True)
+        return [(score, -negative_index, item) for score, negative_index, item in ordered]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+def chunk_columns(results: List[Dict[str, Any]], fields) -> Dict[str, np.ndarray]:
+    """Selected predicted properties of one chunk as float arrays; properties withheld below the threshold are NaN"""
+    return {
+        field: np.fromiter((result["predicted_properties"][field] for result in results), dtype=np.float64,
+                           count=len(results))
+        for field in fields
+    }
+
+
+def passing(columns: Dict[str, np.ndarray], filters: Dict[str, Dict[str, float]], n: int) -> np.ndarray:
+    """Mask of rows inside every [min, max] filter range"""
+    mask = np.ones(n, dtype=bool)
+    for field, bounds in filters.items():
+        if bounds.get("min") is not None:
+            mask &= columns[field] >= bounds["min"]
+        if bounds.get("max") is not None:
+            mask &= columns[field] <= bounds["max"]
+    return mask
+
+
+class Screen:
+    """
+    Streaming top-k over scored candidates. Each chunk is filtered and reduced to
+    its own best k with argpartition in NumPy, so only those few rows touch the
+    heap; everything else from the chunk is dropped immediately.
+    """
+
+    def __init__(self, objective: str, goal: str = "max", top_k: int = 10,
+                 filters: Optional[Dict[str, Dict[str, float]]] = None):
+        self.objective = objective
+        self.sign = 1.0 if goal == "max" else -1.0
+        self.filters = filters or {}
+        self.board = TopK(top_k)
+        self.screened = 0
+        self.passed = 0
+
+    def add(self, results: List[Dict[str, Any]]):
+        n = len(results)
+        columns = chunk_columns(results, {self.objective, *self.filters})
+        scores = self.sign * columns[self.objective]
+        keep = passing(columns, self.filters, n) & ~np.isnan(scores)
+        self.passed += int(np.count_nonzero(keep))
+        # Rows that cannot beat the current worst entry of a full board never reach the heap
+        candidates = np.flatnonzero(keep & (scores > self.board.threshold()))
+        k = self.board.k
+        if len(candidates) > k:
+            # Everything above the chunk's k-th best score, plus the earliest rows tied with it
+            selected = scores[candidates]
+            kth = np.partition(selected, len(selected) - k)[len(selected) - k]
+            above = candidates[selected > kth]
+            candidates = np.concatenate([above, candidates[selected == kth][:k - len(above)]])
+        for i in candidates:
+            self.board.offer(float(scores[i]), self.screened + int(i), results[i])
+        self.screened += n
+
+    def leaderboard(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "rank": rank,
+                "candidate": index,
+                "structure": result["input_structure"],
+                "score": self.sign * score,
+                "properties": result["predicted_properties"]
+            }
+            for rank, (score, index, result) in enumerate(self.board.ranked(), start=1)
+        ]
+
+    def event(self, kind: str, total: int) -> Dict[str, Any]:
+        return {
+            "type": kind,
+            "screened": self.screened,
+            "total": total,
+            "passed": self.passed,
+            "objective": self.objective,
+            "leaderboard": self.leaderboard()
+        }
+
+
+async def screen_materials(score_chunk: Callable[[str, List[Dict[str, Any]]], Awaitable[list]], model_key: str,
+                           spec: Dict[str, Any], screen: Screen, chunk_size: int = 1024,
+                           report_every: int = 10) -> AsyncIterator[str]:
+    """
+    NDJSON events for a materials screen over generated candidates: a "progress"
+    line with the partial leaderboard every report_every chunks, then a "final" line.
+    """
+    threshold = spec.get("energy_threshold", 0.5)
+    for number, structures in enumerate(generated_candidates({**spec, "model_type": "materials"}, 0, chunk_size), 1):
+        results = await score_chunk(model_key, [
+            {"structure": structure, "energy_threshold": threshold} for structure in structures
+        ])
+        screen.add(results)
+        if number % report_every == 0 and screen.screened < spec["num_candidates"]:
+            yield json.dumps(screen.event("progress", spec["num_candidates"]), default=json_default) + "\n"
+    yield json.dumps(screen.event("final", spec["num_candidates"]), default=json_default) + "\n"
@@ -0,0 +1,216 @@
+import io
+import json
+from typing import Any, Dict, List, Optional
+
+from src.Utils import to_columnar
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Accept values mapped onto the formats above
+ACCEPT_ALIASES = {
+    JSON: JSON,
+    "application/*": JSON,
+    "*/*": JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    ARROW: ARROW,
+    "application/vnd.apache.arrow.file": ARROW
+}
+
+# Per-residue [x, y, z] fields: float32 buffers in binary formats, rounded to 2 decimals in JSON
+COORDINATE_FIELDS = ("tertiary_coordinates",)
+COORDINATE_DECIMALS = 2
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def format_available(fmt: str) -> bool:
+    if fmt == MSGPACK:
+        return msgpack is not None
+    if fmt == ARROW:
+        return pyarrow_available()
+    return fmt == JSON
+
+
+def supported_formats() -> List[str]:
+    return [fmt for fmt in (JSON, MSGPACK, ARROW) if format_available(fmt)]
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    Response format for an Accept header, honouring q-values. JSON when the
+    header is missing; None when nothing acceptable can be produced.
+    """
+    if not accept:
+        return JSON
+    choices = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        fmt = ACCEPT_ALIASES.get(media_type.lower())
+        # Availability is only checked for formats actually asked for, so JSON clients never import pyarrow
+        if fmt is not None and quality > 0 and format_available(fmt):
+            choices.append((-quality, position, fmt))
+    return min(choices)[2] if choices else None
+
+
+def coordinate_array(value):
+    """An (n, 3) float32 view of engine coordinates; copies only when they arrive as lists"""
+    import numpy as np
+
+    return np.ascontiguousarray(value, dtype=np.float32).reshape(-1, 3)
+
+
+def round_coordinates(values: list) -> list:
+    """Round every coordinate array in one vectorized pass and split the result back per row"""
+    import numpy as np
+
+    arrays = [np.asarray(value, dtype=np.float64).reshape(-1, 3) for value in values]
+    if not arrays:
+        return []
+    rounded = np.concatenate(arrays).round(COORDINATE_DECIMALS)
+    return np.split(rounded, np.cumsum([len(array) for array in arrays])[:-1])
+
+
+def _rows(content: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return content["results"] if "results" in content else [content]
+
+
+def _with_rounded_coordinates(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copies of the response with JSON-ready coordinates; cached results are left untouched"""
+    if "columns" in content:
+        columns = dict(content["columns"])
+        for field in COORDINATE_FIELDS:
+            if field in columns:
+                columns[field] = round_coordinates(columns[field])
+        return {**content, "columns": columns}
+    rows = _rows(content)
+    for field in COORDINATE_FIELDS:
+        present = [i for i, row in enumerate(rows) if field in row]
+        if not present:
+            continue
+        rows = list(rows)
+        for i, rounded in zip(present, round_coordinates([rows[i][field] for i in present])):
+            rows[i] = {**rows[i], field: rounded}
+    return {**content, "results": rows} if "results" in content else rows[0]
+
+
+def json_default(value):
+    """json.dumps default for numpy arrays and scalars, which engines return"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json(content: Dict[str, Any]) -> bytes:
+    content = _with_rounded_coordinates(content)
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=json_default, separators=(",", ":")).encode()
+
+
+def _msgpack_default(value):
+    # Coordinates travel as raw little-endian float32 bytes with their shape
+    import numpy as np
+
+    if isinstance(value, np.ndarray):
+        array = coordinate_array(value) if value.ndim == 2 else np.ascontiguousarray(value, dtype=np.float32)
+        return {"dtype": "<f4", "shape": list(array.shape), "data": memoryview(array.astype("<f4", copy=False))}
+    raise TypeError(f"Object of type {type(value).__name__} is not msgpack serializable")
+
+
+def encode_msgpack(content: Dict[str, Any]) -> bytes:
+    if "columns" not in content:
+        rows = _rows(content)
+        converted = [
+            {**row, **{field: coordinate_array(row[field]) for field in COORDINATE_FIELDS if field in row}}
+            for row in rows
+        ]
+        content = {**content, "results": converted} if "results" in content else converted[0]
+    else:
+        columns = dict(content["columns"])
+        for field in COORDINATE_FIELDS:
+            if field in columns:
+                columns[field] = [coordinate_array(value) for value in columns[field]]
+        content = {**content, "columns": columns}
+    return msgpack.packb(content, default=_msgpack_default)
+
+
+def _arrow_column(values):
+    import pyarrow as pa
+
+    if isinstance(values, dict):
+        children = {key: _arrow_column(child) for key, child in values.items()}
+        return pa.StructArray.from_arrays(list(children.values()), names=list(children.keys()))
+    return pa.array(values)
+
+
+def _arrow_coordinates(values: list):
+    """list<fixed_size_list<float32, 3>> over one contiguous float32 buffer"""
+    import numpy as np
+    import pyarrow as pa
+
+    arrays = [coordinate_array(value) for value in values]
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int32)
+    np.cumsum([len(array) for array in arrays], out=offsets[1:])
+    flat = np.concatenate(arrays).reshape(-1) if arrays else np.empty(0, dtype=np.float32)
+    points = pa.FixedSizeListArray.from_arrays(pa.array(flat, type=pa.float32()), 3)
+    return pa.ListArray.from_arrays(pa.array(offsets), points)
+
+
+def encode_arrow(content: Dict[str, Any]) -> bytes:
+    """
+    One Arrow IPC stream holding a row per result. Batch-level fields such as
+    the model name and count go into the schema metadata.
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    columns = content["columns"] if "columns" in content else to_columnar(_rows(content))
+    metadata = {key: str(value) for key, value in content.items() if key not in ("results", "columns")}
+    arrays = {
+        key: _arrow_coordinates(values) if key in COORDINATE_FIELDS else _arrow_column(values)
+        for key, values in columns.items()
+    }
+    if "results" not in content and "columns" not in content:
+        metadata = {}
+    table = pa.table(arrays, metadata=metadata or None)
+    sink = io.BytesIO()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+ENCODERS = {
+    JSON: encode_json,
+    MSGPACK: encode_msgpack,
+    ARROW: encode_arrow
+}
+
+
+def encode(content: Dict[str, Any], fmt: str) -> bytes:
+    return ENCODERS[fmt](content)
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from src.metrics import SINGLEFLIGHT
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: the first caller for a key starts the
+    work as its own task and later callers with the same key await that task
+    instead of starting another. Every caller awaits through asyncio.shield, so a
+    client that disconnects does not cancel the work the others are waiting on.
+    The key is released as soon as the work finishes; this is not a cache.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], labels: tuple = ("", "")) -> Tuple[Any, bool]:
+        """Result of fn() for key and whether it was shared with an earlier caller"""
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+            SINGLEFLIGHT.labels(*labels, "coalesced").inc()
+        else:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            self.leaders += 1
+            SINGLEFLIGHT.labels(*labels, "leader").inc()
+        return await asyncio.shield(task), shared
+
+    def _release(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Retrieve the error so it is not reported as unhandled when every caller has gone
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "dedup_ratio": round(self.coalesced / total, 4) if total else 0.0
+        }
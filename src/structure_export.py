@@ -0,0 +1,243 @@
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# C-alpha traces only: one atom per residue
+ATOM_NAME = "CA"
+ELEMENT = "C"
+
+THREE_LETTER_CODES = {
+    "A": "ALA", "R": "ARG", "N": "ASN", "D": "ASP", "C": "CYS", "Q": "GLN", "E": "GLU", "G": "GLY",
+    "H": "HIS", "I": "ILE", "L": "LEU", "K": "LYS", "M": "MET", "F": "PHE", "P": "PRO", "S": "SER",
+    "T": "THR", "W": "TRP", "Y": "TYR", "V": "VAL"
+}
+
+FORMATS = ("pdb", "mol2", "cif")
+MEDIA_TYPES = {
+    "pdb": "chemical/x-pdb",
+    "mol2": "chemical/x-mol2",
+    "cif": "chemical/x-mmcif"
+}
+
+# Atoms formatted per yielded chunk when streaming
+CHUNK_ATOMS = 50000
+
+SPACE = ord(" ")
+
+
+def _residue_table() -> np.ndarray:
+    """(256, 3) byte lookup from a one-letter code (either case) to its three-letter name, UNK otherwise"""
+    table = np.tile(np.frombuffer(b"UNK", dtype=np.uint8), (256, 1))
+    for one, three in THREE_LETTER_CODES.items():
+        for code in (one, one.lower()):
+            table[ord(code)] = np.frombuffer(three.encode(), dtype=np.uint8)
+    return table
+
+
+RESIDUE_NAME_LUT = _residue_table()
+
+
+def fixed_width(values, width: int, decimals: int = 0) -> np.ndarray:
+    """
+    Right-aligned text of every value as an (N, width) uint8 array, matching
+    f"{value:{width}.{decimals}f}" (exact halves round to even) but computed with
+    integer arithmetic over the whole column. Raises ValueError when a value does not fit.
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    remaining = np.rint(np.abs(values) * 10 ** decimals).astype(np.int64)
+    needs_sign = np.signbit(values)
+    out = np.full((len(values), width), SPACE, dtype=np.uint8)
+    column = width - 1
+    for _ in range(decimals):
+        out[:, column] = 48 + remaining % 10
+        remaining //= 10
+        column -= 1
+    if decimals:
+        out[:, column] = ord(".")
+        column -= 1
+    first = True
+    while column >= 0:
+        shown = (remaining > 0) | first
+        out[shown, column] = 48 + remaining[shown] % 10
+        remaining //= 10
+        # The sign sits just left of the most significant digit
+        signed = needs_sign & shown & (remaining == 0)
+        if column > 0:
+            out[signed, column - 1] = ord("-")
+            needs_sign &= ~signed
+        first = False
+        column -= 1
+    if np.any(remaining > 0) or np.any(needs_sign):
+        raise ValueError(f"Value does not fit in {width} columns")
+    return out
+
+
+def left_aligned(field: np.ndarray) -> np.ndarray:
+    """Move the padding of a right-aligned field to the right"""
+    order = np.argsort(field == SPACE, axis=1, kind="stable")
+    return np.take_along_axis(field, order, axis=1)
+
+
+def _constant(text: str, n: int) -> np.ndarray:
+    return np.broadcast_to(np.frombuffer(text.encode(), dtype=np.uint8), (n, len(text)))
+
+
+def _lines(*fields: np.ndarray) -> bytes:
+    """Join per-atom fields column-wise into newline-terminated records"""
+    n = fields[0].shape[0]
+    return np.concatenate([*fields, _constant("\n", n)], axis=1).tobytes()
+
+
+def _prepare(sequence: str, coordinates, b_factors) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 3)
+    if len(sequence) != len(coordinates):
+        raise ValueError(f"{len(sequence)} residues but {len(coordinates)} coordinates")
+    residues = RESIDUE_NAME_LUT[np.frombuffer(sequence.encode("ascii", "replace"), dtype=np.uint8)]
+    b_factors = np.broadcast_to(np.asarray(0.0 if b_factors is None else b_factors, dtype=np.float64),
+                                (len(coordinates),))
+    return coordinates, residues, b_factors
+
+
+def _chunks(n: int) -> Iterator[slice]:
+    for start in range(0, n, CHUNK_ATOMS):
+        yield slice(start, min(start + CHUNK_ATOMS, n))
+
+
+def pdb_atoms(sequence: str, coordinates, b_factors=None, chain: str = "A") -> Iterator[bytes]:
+    """ATOM records (PDB fixed columns) for a C-alpha trace, one chunk at a time"""
+    coordinates, residues, b_factors = _prepare(sequence, coordinates, b_factors)
+    if len(coordinates) > 9999:
+        raise ValueError("PDB residue numbers are limited to 9999; use mmCIF for longer chains")
+    numbers = np.arange(1, len(coordinates) + 1)
+    for part in _chunks(len(coordinates)):
+        n = part.stop - part.start
+        yield _lines(
+            _constant("ATOM  ", n), fixed_width(numbers[part], 5), _constant(f"  {ATOM_NAME:<3s} ", n),
+            residues[part], _constant(f" {chain[:1]}", n), fixed_width(numbers[part], 4), _constant("    ", n),
+            fixed_width(coordinates[part, 0], 8, 3), fixed_width(coordinates[part, 1], 8, 3),
+            fixed_width(coordinates[part, 2], 8, 3), _constant("  1.00", n), fixed_width(b_factors[part], 6, 2),
+            _constant(f"          {ELEMENT:>2s}  ", n)
+        )
+
+
+def write_pdb(structures: Iterable[Tuple[str, object, object]]) -> Iterator[bytes]:
+    """PDB text for (sequence, coordinates, b_factors) structures; several become MODEL records"""
+    structures = list(structures)
+    for index, (sequence, coordinates, b_factors) in enumerate(structures, start=1):
+        if len(structures) > 1:
+            yield f"MODEL     {index:4d}\n".encode()
+        yield from pdb_atoms(sequence, coordinates, b_factors)
+        yield b"TER\n"
+        if len(structures) > 1:
+            yield b"ENDMDL\n"
+    yield b"END\n"
+
+
+def write_mol2(structures: Iterable[Tuple[str, object, object]], name: str = "nexa") -> Iterator[bytes]:
+    """Tripos mol2: one MOLECULE per structure, C-alpha atoms bonded along the chain"""
+    for index, (sequence, coordinates, b_factors) in enumerate(structures, start=1):
+        coordinates, residues, _ = _prepare(sequence, coordinates, b_factors)
+        n = len(coordinates)
+        yield (
+            f"@<TRIPOS>MOLECULE\n{name}_{index}\n{n:5d} {max(n - 1, 0):5d} {n:5d} 0 0\n"
+            f"PROTEIN\nNO_CHARGES\n\n@<TRIPOS>ATOM\n"
+        ).encode()
+        numbers = np.arange(1, n + 1)
+        for part in _chunks(n):
+            count = part.stop - part.start
+            yield _lines(
+                fixed_width(numbers[part], 7), _constant(f" {ATOM_NAME:<4s}", count),
+                fixed_width(coordinates[part, 0], 10, 4), fixed_width(coordinates[part, 1], 10, 4),
+                fixed_width(coordinates[part, 2], 10, 4), _constant(f" {ELEMENT}.3  ", count),
+                fixed_width(numbers[part], 6), _constant(" ", count), residues[part],
+                left_aligned(fixed_width(numbers[part], 6)), _constant("  0.0000", count)
+            )
+        yield b"@<TRIPOS>BOND\n"
+        bonds = np.arange(1, n)
+        for part in _chunks(len(bonds)):
+            count = part.stop - part.start
+            yield _lines(
+                fixed_width(bonds[part], 6), fixed_width(bonds[part], 6), fixed_width(bonds[part] + 1, 6),
+                _constant("    1", count)
+            )
+
+
+CIF_ATOM_SITE = (
+    "group_PDB", "id", "type_symbol", "label_atom_id", "label_comp_id", "label_asym_id", "label_seq_id",
+    "Cartn_x", "Cartn_y", "Cartn_z", "occupancy", "B_iso_or_equiv", "pdbx_PDB_model_num"
+)
+
+
+def write_cif(structures: Iterable[Tuple[str, object, object]], name: str = "nexa") -> Iterator[bytes]:
+    """mmCIF with a single atom_site loop; structures are numbered as models, with no residue limit"""
+    header = "".join(f"_atom_site.{item}\n" for item in CIF_ATOM_SITE)
+    yield f"data_{name}\n#\nloop_\n{header}".encode()
+    serial = 0
+    for index, (sequence, coordinates, b_factors) in enumerate(structures, start=1):
+        coordinates, residues, b_factors = _prepare(sequence, coordinates, b_factors)
+        numbers = np.arange(1, len(coordinates) + 1)
+        for part in _chunks(len(coordinates)):
+            n = part.stop - part.start
+            yield _lines(
+                _constant("ATOM ", n), fixed_width(serial + numbers[part], 9),
+                _constant(f" {ELEMENT} {ATOM_NAME} ", n), residues[part], _constant(" A ", n),
+                fixed_width(numbers[part], 6), fixed_width(coordinates[part, 0], 10, 3),
+                fixed_width(coordinates[part, 1], 10, 3), fixed_width(coordinates[part, 2], 10, 3),
+                _constant(" 1.00", n), fixed_width(b_factors[part], 7, 2), _constant(f" {index}", n)
+            )
+        serial += len(coordinates)
+    yield b"#\n"
+
+
+WRITERS = {
+    "pdb": write_pdb,
+    "mol2": write_mol2,
+    "cif": write_cif
+}
+
+
+# (width, decimals) of the coordinate and B-factor columns each writer produces
+COORDINATE_COLUMNS = {"pdb": (8, 3), "mol2": (10, 4), "cif": (10, 3)}
+B_FACTOR_COLUMNS = {"pdb": (6, 2), "cif": (7, 2)}
+
+
+def fits(values, width: int, decimals: int) -> bool:
+    """Whether fixed_width(values, width, decimals) can format every value"""
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    if not np.all(np.isfinite(values)):
+        return False
+    scaled = np.rint(np.abs(values) * 10 ** decimals)
+    # Digits left of the point get width - decimals - 1 columns, one fewer when a sign is needed
+    limits = np.where(np.signbit(values), 10 ** (width - 2), 10 ** (width - 1))
+    return bool(np.all(scaled < limits))
+
+
+def check_structures(fmt: str, structures: Sequence[Tuple[str, object, object]]):
+    """Raise ValueError before streaming starts for anything the writer would reject midway"""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported structure format: {fmt}")
+    for sequence, coordinates, b_factors in structures:
+        if len(sequence) * 3 != np.size(coordinates):
+            raise ValueError(f"{len(sequence)} residues but {np.size(coordinates) // 3} coordinates")
+        if fmt == "pdb" and len(sequence) > 9999:
+            raise ValueError("PDB residue numbers are limited to 9999; use mmCIF for longer chains")
+        width, decimals = COORDINATE_COLUMNS[fmt]
+        if not fits(coordinates, width, decimals):
+            raise ValueError(
+                f"Coordinates do not fit the {fmt} columns ({width} characters, {decimals} decimals)"
+                + ("; use mmCIF for larger structures" if fmt == "pdb" else "")
+            )
+        if fmt in B_FACTOR_COLUMNS and b_factors is not None and not fits(b_factors, *B_FACTOR_COLUMNS[fmt]):
+            raise ValueError(f"B-factors do not fit the {fmt} columns")
+
+
+def stream_structures(fmt: str, structures: Iterable[Tuple[str, object, object]]) -> Iterator[bytes]:
+    """Encoded structure file chunks for (sequence, coordinates, b_factors) tuples"""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported structure format: {fmt}")
+    return WRITERS[fmt](structures)
+
+
+def structure_text(fmt: str, sequence: str, coordinates, b_factors: Optional[Union[float, Sequence[float]]] = None) -> str:
+    """One structure as a complete file"""
+    return b"".join(stream_structures(fmt, [(sequence, coordinates, b_factors)])).decode()
@@ -0,0 +1,67 @@
+import string
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+STRUCTURE_ALPHABET = string.ascii_uppercase
+MATERIAL_ALPHABET = "LiNaKMgAlSiO"
+
+
+def make_rng(seed: Optional[int] = None) -> np.random.Generator:
+    """Seeded generator; the same seed always yields the same dataset"""
+    return np.random.default_rng(seed)
+
+
+def random_strings(rng: np.random.Generator, n: int, length: int, alphabet: str) -> np.ndarray:
+    """
+    n random strings of a fixed length drawn from alphabet, sampled as one
+    (n, length) byte matrix and reinterpreted as fixed-width strings.
+    """
+    letters = np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8)
+    codes = letters[rng.integers(0, len(letters), size=(n, length))]
+    return np.ascontiguousarray(codes).view(f"S{length}").ravel().astype(f"U{length}")
+
+
+def bio_columns(rng: np.random.Generator, n: int, sequence_length: int = 16) -> Dict[str, np.ndarray]:
+    return {
+        "sequence": random_strings(rng, n, sequence_length, AMINO_ACIDS),
+        "structure": random_strings(rng, n, 8, STRUCTURE_ALPHABET),
+        "confidence": np.round(rng.uniform(0.7, 1.0, n), 3),
+        "length": rng.integers(10, 101, n)
+    }
+
+
+def materials_columns(rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+    return {
+        "formation_energy_per_atom": np.round(rng.uniform(-5, 5, n), 3),
+        "energy_per_atom": np.round(rng.uniform(-10, 10, n), 3),
+        "density": np.round(rng.uniform(0.5, 20.0, n), 3),
+        "volume": np.round(rng.uniform(10, 1000, n), 2),
+        "n_elements": rng.integers(1, 11, n),
+        "li_fraction": np.round(rng.uniform(0, 1, n), 3),
+        "predicted_band_gap": np.round(rng.uniform(0, 5, n), 3),
+        "confidence_score": np.round(rng.uniform(0.7, 1.0, n), 3)
+    }
+
+
+DATASET_COLUMNS = {"bio": bio_columns, "materials": materials_columns}
+
+
+def column_chunks(model_type: str, size: int, seed: Optional[int] = None,
+                  chunk_rows: int = 100000) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield the dataset as column dicts of at most chunk_rows rows each"""
+    rng = make_rng(seed)
+    generate = DATASET_COLUMNS[model_type]
+    for start in range(0, size, chunk_rows):
+        yield generate(rng, min(chunk_rows, size - start))
+
+
+def random_sequences(n: int, length: int = 12, seed: Optional[int] = None) -> List[str]:
+    """Protein sequences for engine-side dataset generation"""
+    return random_strings(make_rng(seed), n, length, AMINO_ACIDS).tolist()
+
+
+def random_material_structures(n: int, length: int = 10, seed: Optional[int] = None) -> List[str]:
+    """Structure strings for engine-side dataset generation"""
+    return random_strings(make_rng(seed), n, length, MATERIAL_ALPHABET).tolist()
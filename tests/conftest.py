@@ -0,0 +1,12 @@
+import pytest
+from fastapi.testclient import TestClient
+
+API_HEADERS = {"X-API-Key": "development_key"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    from src.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
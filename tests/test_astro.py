@@ -0,0 +1,18 @@
+from tests.conftest import API_HEADERS
+
+OBJECT = {"u": 23.9, "g": 22.3, "r": 20.4, "i": 19.2, "z": 18.8, "redshift": 0.63}
+
+
+def test_astro_prediction(client):
+    response = client.post("/api/predict/astro", json=OBJECT, headers=API_HEADERS)
+    assert response.status_code == 200
+    assert response.json()["prediction"] in ("GALAXY", "QSO", "STAR")
+
+
+def test_astro_version_without_checkpoint_is_rejected(client):
+    # NexaAstro_2.pt is empty; serving it would return a randomly initialised classifier's output
+    response = client.post("/api/predict/astro", json={**OBJECT, "model_version": "2"}, headers=API_HEADERS)
+    assert response.status_code == 422
+    response = client.post("/api/predict/astro/batch", json={"objects": [OBJECT], "model_version": "2"},
+                           headers=API_HEADERS)
+    assert response.status_code == 422
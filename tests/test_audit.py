@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import numpy as np
+
+from src.audit import AuditLog, input_hash
+
+
+class FlakySink:
+    name = "flaky"
+
+    def __init__(self):
+        self.rows = []
+        self.down = False
+
+    def write(self, rows):
+        if self.down:
+            raise ConnectionError("sink unavailable")
+        self.rows.extend(rows)
+
+    def close(self):
+        pass
+
+
+def record(log, values):
+    log.record("bio_2", ("bio", "2"), [{"sequence": str(v)} for v in values], [{"value": v} for v in values], 0.01,
+               ["engine"] * len(values))
+
+
+def test_failed_batch_is_retried_in_order():
+    sink = FlakySink()
+    log = AuditLog(sink, batch_size=2, flush_interval_s=0.5)
+    record(log, range(5))
+    sink.down = True
+    assert not asyncio.run(log.flush())
+    assert log.stats()["buffered"] == 5 and log.failed == 2
+    assert log._backoff == 0.5
+    assert not asyncio.run(log.flush())
+    assert log._backoff == 1.0
+    sink.down = False
+    assert asyncio.run(log.flush())
+    assert [row["result"]["value"] for row in sink.rows] == list(range(5))
+    assert log.stats()["dropped"] == 0 and log._backoff == 0.0
+
+
+def test_requeue_drops_the_oldest_records_when_the_buffer_filled_up():
+    sink = FlakySink()
+    log = AuditLog(sink, capacity=4, batch_size=2)
+    record(log, range(2))
+    records = [log._buffer.popleft() for _ in range(2)]
+    # New traffic filled the buffer while the failed write was in flight
+    record(log, range(2, 5))
+    log._requeue(records)
+    assert log.dropped == 1
+    asyncio.run(log.flush())
+    assert [row["result"]["value"] for row in sink.rows] == [1, 2, 3, 4]
+
+
+def test_input_hash_accepts_numpy_values():
+    assert input_hash({"features": np.arange(3.0)}) == input_hash({"features": [0.0, 1.0, 2.0]})
+
+
+class SlowSink(FlakySink):
+    """Records whether a write or close overlapped a write still running on another thread"""
+
+    def __init__(self):
+        super().__init__()
+        self.writing = False
+        self.overlapped = False
+        self.closed = False
+
+    def write(self, rows):
+        if self.writing or self.closed:
+            self.overlapped = True
+        self.writing = True
+        time.sleep(0.2)
+        self.rows.extend(rows)
+        self.writing = False
+
+    def close(self):
+        if self.writing:
+            self.overlapped = True
+        self.closed = True
+
+
+def test_stop_waits_for_the_write_in_flight():
+    sink = SlowSink()
+
+    async def run():
+        log = AuditLog(sink, batch_size=2, flush_interval_s=0.01)
+        log.start()
+        record(log, range(4))
+        # Let the background task start writing the first batch, then shut down mid-write
+        await asyncio.sleep(0.05)
+        assert sink.writing
+        await log.stop()
+
+    asyncio.run(run())
+    assert not sink.overlapped and sink.closed
+    assert [row["result"]["value"] for row in sink.rows] == [0, 1, 2, 3]
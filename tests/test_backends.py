@@ -0,0 +1,37 @@
+import torch
+
+from src.backends import build_backend
+from src.precision import model_bytes
+from src.registry import engine_memory_bytes
+
+
+class Engine:
+    def __init__(self, model, backend):
+        self.model = model
+        self.backend = backend
+
+
+def make_model():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.ReLU(), torch.nn.Linear(64, 4)).eval()
+
+
+def test_eager_backend_shares_the_model_weights():
+    model = make_model()
+    engine = Engine(model, build_backend("eager", model, torch.randn(2, 64)))
+    assert engine_memory_bytes(engine) == model_bytes(model)
+
+
+def test_torchscript_copy_counts_against_the_budget(tmp_path):
+    model = make_model()
+    example = torch.randn(2, 64)
+    checkpoint = str(tmp_path / "model.pt")
+    torch.save(model.state_dict(), checkpoint)
+    export_dir = str(tmp_path / "exports")
+    backend = build_backend("torchscript", model, example, checkpoint, export_dir)
+    assert backend.name == "torchscript"
+    assert engine_memory_bytes(Engine(model, backend)) >= 2 * model_bytes(model)
+    # Reloaded from the exported artifact by a later worker: same accounting
+    reloaded = build_backend("torchscript", model, example, checkpoint, export_dir)
+    assert abs(reloaded.memory_bytes - backend.memory_bytes) < 4096
+    assert torch.allclose(reloaded(example), model(example), atol=1e-5)
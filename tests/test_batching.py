@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+
+from src.batching import MicroBatcher
+from src.executor import InferenceExecutor, QueueFullError
+
+
+class EchoEngine:
+    """Doubles each value and records the batch sizes it was called with"""
+
+    def __init__(self, delay_s: float = 0.0):
+        self.delay = delay_s
+        self.batches = []
+
+    def predict_batch(self, inputs):
+        self.batches.append(len(inputs))
+        time.sleep(self.delay)
+        if any(item.get("bad") for item in inputs):
+            raise ValueError("bad input")
+        return [{"value": item["value"] * 2} for item in inputs]
+
+
+def make_batcher(engine, **options):
+    async def get_engine():
+        return engine
+
+    return MicroBatcher(get_engine, InferenceExecutor(max_workers=2, max_concurrency=1), "echo", **options)
+
+
+def test_concurrent_requests_share_a_batch():
+    engine = EchoEngine()
+    batcher = make_batcher(engine, max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit({"value": i}) for i in range(8)))
+
+    assert asyncio.run(run()) == [{"value": 2 * i} for i in range(8)]
+    assert engine.batches == [8]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    engine = EchoEngine()
+    batcher = make_batcher(engine, max_batch_size=3, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit({"value": i}) for i in range(7)))
+
+    assert [result["value"] for result in asyncio.run(run())] == [2 * i for i in range(7)]
+    assert max(engine.batches) <= 3 and sum(engine.batches) == 7
+
+
+def test_a_failing_input_only_fails_its_own_request():
+    engine = EchoEngine()
+    batcher = make_batcher(engine, max_batch_size=4, max_wait_ms=50)
+
+    async def run():
+        inputs = [{"value": 1}, {"value": 2, "bad": True}, {"value": 3}]
+        return await asyncio.gather(*(batcher.submit(item) for item in inputs), return_exceptions=True)
+
+    first, failed, last = asyncio.run(run())
+    assert first == {"value": 2} and last == {"value": 6}
+    assert isinstance(failed, ValueError)
+
+
+def test_engine_load_failure_fails_the_batch_once():
+    loads = []
+
+    async def get_engine():
+        loads.append(1)
+        raise RuntimeError("Model not loaded")
+
+    batcher = MicroBatcher(get_engine, InferenceExecutor(max_workers=2, max_concurrency=1), "echo",
+                           max_batch_size=4, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit({"value": i}) for i in range(4)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(loads) == 1
+
+
+def test_full_queue_rejects_requests():
+    engine = EchoEngine(delay_s=0.2)
+    batcher = make_batcher(engine, max_batch_size=1, max_wait_ms=0, max_queue_size=1)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit({"value": i}) for i in range(4)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert any(isinstance(result, QueueFullError) for result in results)
+    assert {"value": 0} in results
+
+
+def test_requests_queued_for_a_dead_worker_are_handed_to_its_replacement():
+    engine = EchoEngine()
+    batcher = make_batcher(engine, max_batch_size=4, max_wait_ms=1)
+
+    async def run():
+        await batcher.submit({"value": 0})
+        batcher._worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await batcher._worker
+        # Queued after the worker stopped: nothing would ever take it off the old queue
+        stranded = asyncio.get_running_loop().create_future()
+        batcher._queue.put_nowait(({"value": 1}, stranded, time.perf_counter()))
+        fresh = await asyncio.wait_for(batcher.submit({"value": 2}), 1)
+        return await asyncio.wait_for(stranded, 1), fresh
+
+    assert asyncio.run(run()) == ({"value": 2}, {"value": 4})
+
+
+def test_batcher_survives_a_new_event_loop():
+    batcher = make_batcher(EchoEngine(), max_wait_ms=1)
+    assert asyncio.run(batcher.submit({"value": 1})) == {"value": 2}
+    assert asyncio.run(batcher.submit({"value": 2})) == {"value": 4}
@@ -0,0 +1,39 @@
+from src.registry import ModelRegistry
+from tests.conftest import API_HEADERS
+
+
+def test_default_bio_request_returns_coordinates(client):
+    response = client.post("/api/predict/bio", json={"sequence": "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQ"},
+                           headers=API_HEADERS)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["tertiary_coordinates"]) == 33
+    assert body["confidence"] < 80
+
+
+def test_explicit_threshold_still_filters(client):
+    response = client.post("/api/predict/bio", json={"sequence": "MKTAYIAKQ", "confidence_threshold": 1.0},
+                           headers=API_HEADERS)
+    assert response.status_code == 200
+    assert response.json()["tertiary_coordinates"] == []
+
+
+def test_helixsynth_default_threshold_is_below_observed_confidence():
+    engine = ModelRegistry("models").get("bio_2")
+    assert not engine.mock
+    results = engine.predict_batch([{"sequence": "GSHMAEELLKKAEELLKRAEELLKK"}, {"sequence": "ACDEFGHIKLMNPQRSTVWY"}])
+    assert all(len(result["tertiary_coordinates"]) for result in results)
+
+
+def test_default_structure_request_returns_pdb(client):
+    response = client.post("/api/predict/bio/structure", json={"sequence": "MKTAYIAKQRQ"}, headers=API_HEADERS)
+    assert response.status_code == 200
+    assert response.text.count("ATOM  ") == 11
+
+
+def test_coordinates_do_not_keep_the_bucket_alive():
+    engine = ModelRegistry("models").get("bio_2")
+    results = engine.predict_batch([{"sequence": "MKV" * 30}, {"sequence": "GSH"}])
+    # Each row owns a buffer of its own length, not a view into the padded bucket
+    assert results[1]["tertiary_coordinates"].base is None
+    assert results[1]["tertiary_coordinates"].nbytes == 3 * 3 * 4
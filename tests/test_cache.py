@@ -0,0 +1,97 @@
+import asyncio
+
+import numpy as np
+
+from src.cache import LRUCache, PredictionCache, RedisCache, prediction_key
+
+
+class FakeRedis:
+    """In-memory stand-in for redis.asyncio.Redis covering the calls RedisCache makes"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.fail = False
+
+    async def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("connection refused")
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value, ex))
+
+    async def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("connection refused")
+        for key, value, ex in self.commands:
+            self.redis.data[key] = value.encode()
+            self.redis.expiry[key] = ex
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(ttl_s=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_prediction_key_is_canonical():
+    key = prediction_key("bio", "2", "abc", {"sequence": "MKV", "confidence_threshold": 1})
+    assert key == prediction_key("bio", "2", "abc", {"confidence_threshold": 1.0, "sequence": "MKV"})
+    assert key != prediction_key("bio", "2", "abd", {"sequence": "MKV", "confidence_threshold": 1})
+
+
+def test_redis_round_trip_fills_the_local_tier():
+    redis = FakeRedis()
+    writer = PredictionCache(LRUCache(), RedisCache(redis, ttl_s=60))
+    result = {"prediction": "GALAXY", "coordinates": np.arange(3.0)}
+    asyncio.run(writer.set("k", result))
+    assert redis.expiry == {"nexa:pred:k": 60}
+
+    # A second worker with a cold local tier finds it in Redis, with arrays stored as lists
+    reader = PredictionCache(LRUCache(), RedisCache(redis, ttl_s=60))
+    assert asyncio.run(reader.get_many(["k", "missing"])) == [
+        {"prediction": "GALAXY", "coordinates": [0.0, 1.0, 2.0]}, None
+    ]
+    assert reader.local.get("k") is not None
+    stats = reader.stats()
+    assert (stats["hits_local"], stats["hits_remote"], stats["misses"]) == (0, 1, 1)
+    asyncio.run(reader.get("k"))
+    assert reader.stats()["hits_local"] == 1
+
+
+def test_redis_errors_bypass_the_tier():
+    redis = FakeRedis()
+    remote = RedisCache(redis, retry_interval_s=60)
+    cache = PredictionCache(LRUCache(), remote)
+    redis.fail = True
+    assert asyncio.run(cache.get("k")) is None
+    assert remote.errors == 1 and not remote.available
+    # Skipped while disabled: no further errors, and local writes still work
+    redis.fail = False
+    asyncio.run(cache.set("k", {"value": 1}))
+    assert remote.errors == 1
+    assert redis.data == {}
+    assert asyncio.run(cache.get("k")) == {"value": 1}
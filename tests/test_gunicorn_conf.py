@@ -0,0 +1,46 @@
+import importlib.util
+import os
+from types import SimpleNamespace
+
+from src.runtime import WORKER_INDEX_ENV
+
+spec = importlib.util.spec_from_file_location(
+    "gunicorn_conf", os.path.join(os.path.dirname(os.path.dirname(__file__)), "gunicorn.conf.py")
+)
+gunicorn_conf = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gunicorn_conf)
+
+
+def spawn(server, pid):
+    worker = SimpleNamespace(pid=None)
+    gunicorn_conf.pre_fork(server, worker)
+    # The arbiter forks and registers the child under its pid
+    worker.pid = pid
+    server.WORKERS[pid] = worker
+    return worker
+
+
+def reap(server, worker):
+    server.WORKERS.pop(worker.pid)
+    gunicorn_conf.child_exit(server, worker)
+
+
+def test_replacement_workers_reuse_the_freed_slot(monkeypatch):
+    server = SimpleNamespace(num_workers=3, WORKERS={})
+    workers = [spawn(server, pid) for pid in (101, 102, 103)]
+    assert [worker.nexa_slot for worker in workers] == [0, 1, 2]
+
+    # Worker in slot 1 is recycled, then slot 0: each replacement takes the lowest free slot
+    reap(server, workers[1])
+    assert spawn(server, 104).nexa_slot == 1
+    reap(server, workers[0])
+    replacement = spawn(server, 105)
+    assert replacement.nexa_slot == 0
+    # No two live workers share a slot, and reaped pids are no longer held
+    assert 101 not in server.nexa_worker_slots and 102 not in server.nexa_worker_slots
+    assert sorted(worker.nexa_slot for worker in server.WORKERS.values()) == [0, 1, 2]
+
+    monkeypatch.setenv(WORKER_INDEX_ENV, "")
+    gunicorn_conf.post_fork(server, replacement)
+    assert os.environ[WORKER_INDEX_ENV] == "0"
+    assert os.environ["WEB_CONCURRENCY"] == "3"
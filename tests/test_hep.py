@@ -0,0 +1,52 @@
+import os
+import random
+
+import pytest
+
+from src.engines import HEP_MAX_PARTICLES
+from src.registry import ModelRegistry
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = ModelRegistry(MODELS_DIR).get("hep_1")
+    assert not engine.mock
+    return engine
+
+
+def make_event(n_particles: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        [rng.uniform(1, 200), rng.uniform(-2.5, 2.5), rng.uniform(-3.14, 3.14), rng.uniform(1, 400)]
+        for _ in range(n_particles)
+    ]
+
+
+def without_timestamp(result):
+    return {key: value for key, value in result.items() if key != "timestamp"}
+
+
+def test_an_event_scores_the_same_alone_and_in_a_mixed_batch(engine):
+    event = make_event(12, seed=0)
+    alone = engine.predict_batch([{"particles": event}])[0]
+    batch = [{"particles": make_event(n, seed=n)} for n in (3, 90, 40)]
+    batch.insert(2, {"particles": event})
+    mixed = engine.predict_batch(batch)[2]
+    assert mixed["prediction"] == alone["prediction"] and mixed["n_particles"] == 12
+    assert mixed["probabilities"] == pytest.approx(alone["probabilities"], abs=1e-4)
+
+
+def test_long_events_keep_only_their_highest_pt_particles(engine):
+    event = make_event(HEP_MAX_PARTICLES + 20, seed=1)
+    leading = sorted(event, key=lambda particle: -particle[0])[:HEP_MAX_PARTICLES]
+    # Soft particles past the window and the input order make no difference
+    shuffled = list(event)
+    random.Random(2).shuffle(shuffled)
+    encoded = engine._encode_events([event, shuffled, leading])
+    assert encoded[0].equal(encoded[2]) and encoded[1].equal(encoded[2])
+    assert encoded[2, 0].tolist() == pytest.approx([particle[0] for particle in leading])
+    full, truncated = engine.predict_batch([{"particles": event}, {"particles": leading}])
+    assert full["n_particles"] == HEP_MAX_PARTICLES + 20
+    assert without_timestamp(full) == {**without_timestamp(truncated), "n_particles": HEP_MAX_PARTICLES + 20}
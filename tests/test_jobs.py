@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect, Request
+
+from src.jobs import COMPLETED, RUNNING, JobRunner, JobStore, generated_candidates, parse_candidate
+from src import main
+from src.models import JobRequest
+from tests.conftest import API_HEADERS
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def make_runner(store, tmp_path, seen):
+    async def predict_chunk(model_key, inputs):
+        seen.extend(item["sequence"] for item in inputs)
+        return [{"model": model_key, "length": len(item["sequence"])} for item in inputs]
+
+    return JobRunner(store, predict_chunk, str(tmp_path / "inputs"), chunk_size=2)
+
+
+def test_claim_takes_the_oldest_queued_job_once(store):
+    first = store.create("bio", "2", "generate", {}, 10)
+    store.create("bio", "2", "generate", {}, 10)
+    job = store.claim("worker-a", stale_after_s=300)
+    assert job["id"] == first and job["status"] == RUNNING and job["owner"] == "worker-a"
+    assert store.claim("worker-b", stale_after_s=300)["id"] != first
+    assert store.claim("worker-c", stale_after_s=300) is None
+
+
+def test_checkpoint_only_advances_for_the_owner_in_order(store):
+    job_id = store.create("bio", "2", "generate", {}, 4)
+    store.claim("worker-a", stale_after_s=300)
+    assert store.checkpoint(job_id, "worker-a", 0, ["0", "1"])
+    assert not store.checkpoint(job_id, "worker-b", 2, ["2", "3"])
+    # A chunk that does not start at the committed counter is rejected
+    assert not store.checkpoint(job_id, "worker-a", 0, ["0", "1"])
+    assert store.get(job_id)["done"] == 2
+    assert store.results(job_id, 0, 10) == ["0", "1"]
+
+
+def test_stale_job_is_reclaimed_and_the_old_owner_stops(store):
+    job_id = store.create("bio", "2", "generate", {}, 4)
+    store.claim("worker-a", stale_after_s=300)
+    store.checkpoint(job_id, "worker-a", 0, ["0", "1"])
+    assert store.claim("worker-b", stale_after_s=300) is None
+    job = store.claim("worker-b", stale_after_s=-1)
+    assert job["owner"] == "worker-b" and job["done"] == 2
+    assert not store.checkpoint(job_id, "worker-a", 2, ["2", "3"])
+    assert store.checkpoint(job_id, "worker-b", 2, ["2", "3"])
+
+
+def test_resumed_upload_job_continues_from_its_checkpoint(store, tmp_path):
+    seen = []
+    runner = make_runner(store, tmp_path, seen)
+    sequences = ["MKV", "MKVL", "MKVLA", "MKVLAT", "MKVLATG"]
+    job_id = "resumed"
+    with open(runner.upload_path(job_id), "w") as f:
+        f.write("\n".join(sequences) + "\n")
+    store.create("bio", "2", "upload", {"chunk_size": 2}, len(sequences), job_id)
+    # The first worker committed one chunk, then died
+    store.claim("dead-worker", stale_after_s=300)
+    store.checkpoint(job_id, "dead-worker", 0, [json.dumps({"length": 3}), json.dumps({"length": 4})])
+
+    job = store.claim(runner.owner, stale_after_s=-1)
+    asyncio.run(runner._run_job(job))
+    assert seen == sequences[2:]
+    job = store.get(job_id)
+    assert job["status"] == COMPLETED and job["done"] == len(sequences)
+    assert [json.loads(row)["length"] for row in store.results(job_id, 0, 10)] == [3, 4, 5, 6, 7]
+    assert not os.path.exists(runner.upload_path(job_id))
+
+
+def test_generated_candidates_resume_mid_stream():
+    spec = {"model_type": "bio", "num_candidates": 10, "length": 8, "seed": 3}
+    everything = [c for chunk in generated_candidates(spec, 0, 4) for c in chunk]
+    assert len(everything) == 10
+    assert [c for chunk in generated_candidates(spec, 8, 4) for c in chunk] == everything[8:]
+
+
+def test_sweep_purges_expired_jobs_and_leftover_inputs(store, tmp_path):
+    runner = make_runner(store, tmp_path, [])
+    old = store.create("bio", "2", "upload", {}, 1, "old")
+    recent = store.create("bio", "2", "upload", {}, 1, "recent")
+    active = store.create("bio", "2", "upload", {}, 1, "active")
+    for job_id in (old, recent, active):
+        open(runner.upload_path(job_id), "w").close()
+    store.finish(old, COMPLETED)
+    store.finish(recent, "cancelled")
+    runner.retention = 60
+    store._conn.execute("UPDATE jobs SET finished_at = ? WHERE id = ?", (time.time() - 120, old))
+
+    assert runner.sweep() == 1
+    assert store.get(old) is None and store.get(recent) is not None
+    assert not os.path.exists(runner.upload_path(old))
+    # The cancelled job keeps its results but no longer needs its inputs
+    assert not os.path.exists(runner.upload_path(recent))
+    assert os.path.exists(runner.upload_path(active))
+    assert not runner.purge(active)
+
+
+def test_bio_job_threshold_is_a_confidence():
+    with pytest.raises(ValidationError):
+        JobRequest(model_type="bio", num_candidates=10, threshold=1.5)
+    assert JobRequest(model_type="materials", num_candidates=10, threshold=1.5).threshold == 1.5
+
+
+def test_upload_rejects_bio_threshold_above_one(client):
+    response = client.post("/api/jobs/upload?model_type=bio&threshold=1.5", content=b"MKV\n", headers=API_HEADERS)
+    assert response.status_code == 422
+
+
+def test_uploaded_lines_are_validated_like_single_requests():
+    assert parse_candidate("MKV\n", "bio") == "MKV"
+    assert parse_candidate('{"sequence": "MKV", "confidence_threshold": 0.2}', "bio") == {
+        "sequence": "MKV", "confidence_threshold": 0.2
+    }
+    assert parse_candidate('{"structure": "LiO"}', "materials") == {"structure": "LiO"}
+    for line in ('{"sequence": "MKV", "confidence_threshold": 1.5}', '{"sequence": "MKV", "model_version": "9"}',
+                 '{"sequence": 7}', '{"structure": "LiO"}'):
+        with pytest.raises(ValueError):
+            parse_candidate(line, "bio")
+    with pytest.raises(ValueError):
+        parse_candidate('{"structure": "LiO", "energy_threshold": -1}', "materials")
+
+
+def test_upload_with_an_invalid_line_is_rejected_before_queueing(client):
+    body = b'MKV\n{"sequence": "MKV", "confidence_threshold": 7}\n'
+    response = client.post("/api/jobs/upload?model_type=bio", content=body, headers=API_HEADERS)
+    assert response.status_code == 422
+    assert "line 2" in response.json()["detail"]
+
+
+def test_disconnected_upload_leaves_no_partial_file(client):
+    messages = iter([{"type": "http.request", "body": b"MKV\n", "more_body": True}, {"type": "http.disconnect"}])
+
+    async def receive():
+        return next(messages)
+
+    request = Request({"type": "http", "method": "POST", "headers": []}, receive)
+    before = set(os.listdir(main.job_queue().directory))
+    with pytest.raises(ClientDisconnect):
+        asyncio.run(main.upload_job(request, model_type="bio", model_version="2", threshold=None, _=None))
+    assert set(os.listdir(main.job_queue().directory)) == before
+
+
+def test_results_page_ending_on_the_last_row_has_no_next_offset(client):
+    response = client.post("/api/jobs", json={"model_type": "bio", "candidates": ["MKV", "MKVL", "MKVLA", "MKVLAG"]},
+                           headers=API_HEADERS)
+    job_id = response.json()["job_id"]
+    for _ in range(100):
+        if client.get(f"/api/jobs/{job_id}", headers=API_HEADERS).json()["status"] == COMPLETED:
+            break
+        time.sleep(0.05)
+    first = client.get(f"/api/jobs/{job_id}/results?limit=2", headers=API_HEADERS).json()
+    assert (first["count"], first["next_offset"]) == (2, 2)
+    last = client.get(f"/api/jobs/{job_id}/results?offset=2&limit=2", headers=API_HEADERS).json()
+    assert (last["count"], last["next_offset"]) == (2, None)
+    assert [row["sequence"] for row in first["results"] + last["results"]] == ["MKV", "MKVL", "MKVLA", "MKVLAG"]
+
+
+def test_purge_endpoint_removes_a_finished_job(client):
+    response = client.post("/api/jobs", json={"model_type": "bio", "candidates": ["MKV"]}, headers=API_HEADERS)
+    job_id = response.json()["job_id"]
+    # Cancelling is a no-op when the worker already finished it
+    client.delete(f"/api/jobs/{job_id}", headers=API_HEADERS)
+    assert client.delete(f"/api/jobs/{job_id}/results", headers=API_HEADERS).json() == {"job_id": job_id, "purged": True}
+    assert client.get(f"/api/jobs/{job_id}", headers=API_HEADERS).status_code == 404
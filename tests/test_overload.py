@@ -0,0 +1,63 @@
+import threading
+import time
+
+from src import main
+from tests.conftest import API_HEADERS
+
+
+def block_engine(monkeypatch, client, model_type="bio_2"):
+    """Make the engine's batch call wait on the returned event"""
+    client.post("/api/predict/bio/batch", json={"sequences": ["MKV"]}, headers=API_HEADERS)
+    engine = main.registry.peek(model_type)
+    release = threading.Event()
+    predict_batch = engine.predict_batch
+
+    def blocked(inputs):
+        release.wait(10)
+        return predict_batch(inputs)
+
+    monkeypatch.setattr(engine, "predict_batch", blocked)
+    return release
+
+
+def wait_for_pending(model_type: str, count: int):
+    for _ in range(200):
+        if main.executor.pending(model_type) == count:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"{model_type} never reached {count} pending calls")
+
+
+def test_full_queue_is_rejected_with_retry_after_while_health_answers(client, monkeypatch):
+    release = block_engine(monkeypatch, client)
+    monkeypatch.setattr(main.executor, "max_queue_size", 1)
+    first = {}
+    request = threading.Thread(target=lambda: first.update(response=client.post(
+        "/api/predict/bio/batch", json={"sequences": ["MKVQUEUEA"]}, headers=API_HEADERS
+    )))
+    request.start()
+    try:
+        wait_for_pending("bio_2", 1)
+        rejected = client.post("/api/predict/bio/batch", json={"sequences": ["MKVQUEUEB"]}, headers=API_HEADERS)
+        assert rejected.status_code in (429, 503)
+        assert int(rejected.headers["Retry-After"]) >= 1
+        health = client.get("/health")
+        assert health.status_code == 200 and health.json()["status"] == "healthy"
+    finally:
+        release.set()
+        request.join()
+    assert first["response"].status_code == 200
+
+
+def test_rejected_batch_gives_back_the_slots_of_its_other_chunks(client, monkeypatch):
+    release = block_engine(monkeypatch, client)
+    monkeypatch.setattr(main.executor, "max_queue_size", 1)
+    monkeypatch.setitem(main.batching_settings, "chunk_size", 1)
+    try:
+        rejected = client.post("/api/predict/bio/batch", json={"sequences": ["MKVSLOTA", "MKVSLOTB"]},
+                               headers=API_HEADERS)
+        assert rejected.status_code in (429, 503)
+        # The first chunk was cancelled with the batch rather than left waiting on the engine
+        wait_for_pending("bio_2", 0)
+    finally:
+        release.set()
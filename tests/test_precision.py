@@ -0,0 +1,42 @@
+import json
+
+import pytest
+import torch
+
+from src.Config import Config
+from src.precision import apply_precision
+
+
+def make_model():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(torch.nn.Linear(16, 64), torch.nn.ReLU(), torch.nn.Linear(64, 4)).eval()
+
+
+def test_int8_within_tolerance_replaces_the_model():
+    model = make_model()
+    converted, report = apply_precision("int8", model, torch.randn(32, 16))
+    assert report["active"] and converted is not model
+
+
+def test_parity_guard_keeps_fp32_for_an_out_of_tolerance_int8_model():
+    model = make_model()
+    converted, report = apply_precision("int8", model, torch.randn(32, 16), tolerance=1e-6)
+    assert converted is model
+    assert not report["active"]
+    assert report["relative_error"] > 1e-6
+    assert "exceeds tolerance" in report["reason"]
+
+
+@pytest.mark.parametrize("model_key, precision", [("mat_1", "int8"), ("mat_2", "bf16"), ("hep_1", "int8"), ("bio_2", "fp16")])
+def test_config_rejects_unsupported_precision(tmp_path, model_key, precision):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"models": {model_key: {"precision": precision}}}))
+    with pytest.raises(ValueError, match=model_key):
+        Config(str(path))
+
+
+def test_config_accepts_supported_precision(tmp_path):
+    path = tmp_path / "config.json"
+    models = {"bio_2": {"precision": "int8"}, "hep_1": {"precision": "bf16"}, "mat_1": {"precision": "fp32"}}
+    path.write_text(json.dumps({"models": models}))
+    assert Config(str(path)).get("models") == models
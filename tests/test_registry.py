@@ -0,0 +1,60 @@
+import json
+
+import pytest
+import torch
+
+from src import registry as registry_module
+from src.registry import ModelRegistry
+
+# A 256x256 Linear layer holds 257 KB of float32 weights
+ENGINE_MB = (256 * 256 + 256) * 4 / 1024 / 1024
+
+
+class FakeEngine:
+    def __init__(self, model_path, **options):
+        self.model_path = model_path
+        self.options = options
+        self.model = torch.nn.Linear(256, 256)
+
+
+@pytest.fixture
+def models_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry_module, "ENGINE_CLASSES", {"NexaBio": f"{__name__}.FakeEngine"})
+    versions = {"NexaBio": {"1": "bio_1.pt", "2": "bio_2.pt", "3": "bio_3.pt"}, "NexaCFD": {"1": "cfd.pt"}}
+    (tmp_path / "versions.json").write_text(json.dumps(versions))
+    return str(tmp_path)
+
+
+def test_least_recently_used_engine_is_evicted_over_budget(models_dir):
+    registry = ModelRegistry(models_dir, memory_budget_mb=ENGINE_MB * 2.5)
+    first = registry.get("bio_1")
+    registry.get("bio_2")
+    # Touching bio_1 makes bio_2 the least recently used
+    assert registry.get("bio_1") is first
+    registry.get("bio_3")
+    assert registry.loaded() == ["bio_1", "bio_3"]
+    assert registry.memory_usage() <= registry.memory_budget
+
+
+def test_pinned_engines_are_never_evicted(models_dir):
+    registry = ModelRegistry(models_dir, memory_budget_mb=ENGINE_MB * 1.5, pinned=["bio_1"])
+    pinned = registry.get("bio_1")
+    registry.get("bio_2")
+    registry.get("bio_3")
+    assert registry.loaded() == ["bio_1", "bio_3"]
+    assert registry.peek("bio_1") is pinned
+
+
+def test_unknown_models_raise(models_dir):
+    registry = ModelRegistry(models_dir)
+    with pytest.raises(KeyError):
+        registry.get("bio_9")
+    with pytest.raises(KeyError):
+        registry.entry("astro_1")
+    # Listed in versions.json but without an engine class
+    assert not registry.is_servable("cfd_1")
+    with pytest.raises(LookupError):
+        registry.get("cfd_1")
+    with pytest.raises(KeyError):
+        ModelRegistry(models_dir, pinned=["bio_9"])
+    assert registry.loaded() == []
@@ -0,0 +1,31 @@
+import os
+import threading
+
+import pytest
+
+from src.runtime import available_cpus, pin_cpus, plan_runtime
+
+
+def test_plan_splits_cpus_between_workers():
+    plans = [plan_runtime({"affinity": True}, list(range(8)), 4, index) for index in range(4)]
+    assert [plan["affinity"] for plan in plans] == [[0, 1], [2, 3], [4, 5], [6, 7]]
+    assert all(plan["intra_op_threads"] == 2 for plan in plans)
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="needs sched_setaffinity")
+def test_pin_cpus_applies_to_the_process_from_any_thread():
+    original = available_cpus()
+    target = original[:1]
+    try:
+        thread = threading.Thread(target=pin_cpus, args=({"affinity": target, "worker_index": 0},))
+        thread.start()
+        thread.join()
+        # The main thread and threads started afterwards see the new mask
+        assert available_cpus() == target
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(available_cpus()))
+        thread.start()
+        thread.join()
+        assert seen == [target]
+    finally:
+        os.sched_setaffinity(0, original)
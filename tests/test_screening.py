@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+
+from src import main
+from src.engines import composition_properties
+from src.jobs import generated_candidates
+from src.screening import Screen, TopK
+from tests.conftest import API_HEADERS
+
+
+def _results(values, densities=None):
+    densities = densities if densities is not None else [1.0] * len(values)
+    return [
+        {"input_structure": str(i), "predicted_properties": {"predicted_band_gap": v, "density": d}}
+        for i, (v, d) in enumerate(zip(values, densities))
+    ]
+
+
+def test_topk_keeps_best_and_prefers_earlier_ties():
+    board = TopK(3)
+    for index, score in enumerate([1.0, 5.0, 5.0, 2.0, 5.0, 0.5]):
+        board.offer(score, index, index)
+    assert [(score, index) for score, index, _ in board.ranked()] == [(5.0, 1), (5.0, 2), (5.0, 4)]
+
+
+def test_topk_later_tie_does_not_replace_earlier():
+    board = TopK(1)
+    board.offer(3.0, 0, "first")
+    board.offer(3.0, 1, "second")
+    assert board.ranked()[0][2] == "first"
+
+
+def test_screen_matches_brute_force_across_chunks():
+    rng = np.random.default_rng(0)
+    values = np.round(rng.normal(size=2000), 1)
+    densities = rng.uniform(0, 20, 2000)
+    results = _results(values, densities)
+    for goal, sign in (("max", 1), ("min", -1)):
+        screen = Screen("predicted_band_gap", goal, 25, {"density": {"min": 5, "max": 15}})
+        for start in range(0, len(results), 137):
+            screen.add(results[start:start + 137])
+        expected = sorted(
+            (-sign * v, i) for i, (v, d) in enumerate(zip(values, densities)) if 5 <= d <= 15
+        )[:25]
+        assert [(-sign * row["score"], row["candidate"]) for row in screen.leaderboard()] == expected
+        assert screen.passed == int(((densities >= 5) & (densities <= 15)).sum())
+
+
+def test_screen_all_tied_keeps_first_candidates():
+    screen = Screen("predicted_band_gap", "max", 4)
+    screen.add(_results([1.5] * 1000))
+    assert [row["candidate"] for row in screen.leaderboard()] == [0, 1, 2, 3]
+
+
+def test_withheld_properties_never_pass():
+    results = _results([2.0, None, 1.0])
+    screen = Screen("predicted_band_gap", "max", 5)
+    screen.add(results)
+    assert [row["candidate"] for row in screen.leaderboard()] == [0, 2]
+    assert screen.passed == 2
+
+
+def test_screening_endpoint_streams_ranked_top_k(client):
+    request = {"num_candidates": 3000, "seed": 11, "length": 8, "objective": "predicted_band_gap", "top_k": 10,
+               "filters": {"li_fraction": {"max": 0.5}}, "report_every": 1}
+    response = client.post("/api/screen/materials", json=request, headers=API_HEADERS)
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-1]["type"] == "final" and events[-1]["screened"] == 3000
+    assert any(event["type"] == "progress" for event in events[:-1])
+
+    # Brute force over the same candidates: threshold, filter, then best band gap with earlier ties first
+    spec = {"model_type": "materials", "num_candidates": 3000, "length": 8, "seed": 11}
+    structures = [s for chunk in generated_candidates(spec, 0, main.batching_settings.get("chunk_size", 1024))
+                  for s in chunk]
+    expected = []
+    for index, structure in enumerate(structures):
+        properties = composition_properties(structure)
+        if properties["confidence_score"] >= 50 and properties["li_fraction"] <= 0.5:
+            expected.append((-properties["predicted_band_gap"], index))
+    expected.sort()
+    leaderboard = events[-1]["leaderboard"]
+    assert [(-row["score"], row["candidate"]) for row in leaderboard] == expected[:10]
+    assert [row["rank"] for row in leaderboard] == list(range(1, 11))
+    assert all(row["structure"] == structures[row["candidate"]] for row in leaderboard)
+    assert events[-1]["passed"] == len(expected)
@@ -0,0 +1,73 @@
+import msgpack
+import numpy as np
+import pyarrow.ipc as ipc
+import pytest
+
+from src.serialization import ARROW, JSON, MSGPACK, negotiate
+from tests.conftest import API_HEADERS
+
+SEQUENCES = ["MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQ", "GSHMAEELLKK"]
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON),
+    ("", JSON),
+    ("*/*", JSON),
+    ("application/msgpack", MSGPACK),
+    ("application/x-msgpack", MSGPACK),
+    ("application/vnd.apache.arrow.stream", ARROW),
+    ("application/json;q=0.5, application/msgpack", MSGPACK),
+    ("application/msgpack;q=0.2, application/vnd.apache.arrow.stream;q=0.9", ARROW),
+    ("application/msgpack, application/json", MSGPACK),
+    ("text/html", None),
+    ("application/msgpack;q=0", None),
+    ("application/msgpack;q=abc, application/json", JSON),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+
+def msgpack_rows(content: bytes) -> list:
+    body = msgpack.unpackb(content)
+    rows = body["results"] if "results" in body else [body]
+    for row in rows:
+        packed = row["tertiary_coordinates"]
+        row["tertiary_coordinates"] = np.frombuffer(packed["data"], dtype=packed["dtype"]).reshape(packed["shape"])
+    return rows
+
+
+def arrow_rows(content: bytes) -> list:
+    return ipc.open_stream(content).read_all().to_pylist()
+
+
+def post(client, path, json, accept=None):
+    headers = {**API_HEADERS, "Accept": accept} if accept else API_HEADERS
+    response = client.post(path, json=json, headers=headers)
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.parametrize("path, payload", [
+    ("/api/predict/bio", {"sequence": SEQUENCES[0]}),
+    ("/api/predict/bio/batch", {"sequences": SEQUENCES}),
+])
+@pytest.mark.parametrize("accept, decode", [(MSGPACK, msgpack_rows), (ARROW, arrow_rows)])
+def test_binary_formats_round_trip_against_json(client, path, payload, accept, decode):
+    reference = post(client, path, payload).json()
+    reference_rows = reference["results"] if "results" in reference else [reference]
+    response = post(client, path, payload, accept)
+    assert response.headers["content-type"] == accept
+    rows = decode(response.content)
+    assert len(rows) == len(reference_rows)
+    for row, expected in zip(rows, reference_rows):
+        assert row["sequence"] == expected["sequence"]
+        assert row["confidence"] == expected["confidence"]
+        coordinates = np.asarray(row["tertiary_coordinates"], dtype=np.float64)
+        # JSON rounds to 2 decimals; the binary formats carry the float32 values
+        assert coordinates.shape == (len(expected["sequence"]), 3)
+        np.testing.assert_allclose(coordinates, expected["tertiary_coordinates"], atol=0.005 + 1e-6)
+
+
+def test_unsupported_accept_is_406(client):
+    response = client.post("/api/predict/bio", json={"sequence": "MKV"}, headers={**API_HEADERS, "Accept": "text/html"})
+    assert response.status_code == 406
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from src.singleflight import SingleFlight
+
+
+def test_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert [result for result, _ in results] == [{"value": 42}] * 5
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert flight.stats()["dedup_ratio"] == 0.8
+    assert len(flight) == 0
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flight = SingleFlight()
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def run():
+        first = await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+        # The key is released once the work finishes, so a repeat runs again
+        second = await flight.do("a", lambda: work("a"))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == [("a", False), ("b", False)] and second == ("a", False)
+    assert calls == ["a", "b", "a"]
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("model failed")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_work():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("k", work))
+        follower = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == ("done", True)
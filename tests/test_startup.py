@@ -0,0 +1,21 @@
+import asyncio
+import copy
+
+from src import main
+
+
+def test_ready_stays_false_when_a_startup_model_fails(client, monkeypatch):
+    saved = copy.deepcopy(main.startup_state)
+    monkeypatch.setattr(main.registry, "prewarm", lambda *args, **kwargs: {
+        "bio_2": {"torch_load_s": 0.0, "precision_s": 0.0, "backend_s": 0.0, "load_s": 0.0, "warmup_s": 0.0},
+        "hep_1": {"error": "checkpoint is corrupt"}
+    })
+    try:
+        asyncio.run(main.warm_up())
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+        assert response.json()["failed"] == ["hep_1"]
+    finally:
+        main.startup_state.clear()
+        main.startup_state.update(saved)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from src.structure_export import check_structures, fits, fixed_width, structure_text
+from tests.conftest import API_HEADERS
+
+
+@pytest.mark.parametrize("width,decimals", [(8, 3), (10, 4), (6, 2), (5, 0)])
+def test_fixed_width_matches_fstring(width, decimals):
+    rng = np.random.default_rng(width)
+    limit = 10 ** (width - 2)
+    # Two extra digits, skipping exact halves (documented as round-half-even rather than f-string rounding)
+    steps = rng.integers(-limit * 100 + 1, limit * 100, 2000)
+    values = steps[np.abs(steps) % 100 != 50] / 10 ** (decimals + 2)
+    values = np.concatenate([values, [0.0, -0.0, 1.0, -1.0]])
+    rendered = fixed_width(values, width, decimals)
+    for value, row in zip(values, rendered):
+        assert row.tobytes().decode() == f"{value:{width}.{decimals}f}"
+
+
+def test_fixed_width_rejects_values_that_do_not_fit():
+    with pytest.raises(ValueError):
+        fixed_width([10000.0], 8, 3)
+    with pytest.raises(ValueError):
+        fixed_width([-1000.0], 8, 3)
+
+
+def test_fits_matches_fixed_width_limits():
+    assert fits([9999.999, -999.999], 8, 3)
+    assert not fits([10000.0], 8, 3)
+    assert not fits([-1000.0], 8, 3)
+    assert not fits([np.nan], 8, 3)
+
+
+def test_check_structures_rejects_coordinates_outside_pdb_columns():
+    sequence = "A" * 10
+    coordinates = np.zeros((10, 3))
+    coordinates[-1, 2] = 10500.0
+    with pytest.raises(ValueError, match="mmCIF"):
+        check_structures("pdb", [(sequence, coordinates, 50.0)])
+    check_structures("cif", [(sequence, coordinates, 50.0)])
+    assert structure_text("cif", sequence, coordinates).count("ATOM ") == 10
+
+
+def test_long_chain_pdb_request_is_rejected_before_streaming(client):
+    response = client.post(
+        "/api/predict/bio/structure",
+        json={"sequence": "A" * 7000, "confidence_threshold": 0.0, "format": "pdb"},
+        headers=API_HEADERS
+    )
+    assert response.status_code == 422
+    assert "do not fit" in response.json()["detail"]